@@ -0,0 +1,97 @@
+"""
+⏱️ ADAPTIVE FRAME SKIP
+Keeps video analysis within a target lag behind real time
+Lag = wall time spent so far - media time of the frame being analysed. Once
+per decision interval the controller compares it with the target:
+  behind   -> skip more frames; at the skip limit, lower the input resolution
+  headroom -> restore resolution first, then analyse more frames
+Every change is logged with its reason so operators can see what happened
+"""
+import math
+import time
+from datetime import datetime
+from app_config import (
+    MODEL_IMGSZ, TARGET_LAG_S, ADAPTIVE_MAX_SKIP, ADAPTIVE_IMGSZ_LEVELS, ADAPTIVE_DECISION_INTERVAL_S
+)
+
+class FrameSkipController:
+    """Chooses frame skip (and optionally imgsz) from measured lag and per-frame cost"""
+
+    def __init__(self, fps, initial_skip=1, target_lag=TARGET_LAG_S, max_skip=ADAPTIVE_MAX_SKIP,
+                 imgsz_levels=ADAPTIVE_IMGSZ_LEVELS, interval=ADAPTIVE_DECISION_INTERVAL_S):
+        self.fps = fps or 25
+        self.target_lag = target_lag
+        self.max_skip = max_skip
+        # Largest first; the configured model size is the ceiling
+        self.imgsz_levels = sorted({size for size in imgsz_levels if size <= MODEL_IMGSZ} | {MODEL_IMGSZ}, reverse=True)
+        self.interval = interval
+        self.frame_skip = max(1, min(initial_skip, max_skip))
+        self._level = 0
+        self._start = None
+        self._last_decision = 0.0
+        self._cost = None           # EMA of seconds per analysed frame
+        self.lag = 0.0
+        self.decisions = []
+
+    @property
+    def imgsz(self):
+        return self.imgsz_levels[self._level]
+
+    def __call__(self):
+        """Current frame skip (lets video_frames read it between frames)"""
+        return self.frame_skip
+
+    def frame_done(self, frame_number, seconds):
+        """Report one analysed frame (its number in the video and its processing time)"""
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = self._last_decision = now - seconds
+        self._cost = seconds if self._cost is None else 0.8 * self._cost + 0.2 * seconds
+        self.lag = (now - self._start) - frame_number / self.fps
+        if self.lag < 0:
+            # Ahead of real time: a live source would make us wait, so no credit is banked
+            self._start += self.lag
+            self.lag = 0.0
+        if now - self._last_decision >= self.interval:
+            self._last_decision = now
+            self._decide(frame_number)
+
+    def _sustainable_skip(self, cost):
+        """Skip at which analysis keeps pace with the video"""
+        return max(1, math.ceil(cost * self.fps))
+
+    def _decide(self, frame_number):
+        skip, level = self.frame_skip, self._level
+        needed = self._sustainable_skip(self._cost)
+        if self.lag > self.target_lag:
+            # Behind: more than keeping pace, so the backlog shrinks
+            skip = max(skip + 1, math.ceil(needed * 1.25))
+            if skip > self.max_skip and self.frame_skip == self.max_skip and level + 1 < len(self.imgsz_levels):
+                # Skipping cannot go further - analyse smaller frames
+                level += 1
+            reason = f"lag {self.lag:.1f}s > target {self.target_lag:.1f}s"
+        elif self.lag < self.target_lag / 2:
+            reason = f"headroom (lag {self.lag:.1f}s)"
+            if level > 0:
+                # Cost grows with the input area
+                dearer = self._cost * (self.imgsz_levels[level - 1] / self.imgsz_levels[level]) ** 2
+                if self._sustainable_skip(dearer) <= self.max_skip:
+                    level -= 1
+                    skip = self._sustainable_skip(dearer)
+            if level == self._level:
+                skip = min(skip, needed)
+        else:
+            return
+        skip = max(1, min(skip, self.max_skip))
+        if (skip, level) != (self.frame_skip, self._level):
+            self.decisions.append({
+                "Time": datetime.now().strftime("%H:%M:%S"),
+                "Frame": frame_number,
+                "Lag_s": round(self.lag, 2),
+                "Frame_ms": round(self._cost * 1000, 1),
+                "Skip": f"{self.frame_skip} → {skip}",
+                "Imgsz": f"{self.imgsz} → {self.imgsz_levels[level]}",
+                "Reason": reason,
+            })
+            print(f"⏱️ Frame {frame_number}: skip {self.frame_skip}→{skip}, imgsz {self.imgsz}→{self.imgsz_levels[level]} ({reason})")
+            self.frame_skip, self._level = skip, level
@@ -3,22 +3,45 @@
 Enhanced Edition with Improved PDF Management
 Bangladesh Traffic Enforcement AI
 """
+import time
+_import_start = time.perf_counter()
+
 import streamlit as st
 import cv2
 import tempfile
 import os
+import math
 import pandas as pd
 from datetime import datetime, timedelta
-from ultralytics import YOLO
 from pathlib import Path
-import glob
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # For Streamlit compatibility
 
-from app_config import MODEL_PATH, CSV_FILE, SAVE_DIR
+from app_config import (
+    MODEL_PATH, MODEL_IMGSZ, CSV_FILE, SAVE_DIR, FINES_DIR, SAVE_FINE_PDFS,
+    CASES_PER_PAGE, PAGE_SIZE_OPTIONS, FINES_PER_PAGE, MOTION_GATE, ADAPTIVE_SKIP, TARGET_LAG_S, CASCADE,
+    TILING, TILE_MIN_WIDTH, TILE_SIZE, ADAPTIVE_IMGSZ_LEVELS
+)
 from detection_utils import process_frame, initialize_csv
-from pdf_generator import TrafficFinePDF
+from model_loader import get_model_loader
+from frame_ring import video_frames
+from motion_gate import MotionGate
+from adaptive_skip import FrameSkipController
+from cascade import CascadeDetector
+from tiling import TiledDetector
+from inference_service import ServiceError
+from thumbnail_utils import get_thumbnail
+from plate_index import get_plate_index
+from evidence_store import resolve_image, count_images, ensure_layout
+from retention import disk_report, run_retention
+from batch_fines import pending_fine_cases, build_violation_data, generate_batch
+from export_utils import export_fines
+from charts import data_version, violation_aggregates, chart_png
+from timing_utils import timed_fragment, record_timing, get_timings
+from fines_index import (
+    get_fines, search_fines, read_fine, delete_fine, count_fines, reconcile, ensure_reconciled,
+    case_identity
+)
+# reportlab, matplotlib and ultralytics are imported where they are first used
+_import_ms = (time.perf_counter() - _import_start) * 1000
 
 # ================= PREMIUM UI CONFIGURATION =================
 st.set_page_config(
@@ -33,6 +56,10 @@ st.set_page_config(
     }
 )
 
+# Server time for this run; fragment reruns are timed separately
+_script_start = time.perf_counter()
+record_timing("imports", _import_ms)
+
 # ================= PREMIUM STYLING =================
 st.markdown("""
 <style>
@@ -356,15 +383,24 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ================= LOAD MODEL =================
-@st.cache_resource
-def load_model():
-    """Load YOLO model with caching"""
-    try:
-        model = YOLO(MODEL_PATH)
-        return model
-    except Exception as e:
-        st.error(f"❌ Model Loading Failed: {str(e)}")
-        return None
+# Starts loading on a background thread; the UI keeps rendering meanwhile
+model_loader = get_model_loader()
+
+# ================= DATA HELPERS =================
+@st.cache_data(show_spinner=False)
+def _read_violations(path, mtime_ns, size):
+    """Parse the violation log once per file version"""
+    return pd.read_csv(path)
+
+def load_violations():
+    """Load violations, re-parsing the CSV only when it changes on disk"""
+    stat = os.stat(CSV_FILE)
+    return _read_violations(CSV_FILE, stat.st_mtime_ns, stat.st_size)
+
+def paginate(index, page, page_size):
+    """Return the index labels for a 1-based page"""
+    start = (page - 1) * page_size
+    return index[start:start + page_size]
 
 # ================= HEADER =================
 st.markdown("""
@@ -391,6 +427,35 @@ with st.sidebar:
         help="Process every Nth frame (higher = faster)"
     )
     
+    use_motion_gate = st.toggle(
+        "🚦 Skip Static Frames",
+        value=MOTION_GATE,
+        help="Run detection only when the scene changed since the last analysed frame"
+    )
+    
+    use_cascade = st.toggle(
+        "🔬 Two-Pass Plate Search",
+        value=CASCADE,
+        help="Scan frames at low resolution; re-detect plates at full resolution only for No-Helmet riders"
+    )
+    
+    use_tiling = st.toggle(
+        "🧩 Tiled Inference (4K)",
+        value=TILING,
+        help=f"Detect on overlapping full-resolution tiles of frames at least {TILE_MIN_WIDTH}px wide; replaces the two-pass search for those videos"
+    )
+    
+    use_adaptive_skip = st.toggle(
+        "🎛️ Adaptive Frame Skip",
+        value=ADAPTIVE_SKIP,
+        help="Raise or lower frame skip (and input size) to stay within a lag behind real time"
+    )
+    target_lag = st.number_input(
+        "⏱️ Target Lag (s)",
+        0.5, 30.0, float(TARGET_LAG_S), 0.5,
+        help="How far analysis may fall behind the video; frame skip above is the starting value"
+    ) if use_adaptive_skip else None
+    
     st.markdown("---")
     
     # Quick Stats
@@ -398,7 +463,7 @@ with st.sidebar:
     
     if os.path.exists(CSV_FILE):
         try:
-            df = pd.read_csv(CSV_FILE)
+            df = load_violations()
             today = datetime.now().strftime('%Y-%m-%d')
             today_count = len(df[df['Time'].str.contains(today, na=False)])
             total_count = len(df)
@@ -407,8 +472,8 @@ with st.sidebar:
             st.metric("Total Cases", total_count)
             
             # PDF count
-            pdf_files = glob.glob("fines/FINE_*.pdf")
-            st.metric("Generated PDFs", len(pdf_files))
+            ensure_reconciled()
+            st.metric("Generated PDFs", count_fines())
         except:
             st.info("No data yet")
     else:
@@ -418,12 +483,12 @@ with st.sidebar:
     st.caption(f"🕒 Session: {datetime.now().strftime('%H:%M:%S')}")
 
 # ================= INITIALIZE =================
-model = load_model()
 initialize_csv()
 
 # Create directories
 os.makedirs("violations", exist_ok=True)
 os.makedirs("fines", exist_ok=True)
+ensure_layout()
 
 # ================= MAIN TABS =================
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -435,12 +500,25 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 ])
 
 # ================= TAB 1: DETECTION =================
-with tab1:
+@st.fragment(run_every=1)
+def wait_for_model():
+    """Polls the background loader; reruns the app once the model is ready"""
+    if model_loader.ready:
+        st.rerun()
+    label = "Loading detection model..." if model_loader.status == "loading" else "Warming up detection model..."
+    st.caption(f"⏳ {label} processing unlocks when it is ready")
+
+@timed_fragment("detection")
+def render_detection_tab(conf_threshold, frame_skip, use_motion_gate, use_cascade, use_tiling, target_lag):
+    """Video upload and live detection"""
     col1, col2 = st.columns([2, 1])
     
     with col1:
         st.markdown("### 📹 VIDEO PROCESSING")
         
+        if not model_loader.ready:
+            wait_for_model()
+        
         video_file = st.file_uploader(
             "Upload Traffic Video",
             type=["mp4", "avi", "mov"],
@@ -457,7 +535,9 @@ with tab1:
             cap = cv2.VideoCapture(video_path)
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
             fps = int(cap.get(cv2.CAP_PROP_FPS))
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             duration = total_frames / fps if fps > 0 else 0
+            cap.release()
             
             # Info cards
             info_col1, info_col2, info_col3 = st.columns(3)
@@ -471,7 +551,25 @@ with tab1:
             st.markdown("---")
             
             # Process button
-            if st.button("▶️ START PROCESSING", use_container_width=True):
+            # Enabled once the model is loaded and warmed up
+            if st.button("▶️ START PROCESSING", use_container_width=True, disabled=not model_loader.ready):
+                # Own service connection per session, so sessions are batched fairly
+                client_id = st.session_state.setdefault('inference_client_id', f"session-{os.urandom(4).hex()}")
+                model = model_loader.detector(client_id)
+                if model is None:
+                    st.error(f"❌ Model Loading Failed: {model_loader.error}")
+                    return
+                # A static-shape export (or the service) runs every call at one input size
+                fixed_imgsz = model_loader.fixed_imgsz
+                tiled = use_tiling and width >= TILE_MIN_WIDTH
+                if tiled:
+                    # Tiles match the input size, so a fixed-size model does not rescale them
+                    model = TiledDetector(model, tile_size=fixed_imgsz or TILE_SIZE)
+                elif use_cascade and fixed_imgsz:
+                    st.warning(f"🔬 Two-pass plate search is off - the {model_loader.backend} model runs every pass at {fixed_imgsz}px")
+                elif use_cascade:
+                    model = CascadeDetector(model)
+                
                 st.markdown('<div class="video-container">', unsafe_allow_html=True)
                 
                 video_placeholder = st.empty()
@@ -480,22 +578,26 @@ with tab1:
                 
                 frame_count = 0
                 violations_detected = 0
+                gate = MotionGate() if use_motion_gate else None
+                controller = FrameSkipController(
+                    fps, frame_skip, target_lag, imgsz_levels=[] if fixed_imgsz else ADAPTIVE_IMGSZ_LEVELS
+                ) if target_lag else None
                 
-                while cap.isOpened():
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-                    
-                    frame_count += 1
+                # Skipped frames (for speed) are never converted; with DECODE_PROCESS
+                # frames arrive through shared memory from a decoder process
+                for frame_count, frame in video_frames(video_path, controller or frame_skip):
+                    frame_start = time.perf_counter()
                     progress_bar.progress(frame_count / total_frames)
                     
-                    # Skip frames for speed
-                    if frame_count % frame_skip != 0:
-                        continue
-                    
-                    # Process frame
-                    results = model(frame, conf=conf_threshold)[0]
-                    output_frame = process_frame(frame.copy(), results)
+                    # Process frame (unchanged scenes are shown without re-running detection)
+                    if gate is None or gate.should_analyze(frame):
+                        infer_start = time.perf_counter()
+                        imgsz = controller.imgsz if controller else MODEL_IMGSZ
+                        results = model(frame, conf=conf_threshold, imgsz=imgsz)[0]
+                        model_loader.record_first_frame((time.perf_counter() - infer_start) * 1000)
+                        output_frame = process_frame(frame.copy(), results)
+                    else:
+                        output_frame = frame.copy()
                     
                     # Display
                     video_placeholder.image(
@@ -508,14 +610,23 @@ with tab1:
                     stats_placeholder.markdown(f"""
                     **Processing:** Frame {frame_count}/{total_frames} 
                     | **Progress:** {(frame_count/total_frames)*100:.1f}%
+                    {f"| **Static frames skipped:** {gate.skip_rate*100:.0f}%" if gate else ""}
+                    {f"| **Idle tiles skipped:** {model.tile_skip_rate*100:.0f}%" if tiled else ""}
+                    {f"| **Skip:** {controller.frame_skip} @ {controller.imgsz}px | **Lag:** {controller.lag:.1f}s" if controller else ""}
                     """)
+                    
+                    if controller:
+                        controller.frame_done(frame_count, time.perf_counter() - frame_start)
                 
-                cap.release()
                 st.markdown('</div>', unsafe_allow_html=True)
                 
+                if controller and controller.decisions:
+                    with st.expander(f"🎛️ Frame Skip Decisions ({len(controller.decisions)})"):
+                        st.dataframe(pd.DataFrame(controller.decisions), hide_index=True)
+                
                 # Count actual violations
                 if os.path.exists(CSV_FILE):
-                    df = pd.read_csv(CSV_FILE)
+                    df = load_violations()
                     violations_detected = len(df)
                 
                 st.success(f"✅ Processing Complete! {violations_detected} violations detected.")
@@ -540,29 +651,174 @@ with tab1:
         - ✅ No duplicate logging
         """)
 
+with tab1:
+    render_detection_tab(conf_threshold, frame_skip, use_motion_gate, use_cascade, use_tiling, target_lag)
+
 # ================= TAB 2: CASE MANAGEMENT =================
-with tab2:
+def render_fine_form(idx, row, img_path, df):
+    """Fine form for the single case currently being edited"""
+    with st.form(key=f"fine_form_{idx}"):
+        st.markdown("### 📋 Fine Details")
+        
+        # Left side form - Personal details
+        st.markdown("#### Personal Information")
+        col_a, col_b = st.columns(2)
+        with col_a:
+            accused = st.text_input("Accused Person*", key=f"accused_{idx}", placeholder="Enter full name")
+            father = st.text_input("Father/Spouse Name*", key=f"father_{idx}", placeholder="Enter father/spouse name")
+            
+        with col_b:
+            cell = st.text_input("Cell Number*", key=f"cell_{idx}", placeholder="e.g., 01858051852")
+            address = st.text_area("Address*", key=f"address_{idx}", placeholder="Enter full address", height=100)
+        
+        st.markdown("---")
+        
+        # Vehicle & Offence details
+        st.markdown("#### Vehicle & Offence Information")
+        col_c, col_d = st.columns(2)
+        with col_c:
+            vehicle_reg = st.text_input("Vehicle Reg No*", value=row['Plate_Number'] if pd.notna(row['Plate_Number']) else "", key=f"vehicle_{idx}", placeholder="e.g., Dhaka Metro LA 45-6093")
+            offence = st.selectbox("Offence*", [
+                "Driving Without Helmet",
+                "Riding Without Helmet",
+                "Passenger Without Helmet"
+            ], key=f"offence_{idx}")
+        
+        with col_d:
+            section = st.text_input("Section*", value="122", key=f"section_{idx}")
+            fine_amount = st.text_input("Fine Amount (TK)*", value="1,000.00", key=f"amount_{idx}")
+        
+        st.markdown("---")
+        
+        # Officer details
+        st.markdown("#### Officer & Location Details")
+        col_e, col_f = st.columns(2)
+        with col_e:
+            witness = st.text_input("Witness", value="Traffic Officer", key=f"witness_{idx}")
+            division = st.text_input("Division", value="Tejgaon", key=f"div_{idx}")
+        
+        with col_f:
+            officer_id = st.text_input("Officer ID", value="9623252925", key=f"officer_{idx}")
+            location = st.text_input("Location", value="DHAKA METRO", key=f"loc_{idx}")
+        
+        st.markdown("---")
+        
+        submitted = st.form_submit_button("✅ Generate Fine PDF", use_container_width=True, type="primary")
+    
+    # Handle form submission OUTSIDE the form
+    if submitted:
+        if all([accused, father, cell, address, vehicle_reg]):
+            # Stable case ID - tied to the evidence image, not the row position
+            case_id, trace_no = case_identity(row)
+            
+            # Prepare data
+            violation_data = {
+                'trace_no': trace_no,
+                'case_id': case_id,
+                'accused_person': accused,
+                'father_spouse': father,
+                'cell_number': cell,
+                'address': address,
+                'vehicle_reg_no': vehicle_reg,
+                'offence': offence,
+                'section': section,
+                'seized_docs': 'T/T',
+                'occurrence_date': row['Time'],
+                'payment_last_date': (datetime.strptime(row['Time'], '%Y-%m-%d %H:%M:%S') + timedelta(days=21)).strftime('%Y-%m-%d'),
+                'witness': witness,
+                'fine_amount': fine_amount,
+                'officer_id': officer_id,
+                'officer_name': 'Traffic Officer',
+                'division': division,
+                'location': location,
+                'plate_image_path': img_path if os.path.exists(img_path) else None
+            }
+            
+            # Generate PDF
+            try:
+                from pdf_generator import get_fine_template
+                pdf_gen = get_fine_template(FINES_DIR)
+                pdf_name, pdf_data = pdf_gen.render_fine(violation_data)
+                # Indexed either way; the file itself only with SAVE_FINE_PDFS
+                pdf_path = pdf_gen.save_fine(pdf_name, pdf_data, violation_data, keep_file=SAVE_FINE_PDFS)
+                # Kept for the download button, which must survive the rerun below
+                st.session_state.generated_fine = {
+                    'idx': idx, 'pdf_name': pdf_name, 'pdf_data': pdf_data, 'pdf_path': pdf_path
+                }
+                
+                # Update plate number if not set
+                plate_saved = pd.isna(row['Plate_Number']) or row['Plate_Number'] == ''
+                if plate_saved:
+                    df.at[idx, 'Plate_Number'] = vehicle_reg
+                    df.to_csv(CSV_FILE, index=False)
+                    get_plate_index().update(row['Image_File'], vehicle_reg)
+                
+            except Exception as e:
+                st.error(f"❌ Error generating PDF: {str(e)}")
+                import traceback
+                st.code(traceback.format_exc())
+            else:
+                if plate_saved:
+                    # The sidebar counts and the other tabs read the log - rerun the whole app
+                    st.rerun()
+        else:
+            st.error("❌ Please fill all required fields marked with *")
+    
+    generated = st.session_state.get('generated_fine')
+    if generated and generated['idx'] == idx:
+        st.success(f"✅ Fine PDF generated successfully!")
+        
+        # Provide immediate download OUTSIDE form (straight from memory)
+        st.download_button(
+            label="⬇️ Download Fine PDF",
+            data=generated['pdf_data'],
+            file_name=generated['pdf_name'],
+            mime="application/pdf",
+            key=f"download_new_{idx}",
+            use_container_width=True
+        )
+        
+        if generated['pdf_path']:
+            st.info(f"📁 PDF saved to: `{generated['pdf_path']}`")
+            st.info(f"📄 You can also find this PDF in the 'PDF DOCUMENTS' tab")
+
+def change_case_page(step):
+    """Move the case list by one page (runs before the rerun)"""
+    st.session_state.case_page += step
+
+@timed_fragment("cases")
+def render_case_tab():
+    """Case list, filters and the fine form"""
     st.markdown('<div class="section-header"><h3>📋 CASE MANAGEMENT & FINE GENERATION</h3></div>', unsafe_allow_html=True)
     
     if os.path.exists(CSV_FILE):
         try:
-            df = pd.read_csv(CSV_FILE)
+            df = load_violations()
             
             if len(df) > 0:
                 # Search and filter
-                col1, col2, col3 = st.columns([2, 1, 1])
+                col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
                 with col1:
                     search_query = st.text_input("🔍 Search by Plate Number", placeholder="Enter plate number...")
                 with col2:
                     date_filter = st.date_input("📅 Filter by Date", datetime.now())
                 with col3:
                     status_filter = st.selectbox("📊 Status", ["All", "Pending", "Reviewed"])
+                with col4:
+                    page_size = st.selectbox(
+                        "📄 Per Page",
+                        PAGE_SIZE_OPTIONS,
+                        index=PAGE_SIZE_OPTIONS.index(CASES_PER_PAGE) if CASES_PER_PAGE in PAGE_SIZE_OPTIONS else 0
+                    )
                 
                 # Apply filters
-                filtered_df = df.copy()
+                filtered_df = df
                 
                 if search_query:
-                    filtered_df = filtered_df[filtered_df['Plate_Number'].str.contains(search_query, case=False, na=False)]
+                    # Normalized lookup: Bengali/Latin digits, spacing and punctuation ignored
+                    plate_index = get_plate_index()
+                    plate_index.sync(df, data_version(CSV_FILE))
+                    filtered_df = filtered_df[filtered_df['Image_File'].isin(plate_index.search(search_query))]
                 
                 if date_filter:
                     date_str = date_filter.strftime('%Y-%m-%d')
@@ -573,14 +829,58 @@ with tab2:
                 elif status_filter == "Reviewed":
                     filtered_df = filtered_df[filtered_df['Plate_Number'].notna() & (filtered_df['Plate_Number'] != '')]
                 
+                if st.toggle("🔁 Show Repeat Offenders"):
+                    plate_index = get_plate_index()
+                    plate_index.sync(df, data_version(CSV_FILE))
+                    offenders = plate_index.repeat_offenders(min_count=2)
+                    if offenders:
+                        st.dataframe(
+                            pd.DataFrame(
+                                [(display, count) for _, display, count in offenders],
+                                columns=['Plate_Number', 'Violations']
+                            ),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                    else:
+                        st.info("No plate has more than one recorded violation")
+                
+                # Newest first; only the current page is ever rendered
+                case_index = filtered_df.index[::-1]
+                total_pages = max(1, math.ceil(len(case_index) / page_size))
+                
+                # Jump back to the first page whenever the filters change
+                filter_key = (search_query, str(date_filter), status_filter, page_size)
+                if st.session_state.get('case_filter_key') != filter_key:
+                    st.session_state.case_filter_key = filter_key
+                    st.session_state.case_page = 1
+                st.session_state.case_page = min(st.session_state.get('case_page', 1), total_pages)
+                
                 st.markdown(f"### Found {len(filtered_df)} cases")
+                
+                if total_pages > 1:
+                    nav_prev, nav_page, nav_next = st.columns([1, 2, 1])
+                    with nav_prev:
+                        st.button("⬅️ Previous", use_container_width=True, disabled=st.session_state.case_page <= 1,
+                                  on_click=change_case_page, args=(-1,))
+                    with nav_page:
+                        st.number_input(
+                            f"Page (of {total_pages})",
+                            min_value=1,
+                            max_value=total_pages,
+                            key="case_page"
+                        )
+                    with nav_next:
+                        st.button("Next ➡️", use_container_width=True, disabled=st.session_state.case_page >= total_pages,
+                                  on_click=change_case_page, args=(1,))
+                
                 st.markdown("---")
                 
                 # Display cases
                 if len(filtered_df) > 0:
-                    # Reverse to show newest first
-                    for idx in reversed(filtered_df.index):
+                    for idx in paginate(case_index, st.session_state.case_page, page_size):
                         row = filtered_df.loc[idx]
+                        img_path = resolve_image(row['Image_File'])
                         
                         with st.container():
                             col1, col2 = st.columns([3, 1])
@@ -600,126 +900,26 @@ with tab2:
                                 """, unsafe_allow_html=True)
                             
                             with col2:
-                                # Show plate image if available
-                                img_path = os.path.join("violations", row['Image_File'])
-                                if os.path.exists(img_path):
-                                    st.image(img_path, caption="License Plate", use_container_width=True)
+                                # Thumbnail only - the full image loads when the case is opened
+                                thumb_path = get_thumbnail(img_path)
+                                if thumb_path:
+                                    st.image(thumb_path, caption="License Plate", use_container_width=True)
                                 else:
                                     st.warning("Image not found")
                         
-                        # Generate fine form section - FULL WIDTH BELOW
-                        with st.expander(f"📄 Generate Fine for Case #{idx+1}", expanded=False):
-                            with st.form(key=f"fine_form_{idx}"):
-                                st.markdown("### 📋 Fine Details")
-                                
-                                # Left side form - Personal details
-                                st.markdown("#### Personal Information")
-                                col_a, col_b = st.columns(2)
-                                with col_a:
-                                    accused = st.text_input("Accused Person*", key=f"accused_{idx}", placeholder="Enter full name")
-                                    father = st.text_input("Father/Spouse Name*", key=f"father_{idx}", placeholder="Enter father/spouse name")
-                                    
-                                with col_b:
-                                    cell = st.text_input("Cell Number*", key=f"cell_{idx}", placeholder="e.g., 01858051852")
-                                    address = st.text_area("Address*", key=f"address_{idx}", placeholder="Enter full address", height=100)
-                                
-                                st.markdown("---")
-                                
-                                # Vehicle & Offence details
-                                st.markdown("#### Vehicle & Offence Information")
-                                col_c, col_d = st.columns(2)
-                                with col_c:
-                                    vehicle_reg = st.text_input("Vehicle Reg No*", value=row['Plate_Number'] if pd.notna(row['Plate_Number']) else "", key=f"vehicle_{idx}", placeholder="e.g., Dhaka Metro LA 45-6093")
-                                    offence = st.selectbox("Offence*", [
-                                        "Driving Without Helmet",
-                                        "Riding Without Helmet",
-                                        "Passenger Without Helmet"
-                                    ], key=f"offence_{idx}")
-                                
-                                with col_d:
-                                    section = st.text_input("Section*", value="122", key=f"section_{idx}")
-                                    fine_amount = st.text_input("Fine Amount (TK)*", value="1,000.00", key=f"amount_{idx}")
-                                
-                                st.markdown("---")
-                                
-                                # Officer details
-                                st.markdown("#### Officer & Location Details")
-                                col_e, col_f = st.columns(2)
-                                with col_e:
-                                    witness = st.text_input("Witness", value="Traffic Officer", key=f"witness_{idx}")
-                                    division = st.text_input("Division", value="Tejgaon", key=f"div_{idx}")
-                                
-                                with col_f:
-                                    officer_id = st.text_input("Officer ID", value="9623252925", key=f"officer_{idx}")
-                                    location = st.text_input("Location", value="DHAKA METRO", key=f"loc_{idx}")
-                                
-                                st.markdown("---")
-                                
-                                submitted = st.form_submit_button("✅ Generate Fine PDF", use_container_width=True, type="primary")
-                            
-                            # Handle form submission OUTSIDE the form
-                            if submitted:
-                                if all([accused, father, cell, address, vehicle_reg]):
-                                    # Generate case ID
-                                    case_id = f"100{idx:07d}"
-                                    trace_no = f"{idx:06d}"
-                                    
-                                    # Prepare data
-                                    violation_data = {
-                                        'trace_no': trace_no,
-                                        'case_id': case_id,
-                                        'accused_person': accused,
-                                        'father_spouse': father,
-                                        'cell_number': cell,
-                                        'address': address,
-                                        'vehicle_reg_no': vehicle_reg,
-                                        'offence': offence,
-                                        'section': section,
-                                        'seized_docs': 'T/T',
-                                        'occurrence_date': row['Time'],
-                                        'payment_last_date': (datetime.strptime(row['Time'], '%Y-%m-%d %H:%M:%S') + timedelta(days=21)).strftime('%Y-%m-%d'),
-                                        'witness': witness,
-                                        'fine_amount': fine_amount,
-                                        'officer_id': officer_id,
-                                        'officer_name': 'Traffic Officer',
-                                        'division': division,
-                                        'location': location,
-                                        'plate_image_path': img_path if os.path.exists(img_path) else None
-                                    }
-                                    
-                                    # Generate PDF
-                                    try:
-                                        pdf_gen = TrafficFinePDF()
-                                        pdf_path = pdf_gen.generate_fine(violation_data)
-                                        
-                                        st.success(f"✅ Fine PDF generated successfully!")
-                                        
-                                        # Provide immediate download OUTSIDE form
-                                        with open(pdf_path, 'rb') as f:
-                                            pdf_data = f.read()
-                                            st.download_button(
-                                                label="⬇️ Download Fine PDF",
-                                                data=pdf_data,
-                                                file_name=os.path.basename(pdf_path),
-                                                mime="application/pdf",
-                                                key=f"download_new_{idx}",
-                                                use_container_width=True
-                                            )
-                                        
-                                        st.info(f"📁 PDF saved to: `{pdf_path}`")
-                                        st.info(f"📄 You can also find this PDF in the 'PDF DOCUMENTS' tab")
-                                        
-                                        # Update plate number if not set
-                                        if pd.isna(row['Plate_Number']) or row['Plate_Number'] == '':
-                                            df.at[idx, 'Plate_Number'] = vehicle_reg
-                                            df.to_csv(CSV_FILE, index=False)
-                                        
-                                    except Exception as e:
-                                        st.error(f"❌ Error generating PDF: {str(e)}")
-                                        import traceback
-                                        st.code(traceback.format_exc())
-                                else:
-                                    st.error("❌ Please fill all required fields marked with *")
+                        # The fine form is only built for the case being edited
+                        if st.session_state.get('active_fine_case') == idx:
+                            with st.container(border=True):
+                                if os.path.exists(img_path):
+                                    st.image(img_path, caption="License Plate (full size)", use_container_width=True)
+                                render_fine_form(idx, row, img_path, df)
+                                if st.button("✖️ Close Form", key=f"close_fine_{idx}", use_container_width=True):
+                                    st.session_state.active_fine_case = None
+                                    st.session_state.pop('generated_fine', None)
+                                    st.rerun(scope="fragment")
+                        elif st.button(f"📄 Generate Fine for Case #{idx+1}", key=f"open_fine_{idx}", use_container_width=True):
+                            st.session_state.active_fine_case = idx
+                            st.rerun(scope="fragment")
                         
                         st.markdown("---")
                 else:
@@ -748,72 +948,185 @@ with tab2:
         </div>
         """, unsafe_allow_html=True)
 
+with tab2:
+    render_case_tab()
+
 # ================= TAB 3: PDF DOCUMENTS =================
-with tab3:
+def change_fines_page(step):
+    """Move the PDF list by one page (runs before the rerun)"""
+    st.session_state.fines_page += step
+
+def prepare_fine_download(pdf_name):
+    """Load this PDF's bytes on the next run (one file at a time)"""
+    st.session_state.prepared_fine = pdf_name
+
+@timed_fragment("pdfs")
+def render_pdf_tab():
+    """Batch generation, court export and the PDF list"""
     st.markdown('<div class="section-header"><h3>📄 GENERATED FINE DOCUMENTS</h3></div>', unsafe_allow_html=True)
     
-    # Get all PDF files
-    pdf_files = sorted(glob.glob("fines/FINE_*.pdf"), key=os.path.getmtime, reverse=True)
-    
-    if pdf_files:
-        st.markdown(f"### 📚 {len(pdf_files)} Fine Documents Available")
+    # Batch generation for every reviewed case that has no fine yet
+    if os.path.exists(CSV_FILE):
+        st.markdown("### ⚡ Batch Fine Generation")
+        try:
+            unfined_cases = pending_fine_cases(load_violations())
+            col_b1, col_b2, col_b3 = st.columns([2, 1, 1])
+            with col_b1:
+                st.info(f"📋 {len(unfined_cases)} reviewed cases without a fine document")
+            with col_b2:
+                merge_print = st.checkbox("🖨️ Merged print file", help="Also create one multi-page PDF for printing")
+            with col_b3:
+                run_batch = st.button("⚡ Generate All", use_container_width=True, disabled=len(unfined_cases) == 0)
+            
+            if run_batch:
+                batch_progress = st.progress(0.0)
+                summary = generate_batch(
+                    [build_violation_data(i, r) for i, r in unfined_cases.iterrows()],
+                    merge=merge_print,
+                    progress=lambda done, total: batch_progress.progress(done / total, text=f"{done}/{total} PDFs")
+                )
+                st.success(
+                    f"✅ Generated {len(summary['generated'])} PDFs with {summary['workers']} workers "
+                    f"in {summary['elapsed']:.1f}s ({summary['pdfs_per_second']:.1f} PDFs/s)"
+                )
+                for case_id, error in summary['failures']:
+                    st.error(f"❌ Case {case_id}: {error}")
+                if summary['print_file']:
+                    st.info(f"🖨️ Print file saved to: `{summary['print_file']}`")
+        except Exception as e:
+            st.error(f"❌ Batch generation error: {e}")
         
-        # Search box
-        search_pdf = st.text_input("🔍 Search PDFs by Case ID or Date", placeholder="Enter case ID or date...")
+        st.markdown("---")
+    
+    # Court submission bundle
+    with st.expander("📦 Export for Court Submission"):
+        indexed_fines = get_fines()
+        if indexed_fines:
+            export_names = st.multiselect(
+                "Fines to include (leave empty for all)",
+                [fine['pdf_name'] for fine in indexed_fines],
+                key="export_selection"
+            )
+            include_images = st.checkbox("Include plate images", value=True, key="export_images")
+            
+            if st.button("📦 Build ZIP", use_container_width=True):
+                with st.spinner("Packing fines..."):
+                    zip_path, manifest = export_fines(export_names or None, include_images=include_images)
+                missing = sum(1 for entry in manifest if not entry['pdf_included'])
+                st.success(f"✅ {len(manifest) - missing} fines packed")
+                if missing:
+                    st.warning(f"⚠️ {missing} PDFs were missing - see manifest.csv in the ZIP")
+                # Offered in this run only - the ZIP is read once, not on every rerun of the tab;
+                # "ignore" keeps the button in place while the download runs
+                with open(zip_path, 'rb') as f:
+                    st.download_button(
+                        label="⬇️ Download Court Bundle",
+                        data=f,
+                        file_name=os.path.basename(zip_path),
+                        mime="application/zip",
+                        key="download_court_export",
+                        on_click="ignore",
+                        use_container_width=True
+                    )
+                st.caption(f"Also saved to `{zip_path}` - build again to download it later")
+        else:
+            st.info("No indexed fines to export yet")
+    
+    st.markdown("---")
+    
+    # Listing comes from the fines index - no folder scan or file reads per rerun
+    ensure_reconciled()
+    search_pdf = st.text_input("🔍 Search PDFs by Case ID, Plate or Date", placeholder="Enter case ID, plate or date...")
+    
+    if st.session_state.get('fines_filter_key') != search_pdf:
+        st.session_state.fines_filter_key = search_pdf
+        st.session_state.fines_page = 1
+    
+    page_fines, total_fines = search_fines(
+        search_pdf,
+        limit=FINES_PER_PAGE,
+        offset=(st.session_state.get('fines_page', 1) - 1) * FINES_PER_PAGE
+    )
+    total_fine_pages = max(1, math.ceil(total_fines / FINES_PER_PAGE))
+    if st.session_state.get('fines_page', 1) > total_fine_pages:
+        # Last page emptied by a delete or a narrower search
+        st.session_state.fines_page = total_fine_pages
+        page_fines, total_fines = search_fines(
+            search_pdf, limit=FINES_PER_PAGE, offset=(total_fine_pages - 1) * FINES_PER_PAGE
+        )
+    
+    if total_fines or search_pdf:
+        st.markdown(f"### 📚 {total_fines} Fine Documents Available")
         
-        # Filter PDFs
-        if search_pdf:
-            pdf_files = [f for f in pdf_files if search_pdf.lower() in f.lower()]
+        if total_fine_pages > 1:
+            nav_prev, nav_page, nav_next = st.columns([1, 2, 1])
+            with nav_prev:
+                st.button("⬅️ Previous", key="fines_prev", use_container_width=True,
+                          disabled=st.session_state.fines_page <= 1,
+                          on_click=change_fines_page, args=(-1,))
+            with nav_page:
+                st.number_input(
+                    f"Page (of {total_fine_pages})",
+                    min_value=1,
+                    max_value=total_fine_pages,
+                    key="fines_page"
+                )
+            with nav_next:
+                st.button("Next ➡️", key="fines_next", use_container_width=True,
+                          disabled=st.session_state.fines_page >= total_fine_pages,
+                          on_click=change_fines_page, args=(1,))
         
         st.markdown("---")
         
         # Display PDFs in grid
         cols_per_row = 3
-        for i in range(0, len(pdf_files), cols_per_row):
+        for i in range(0, len(page_fines), cols_per_row):
             cols = st.columns(cols_per_row)
             
-            for j, col in enumerate(cols):
-                idx = i + j
-                if idx < len(pdf_files):
-                    pdf_path = pdf_files[idx]
-                    pdf_name = os.path.basename(pdf_path)
-                    
-                    # Extract case ID from filename
-                    case_id = pdf_name.split('_')[1] if len(pdf_name.split('_')) > 1 else "Unknown"
-                    
-                    # Get file info
-                    file_size = os.path.getsize(pdf_path) / 1024  # KB
-                    file_time = datetime.fromtimestamp(os.path.getmtime(pdf_path))
+            for col, fine in zip(cols, page_fines[i:i + cols_per_row]):
+                pdf_name = fine['pdf_name']
+                archived = fine['path'].startswith("archive:")
+                unsaved = fine['path'].startswith("unsaved:")
+                
+                with col:
+                    st.markdown(f"""
+                    <div class="pdf-card">
+                        <div class="pdf-icon">{'🗄️' if archived else '🧾' if unsaved else '📄'}</div>
+                        <div class="pdf-title">Case #{fine['case_id'] or 'Unknown'}{f" · v{fine['version']}" if (fine['version'] or 1) > 1 else ''}</div>
+                        <div class="pdf-meta">🚗 {fine['plate'] or 'N/A'}</div>
+                        <div class="pdf-meta">📅 {fine['created'][:16]}</div>
+                        <div class="pdf-meta">💾 {fine['size'] / 1024:.1f} KB</div>
+                    </div>
+                    """, unsafe_allow_html=True)
                     
-                    with col:
-                        st.markdown(f"""
-                        <div class="pdf-card">
-                            <div class="pdf-icon">📄</div>
-                            <div class="pdf-title">Case #{case_id}</div>
-                            <div class="pdf-meta">📅 {file_time.strftime('%Y-%m-%d %H:%M')}</div>
-                            <div class="pdf-meta">💾 {file_size:.1f} KB</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # Download button
-                        with open(pdf_path, 'rb') as f:
+                    # File bytes are read only for the PDF the user asked for
+                    if unsaved:
+                        st.caption("Issued without keeping the PDF (SAVE_FINE_PDFS off)")
+                    elif st.session_state.get('prepared_fine') == pdf_name:
+                        pdf_data = read_fine(pdf_name)
+                        if pdf_data is None:
+                            st.error("PDF file is missing")
+                        else:
                             st.download_button(
                                 label="⬇️ Download PDF",
-                                data=f.read(),
+                                data=pdf_data,
                                 file_name=pdf_name,
                                 mime="application/pdf",
-                                key=f"download_{idx}",
+                                key=f"download_{pdf_name}",
                                 use_container_width=True
                             )
-                        
-                        # Delete button
-                        if st.button("🗑️ Delete", key=f"delete_{idx}", use_container_width=True):
-                            try:
-                                os.remove(pdf_path)
-                                st.success("Deleted!")
-                                st.rerun()
-                            except:
-                                st.error("Delete failed")
+                    else:
+                        st.button("📥 Prepare Download", key=f"prepare_{pdf_name}", use_container_width=True,
+                                  on_click=prepare_fine_download, args=(pdf_name,))
+                    
+                    # Delete button
+                    if st.button("🗑️ Delete", key=f"delete_{pdf_name}", use_container_width=True):
+                        try:
+                            delete_fine(pdf_name)
+                            st.success("Deleted!")
+                            st.rerun()
+                        except Exception:
+                            st.error("Delete failed")
         
         st.markdown("---")
         
@@ -821,6 +1134,8 @@ with tab3:
         col1, col2 = st.columns(2)
         with col1:
             if st.button("🔄 Refresh List", use_container_width=True):
+                # Pick up PDFs copied in or removed outside the app
+                reconcile()
                 st.rerun()
         
         with col2:
@@ -835,13 +1150,18 @@ with tab3:
         </div>
         """, unsafe_allow_html=True)
 
+with tab3:
+    render_pdf_tab()
+
 # ================= TAB 4: ANALYTICS =================
-with tab4:
+@timed_fragment("analytics")
+def render_analytics_tab():
+    """Dashboard metrics and cached charts"""
     st.markdown("### 📊 INTERACTIVE ANALYTICS DASHBOARD")
     
     if os.path.exists(CSV_FILE):
         try:
-            df = pd.read_csv(CSV_FILE)
+            df = load_violations()
             
             if len(df) > 0:
                 # ============ TOP ANIMATED METRICS ============
@@ -895,8 +1215,9 @@ with tab4:
                 
                 st.markdown("<br>", unsafe_allow_html=True)
                 
-                # Set dark style for all charts
-                plt.style.use('dark_background')
+                # Charts are cached as PNGs until the log changes
+                version = data_version(CSV_FILE)
+                agg = violation_aggregates(df, version)
                 
                 # ============ CHARTS ROW 1 ============
                 st.markdown("#### 📈 Violation Trends & Patterns")
@@ -904,131 +1225,34 @@ with tab4:
                 
                 with col1:
                     st.markdown("##### 📅 Daily Violation Trend")
-                    df['Date'] = pd.to_datetime(df['Time']).dt.date
-                    time_data = df.groupby('Date').size().reset_index(name='Count')
-                    
-                    fig1, ax1 = plt.subplots(figsize=(10, 5))
-                    ax1.plot(time_data['Date'], time_data['Count'], 
-                            color='#DC143C', linewidth=2.5, marker='o', markersize=6, markerfacecolor='#DC143C', markeredgecolor='white', markeredgewidth=1.5)
-                    ax1.fill_between(time_data['Date'], time_data['Count'], alpha=0.2, color='#DC143C')
-                    ax1.set_xlabel('Date', fontsize=11, color='#ccc')
-                    ax1.set_ylabel('Violations', fontsize=11, color='#ccc')
-                    ax1.set_title('Violations Over Time', fontsize=13, fontweight='bold', color='white', pad=15)
-                    ax1.grid(True, alpha=0.2, linestyle='--')
-                    ax1.tick_params(colors='#ccc', labelsize=9)
-                    ax1.set_facecolor('#1a1a1a')
-                    fig1.patch.set_facecolor('#1a1a1a')
-                    plt.xticks(rotation=45, ha='right')
-                    plt.tight_layout()
-                    st.pyplot(fig1)
-                    plt.close()
+                    st.image(chart_png('daily_trend', version, agg), use_container_width=True)
                 
                 with col2:
                     st.markdown("##### ⏰ Hourly Distribution")
-                    df['Hour'] = pd.to_datetime(df['Time']).dt.hour
-                    hour_data = df.groupby('Hour').size().reset_index(name='Count')
-                    
-                    fig2, ax2 = plt.subplots(figsize=(10, 5))
-                    bars = ax2.bar(hour_data['Hour'], hour_data['Count'], 
-                                   color='#2196F3', edgecolor='#64B5F6', linewidth=1.5, alpha=0.9)
-                    ax2.set_xlabel('Hour (24h)', fontsize=11, color='#ccc')
-                    ax2.set_ylabel('Violations', fontsize=11, color='#ccc')
-                    ax2.set_title('Violations by Hour of Day', fontsize=13, fontweight='bold', color='white', pad=15)
-                    ax2.grid(True, alpha=0.2, axis='y', linestyle='--')
-                    ax2.tick_params(colors='#ccc', labelsize=9)
-                    ax2.set_facecolor('#1a1a1a')
-                    fig2.patch.set_facecolor('#1a1a1a')
-                    plt.tight_layout()
-                    st.pyplot(fig2)
-                    plt.close()
+                    st.image(chart_png('hourly', version, agg), use_container_width=True)
                 
                 # ============ CHARTS ROW 2 ============
                 col3, col4 = st.columns(2)
                 
                 with col3:
                     st.markdown("##### 🎯 AI Confidence Distribution")
-                    fig3, ax3 = plt.subplots(figsize=(10, 5))
-                    ax3.hist(df['Detection_Confidence'], bins=20, 
-                            color='#4CAF50', edgecolor='#81C784', linewidth=1.5, alpha=0.9)
-                    ax3.set_xlabel('Confidence %', fontsize=11, color='#ccc')
-                    ax3.set_ylabel('Number of Cases', fontsize=11, color='#ccc')
-                    ax3.set_title('Detection Confidence Scores', fontsize=13, fontweight='bold', color='white', pad=15)
-                    ax3.grid(True, alpha=0.2, axis='y', linestyle='--')
-                    ax3.tick_params(colors='#ccc', labelsize=9)
-                    ax3.set_facecolor('#1a1a1a')
-                    fig3.patch.set_facecolor('#1a1a1a')
-                    plt.tight_layout()
-                    st.pyplot(fig3)
-                    plt.close()
+                    st.image(chart_png('confidence', version, agg), use_container_width=True)
                 
                 with col4:
                     st.markdown("##### 📊 Case Status Distribution")
-                    reviewed_count = len(df[df['Plate_Number'].notna() & (df['Plate_Number'] != '')])
-                    pending_count = len(df) - reviewed_count
-                    
-                    fig4, ax4 = plt.subplots(figsize=(8, 8))
-                    colors_pie = ['#4CAF50', '#FF9800']
-                    wedges, texts, autotexts = ax4.pie(
-                        [reviewed_count, pending_count],
-                        labels=['Reviewed', 'Pending'],
-                        colors=colors_pie,
-                        autopct='%1.1f%%',
-                        startangle=90,
-                        textprops={'color': 'white', 'fontsize': 12, 'fontweight': 'bold'},
-                        wedgeprops={'edgecolor': '#1a1a1a', 'linewidth': 2}
-                    )
-                    ax4.set_title('Case Review Status', fontsize=13, fontweight='bold', color='white', pad=20)
-                    ax4.set_facecolor('#1a1a1a')
-                    fig4.patch.set_facecolor('#1a1a1a')
-                    # Make percentage text white
-                    for autotext in autotexts:
-                        autotext.set_color('white')
-                        autotext.set_fontweight('bold')
-                    plt.tight_layout()
-                    st.pyplot(fig4)
-                    plt.close()
+                    st.image(chart_png('status', version, agg), use_container_width=True)
                 
                 # ============ WEEKLY COMPARISON ============
                 st.markdown("#### 📆 Weekly Performance Comparison")
-                df['Week'] = pd.to_datetime(df['Time']).dt.isocalendar().week
-                df['Weekday'] = pd.to_datetime(df['Time']).dt.day_name()
-                
-                weekday_data = df.groupby('Weekday').size().reset_index(name='Count')
-                day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-                weekday_data['Weekday'] = pd.Categorical(weekday_data['Weekday'], categories=day_order, ordered=True)
-                weekday_data = weekday_data.sort_values('Weekday')
-                
-                fig5, ax5 = plt.subplots(figsize=(12, 5))
-                bars = ax5.bar(weekday_data['Weekday'], weekday_data['Count'], 
-                              color='#FF9800', edgecolor='#FFB74D', linewidth=2, alpha=0.9)
-                ax5.set_xlabel('Day of Week', fontsize=11, color='#ccc')
-                ax5.set_ylabel('Violations', fontsize=11, color='#ccc')
-                ax5.set_title('Violations by Day of Week', fontsize=13, fontweight='bold', color='white', pad=15)
-                ax5.grid(True, alpha=0.2, axis='y', linestyle='--')
-                ax5.tick_params(colors='#ccc', labelsize=9)
-                ax5.set_facecolor('#1a1a1a')
-                fig5.patch.set_facecolor('#1a1a1a')
-                
-                # Add value labels on bars
-                for bar in bars:
-                    height = bar.get_height()
-                    ax5.text(bar.get_x() + bar.get_width()/2., height,
-                            f'{int(height)}',
-                            ha='center', va='bottom', color='white', fontweight='bold', fontsize=10)
-                
-                plt.xticks(rotation=45, ha='right')
-                plt.tight_layout()
-                st.pyplot(fig5)
-                plt.close()
+                st.image(chart_png('weekday', version, agg), use_container_width=True)
                 
                 # ============ KEY INSIGHTS ============
                 st.markdown("#### 💡 Key Insights")
                 
                 # Calculate insights
-                max_day = weekday_data.loc[weekday_data['Count'].idxmax(), 'Weekday']
-                max_hour = hour_data.loc[hour_data['Count'].idxmax(), 'Hour']
-                high_conf = len(df[df['Detection_Confidence'] > 80])
-                high_conf_pct = (high_conf / len(df)) * 100
+                max_day = agg['peak_day']
+                max_hour = agg['peak_hour']
+                high_conf_pct = agg['high_conf_pct']
                 
                 col_i1, col_i2, col_i3 = st.columns(3)
                 
@@ -1100,7 +1324,7 @@ with tab4:
                 
                 with col2:
                     if st.button("🔄 Refresh Dashboard", use_container_width=True):
-                        st.rerun()
+                        st.rerun(scope="fragment")
             
             else:
                 st.info("📊 No violations recorded yet. Process a video to see analytics!")
@@ -1110,8 +1334,13 @@ with tab4:
     else:
         st.info("📊 No data available. Process videos to generate analytics.")
 
+with tab4:
+    render_analytics_tab()
+
 # ================= TAB 5: SYSTEM =================
-with tab5:
+@timed_fragment("system")
+def render_system_tab(conf_threshold, frame_skip, use_motion_gate, use_cascade, use_tiling, target_lag):
+    """Configuration, storage health and retention"""
     st.markdown("### ⚙️ SYSTEM CONFIGURATION")
     
     col1, col2 = st.columns(2)
@@ -1122,12 +1351,16 @@ with tab5:
 Model: {MODEL_PATH}
 Confidence: {conf_threshold}
 Frame Skip: {frame_skip}
+Motion Gate: {"on" if use_motion_gate else "off"}
+Two-Pass Plates: {"on" if use_cascade else "off"}
+Tiling: {f"on (frames ≥ {TILE_MIN_WIDTH}px)" if use_tiling else "off"}
+Adaptive Skip: {f"target lag {target_lag}s" if target_lag else "off"}
         """)
         
         st.markdown("#### 📁 Storage")
         st.code(f"""
 Database: {CSV_FILE}
-Images: violations/
+Images: violations/YYYY/MM/DD/ab/
 PDFs: fines/
         """)
     
@@ -1144,14 +1377,93 @@ PDFs: fines/
         st.success("✅ All Systems Operational")
         
         # System stats
-        violation_images = len(glob.glob("violations/*.jpg"))
-        pdf_count = len(glob.glob("fines/FINE_*.pdf"))
+        violation_images = count_images()
+        pdf_count = count_fines()
         
         st.info(f"""
         **Storage:**
         - {violation_images} violation images
         - {pdf_count} PDF documents
         """)
+        
+        # Disk quota watchdog
+        st.markdown("#### 💾 Disk Quota")
+        disk = disk_report()
+        gb = 1024 ** 3
+        disk_msg = (
+            f"{disk['headroom_bytes'] / gb:.1f} GB headroom of {disk['quota_bytes'] / gb:.0f} GB quota "
+            f"| {disk['fs_free_bytes'] / gb:.1f} GB free on disk | {disk['archive_bytes'] / gb:.2f} GB archived"
+            f" ({disk['restored_bytes'] / gb:.2f} GB restored for audits)"
+        )
+        if disk['status'] == "ok":
+            st.success(f"✅ {disk_msg}")
+        elif disk['status'] == "warning":
+            st.warning(f"⚠️ {disk_msg}")
+        else:
+            st.error(f"🚨 {disk_msg}")
+        
+        if st.button("🗄️ Run Retention Policy", use_container_width=True):
+            with st.spinner("Archiving old evidence..."):
+                summary = run_retention()
+            st.success(f"✅ Archived {summary['image']} images and {summary['pdf']} PDFs, "
+                       f"deleted {summary['export']} old court exports")
+    
+    # Model start-up profile
+    st.markdown("#### 🧠 Model Start-up")
+    profile = model_loader.profile()
+    seconds = lambda value: "—" if value is None else f"{value:.2f} s"
+    millis = lambda value: "—" if value is None else f"{value:.0f} ms"
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Status", profile['status'].title())
+    m2.metric("Load", seconds(profile['load_s']))
+    m3.metric("Warm-up", seconds(profile['warmup_s']),
+              help=f"First warm-up run {millis(profile['warmup_first_ms'])}, last {millis(profile['warmup_last_ms'])}")
+    m4.metric("First Frame", millis(profile['first_frame_ms']))
+    cpu = profile['cpu']
+    st.caption(f"Inference backend: {profile['backend']} | "
+               f"threads: {cpu.get('threads', 'default')} | cores: {cpu.get('cores', 'all')} | "
+               f"input size: {str(profile['fixed_imgsz']) + 'px (fixed)' if profile['fixed_imgsz'] else 'per call'}")
+    if profile['fallback_reason']:
+        st.warning(f"⚠️ '{profile['requested_backend']}' model not available - running on {profile['backend']}. "
+                   f"{profile['fallback_reason']}")
+    if model_loader.error:
+        st.error(f"❌ Model Loading Failed: {model_loader.error}")
+    if model_loader.service and model_loader.ready and not model_loader.error:
+        with st.expander("🛰️ Inference Service Queue"):
+            try:
+                metrics = model_loader.detector("system-tab").metrics()
+            except ServiceError as e:
+                st.error(f"❌ {e}")
+            else:
+                s1, s2, s3, s4 = st.columns(4)
+                s1.metric("Queued Frames", metrics['queued'], help=f"{metrics['clients']} connected clients")
+                s2.metric("Mean Batch", "—" if metrics['mean_batch'] is None else f"{metrics['mean_batch']:.1f}")
+                s3.metric("Queue Wait p95", millis(metrics['wait_p95_ms']))
+                s4.metric("Batch Inference p50", millis(metrics['infer_p50_ms']))
+                st.caption(f"{metrics['frames']:,} frames in {metrics['batches']:,} batches, "
+                           f"{metrics['rejected']:,} rejected (queue full)")
+                if metrics['served_per_client']:
+                    st.dataframe(pd.DataFrame(
+                        [(client, metrics['queued_per_client'].get(client, 0), served)
+                         for client, served in metrics['served_per_client'].items()],
+                        columns=['Client', 'Queued', 'Served']
+                    ), hide_index=True)
+    
+    # Per-interaction server time (full runs vs. fragment reruns)
+    with st.expander("⏱️ Render Timings (this session)"):
+        timings = get_timings()
+        if timings:
+            timing_df = pd.DataFrame(timings, columns=['Time', 'Section', 'ms'])
+            st.dataframe(
+                timing_df.groupby('Section')['ms'].agg(['count', 'median', 'max']).round(1),
+                use_container_width=True
+            )
+            st.dataframe(timing_df.iloc[::-1].round(1), use_container_width=True, hide_index=True)
+        else:
+            st.info("No timings recorded yet")
+
+with tab5:
+    render_system_tab(conf_threshold, frame_skip, use_motion_gate, use_cascade, use_tiling, target_lag)
 
 # ================= FOOTER =================
 st.markdown("---")
@@ -1160,4 +1472,6 @@ st.markdown("""
     <p><strong>SAFEGUARD VISION - INTELLIGENT TRAFFIC ENFORCEMENT SYSTEM</strong></p>
     <p style='font-size: 12px;'>© 2026 Safeguard Vision. Enhanced Case Management Edition.</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+record_timing("full script", (time.perf_counter() - _script_start) * 1000)
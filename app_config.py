@@ -5,6 +5,27 @@ import os
 
 # Model Configuration
 MODEL_PATH = "helmet_best.pt"  # Your YOLO model path
+MODEL_IMGSZ = 640  # inference input size (letterboxed)
+INFERENCE_BACKEND = "torch"  # "torch", "onnx", "openvino" or "onnx-int8" - export first with: python export_model.py
+QUANT_CALIBRATION_FRAMES = 200  # frames from our footage used to calibrate INT8 ranges (python quantize_model.py)
+WARMUP_FRAME_SIZES = [(720, 1280), (1080, 1920)]  # (height, width) of typical camera frames
+WARMUP_RUNS = 2  # dummy inferences per frame size before the model counts as ready
+
+# Shared inference service (python inference_service.py) - one detector process for all sessions
+INFERENCE_SERVICE = False  # True: sessions send frames to the service instead of loading the model
+INFERENCE_SERVICE_ADDRESS = ("127.0.0.1", 6010)
+INFERENCE_SERVICE_AUTHKEY = b"helmet-inference"
+SERVICE_MAX_BATCH = 8  # frames per model call (needs a torch or dynamic-batch export)
+SERVICE_MAX_WAIT_MS = 20  # longest a frame waits for its batch to fill
+SERVICE_MAX_QUEUE_PER_CLIENT = 32  # frames one session/job may have waiting
+
+# CPU threads per detection process (app, inference service, benchmark workers)
+CPU_THREADS = None  # torch/OpenCV/OpenMP intra-op threads; None = library default (one per core)
+CPU_CORES = None  # e.g. [0, 1, 2, 3] pins the detector process to those cores
+
+# Video decoding
+DECODE_PROCESS = False  # True: decode in a separate process into a shared-memory frame ring
+FRAME_RING_SLOTS = 8  # frames decoded ahead of the detector
 
 # Class IDs (adjust based on your trained model)
 HELMET_ID = 0
@@ -30,6 +51,11 @@ COLOR_PLATE = (0, 255, 0)
 CSV_FILE = "violations.csv"
 SAVE_DIR = "violations"
 ERROR_LOG_FILE = "error_log.txt"
+EVIDENCE_MANIFEST = os.path.join(SAVE_DIR, "manifest.db")  # index of sharded plate images
+FINES_DIR = "fines"
+FINES_INDEX_DB = os.path.join(FINES_DIR, "fines_index.db")
+ARCHIVE_DIR = "archive"
+ARCHIVE_INDEX_DB = os.path.join(ARCHIVE_DIR, "archive_index.db")
 
 # Create save directory if it doesn't exist
 os.makedirs(SAVE_DIR, exist_ok=True)
@@ -37,4 +63,94 @@ os.makedirs(SAVE_DIR, exist_ok=True)
 # Detection Parameters
 DEFAULT_CONF_THRESHOLD = 0.4
 DEFAULT_COOLDOWN_TIME = 10
-DUPLICATE_WINDOW = 15  # seconds
\ No newline at end of file
+DUPLICATE_WINDOW = 15  # seconds
+
+# Motion gate - skip the detector when the scene has not changed
+MOTION_GATE = True  # default of the sidebar toggle
+MOTION_GATE_WIDTH = 160  # px, frames are compared at this width
+MOTION_PIXEL_THRESHOLD = 25  # grey-level change that counts as motion
+MOTION_MIN_CHANGED = 0.003  # fraction of changed pixels that triggers analysis
+MOTION_REFRESH_FRAMES = 25  # analyse anyway after this many skipped frames
+
+# Coarse-to-fine cascade - low-res scan, full-res plate search for No-Helmet riders only
+CASCADE = False  # default of the sidebar toggle
+CASCADE_COARSE_IMGSZ = 320  # pass 1 on the whole frame
+CASCADE_FINE_IMGSZ = 640  # pass 2 on each rider + plate zone crop
+CASCADE_CROP_MARGIN = 40  # px of context around the crop
+
+# Tiled inference - overlapping full-resolution tiles for 4K feeds
+TILING = False  # default of the sidebar toggle
+TILE_MIN_WIDTH = 2560  # px, narrower frames go through the model whole
+# Tiles run at their own size, so nothing is downscaled; a 4K frame is then
+# 8 x 4 = 32 tiles at 640px / 20% overlap (before idle tiles are skipped)
+TILE_SIZE = MODEL_IMGSZ  # px, square tiles cut from the frame
+TILE_OVERLAP = 0.2  # fraction of a tile shared with its neighbour
+TILE_FULL_FRAME_PASS = True  # also run the whole frame, for objects larger than a tile
+TILE_NMS_IOU = 0.5  # same object seen by two tiles
+TILE_MERGE_IOS = 0.8  # box mostly inside another = cut at a seam, merged into one
+TILE_IDLE_FRAMES = 5  # frames without detections before a tile is skipped
+TILE_RECHECK_FRAMES = 10  # skipped tiles are still analysed once every this many frames
+
+# Adaptive frame skip - keep analysis within a lag behind real time
+ADAPTIVE_SKIP = False  # default of the sidebar toggle
+TARGET_LAG_S = 2.0  # seconds the analysis may fall behind the video
+ADAPTIVE_MAX_SKIP = 15
+ADAPTIVE_IMGSZ_LEVELS = [640, 512, 416, 320]  # input sizes to step down through at max skip; [] = never
+ADAPTIVE_DECISION_INTERVAL_S = 1.0
+
+# Case Management
+CASES_PER_PAGE = 10  # default page size for the case list
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+
+# Thumbnails (list views)
+THUMB_DIR = os.path.join("cache", "thumbnails")
+THUMB_MAX_WIDTH = 320  # px, enough to read a plate in the case list
+THUMB_FORMAT = "webp"  # "webp" or "jpg"
+THUMB_QUALITY = 70
+THUMB_CACHE_MAX_MB = 200  # oldest thumbnails are evicted beyond this
+
+# Plate images embedded in fine PDFs (printed 4 x 1.5 inch)
+PRINT_IMAGE_DIR = os.path.join("cache", "print_plates")
+PRINT_DPI = 200  # 800 x 300 px fills the plate box
+PRINT_IMAGE_QUALITY = 80  # JPEG; embedded as-is by ReportLab
+PRINT_CACHE_MAX_MB = 100
+
+# Fine documents
+SAVE_FINE_PDFS = True  # keep a copy of every fine in fines/ (downloads work either way)
+FINES_PER_PAGE = 12  # PDF Documents tab, three cards per row
+EXPORT_DIR = os.path.join("cache", "exports")  # court bundles are built here
+
+# Retention & Archival
+# Each rule archives matching files older than the given age:
+#   kind "image" - evidence images; status "pending", "reviewed", "fined" or "any"
+#   kind "pdf"   - fine documents
+#   kind "export" - court bundles in EXPORT_DIR; rebuilt on demand, so deleted instead
+RETENTION_RULES = [
+    {"kind": "image", "status": "fined", "older_than_days": 90},
+    {"kind": "image", "status": "reviewed", "older_than_days": 180},
+    {"kind": "pdf", "older_than_days": 90},
+    {"kind": "export", "older_than_days": 7},
+]
+ARCHIVE_SHARD_MAX_MB = 512  # size at which a new archive shard is started
+RESTORE_CACHE_MAX_MB = 500  # archived files extracted for audits; least recently used are evicted
+DISK_QUOTA_GB = 50          # budget for images + PDFs + archives
+DISK_WARN_HEADROOM = 0.15   # warn when less than 15% of the quota is left
+
+# Batch Fine Generation
+BATCH_WORKERS = None  # None = one worker per CPU core
+BATCH_FINE_DEFAULTS = {
+    'accused_person': 'Registered Owner',
+    'father_spouse': 'N/A',
+    'cell_number': 'N/A',
+    'address': 'As per BRTA registration',
+    'offence': 'Driving Without Helmet',
+    'section': '122',
+    'seized_docs': 'N/A',
+    'witness': 'Traffic Officer',
+    'fine_amount': '1,000.00',
+    'officer_id': '9623252925',
+    'officer_name': 'Traffic Officer',
+    'division': 'Tejgaon',
+    'location': 'DHAKA METRO',
+    'payment_days': 21,
+}
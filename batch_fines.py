@@ -0,0 +1,122 @@
+"""
+⚡ BATCH FINE GENERATION
+Renders fine PDFs for many reviewed cases across a process pool
+Optionally also writes one merged multi-page print file
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import pandas as pd
+from app_config import BATCH_WORKERS, BATCH_FINE_DEFAULTS, FINES_DIR
+from evidence_store import resolve_image
+from fines_index import fined_image_files, case_identity
+
+# One generator per worker process, created by the pool initializer
+_worker_generator = None
+
+def pending_fine_cases(df):
+    """Reviewed cases (plate entered) that have no fine PDF yet"""
+    reviewed = df[df['Plate_Number'].notna() & (df['Plate_Number'].astype(str).str.strip() != '')]
+    fined = fined_image_files()
+    return reviewed[~reviewed['Image_File'].isin(fined)]
+
+def build_violation_data(idx, row, defaults=BATCH_FINE_DEFAULTS):
+    """Fine fields for one log row, with officer/offence defaults filled in"""
+    data = {k: v for k, v in defaults.items() if k != 'payment_days'}
+    occurred = datetime.strptime(row['Time'], '%Y-%m-%d %H:%M:%S')
+    img_path = resolve_image(row['Image_File'])
+    case_id, trace_no = case_identity(row)
+    data.update({
+        'trace_no': trace_no,
+        'case_id': case_id,
+        'vehicle_reg_no': str(row['Plate_Number']),
+        'occurrence_date': row['Time'],
+        'payment_last_date': (occurred + timedelta(days=defaults.get('payment_days', 21))).strftime('%Y-%m-%d'),
+        'plate_image_path': img_path if os.path.exists(img_path) else None,
+    })
+    return data
+
+def _init_worker(output_folder):
+    global _worker_generator
+    # Imported in the worker so the parent never pays for it twice
+    from pdf_generator import get_fine_template
+    _worker_generator = get_fine_template(output_folder)
+
+def _render_one(position, violation_data):
+    """Worker task: (position, pdf_path, error)"""
+    try:
+        return position, _worker_generator.generate_fine(violation_data), None
+    except Exception as e:
+        return position, None, f"{type(e).__name__}: {e}"
+
+def generate_batch(violation_list, workers=BATCH_WORKERS, output_folder=FINES_DIR,
+                   progress=None, merge=False):
+    """
+    Render one PDF per entry of violation_list in parallel
+
+    progress(done, total) is called from the calling thread after each PDF
+    Returns a summary dict: generated paths, failures, elapsed time, rate
+    and (if merge) the path of the combined print file
+    """
+    total = len(violation_list)
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, total)) if total else 1
+    generated, failures, succeeded = [], [], []
+    start = time.perf_counter()
+
+    if total:
+        # spawn: forking a threaded Streamlit server is not safe
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(output_folder,)) as pool:
+            futures = [pool.submit(_render_one, i, data) for i, data in enumerate(violation_list)]
+            for done, future in enumerate(as_completed(futures), start=1):
+                position, pdf_path, error = future.result()
+                if error:
+                    failures.append((violation_list[position].get('case_id'), error))
+                else:
+                    generated.append(pdf_path)
+                    succeeded.append(position)
+                if progress:
+                    progress(done, total)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        'generated': generated,
+        'failures': failures,
+        'workers': workers,
+        'elapsed': elapsed,
+        'pdfs_per_second': len(generated) / elapsed if elapsed > 0 else 0.0,
+        'print_file': None,
+    }
+
+    if merge and generated:
+        from pdf_generator import get_fine_template
+        printable = [violation_list[i] for i in sorted(succeeded)]
+        summary['print_file'] = get_fine_template(output_folder).generate_print_file(printable)
+
+    return summary
+
+def generate_pending_fines(df, **kwargs):
+    """Batch-generate fines for every reviewed-but-unfined case in df"""
+    cases = pending_fine_cases(df)
+    violation_list = [build_violation_data(idx, row) for idx, row in cases.iterrows()]
+    return generate_batch(violation_list, **kwargs)
+
+if __name__ == "__main__":
+    from app_config import CSV_FILE
+    import sys
+    merge = "--merge" in sys.argv
+    df = pd.read_csv(CSV_FILE)
+    summary = generate_pending_fines(
+        df, merge=merge,
+        progress=lambda done, total: print(f"   ... {done}/{total} PDFs")
+    )
+    print(f"✅ Generated {len(summary['generated'])} PDFs with {summary['workers']} workers "
+          f"in {summary['elapsed']:.1f}s ({summary['pdfs_per_second']:.1f} PDFs/s)")
+    for case_id, error in summary['failures']:
+        print(f"❌ Case {case_id}: {error}")
+    if summary['print_file']:
+        print(f"🖨️ Print file: {summary['print_file']}")
@@ -0,0 +1,59 @@
+"""
+Detector latency and throughput per inference backend (torch / onnx / openvino / onnx-int8)
+Run with: python benchmarks/bench_backends.py [--source VIDEO|GLOB] [--frames 50]
+Backends that have not been exported (python export_model.py) are skipped
+Frames come from a video or images; by default the evidence images in violations/
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from app_config import MODEL_IMGSZ, DEFAULT_CONF_THRESHOLD
+from inference_backends import ALL_BACKENDS, available_backends, load_model, sample_frames
+
+def bench(model, frames, warmup=3):
+    """(per-frame ms list, frames/s) for sequential single-frame inference"""
+    for frame in frames[:warmup]:
+        model(frame, conf=DEFAULT_CONF_THRESHOLD, imgsz=MODEL_IMGSZ, verbose=False)
+    times = []
+    start = time.perf_counter()
+    for frame in frames:
+        t = time.perf_counter()
+        model(frame, conf=DEFAULT_CONF_THRESHOLD, imgsz=MODEL_IMGSZ, verbose=False)
+        times.append((time.perf_counter() - t) * 1000)
+    return times, len(frames) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", help="video file or image glob")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--backend", nargs="+", choices=ALL_BACKENDS, help="default: every exported backend")
+    args = parser.parse_args()
+
+    frames = sample_frames(args.source, args.frames)
+    if not frames:
+        print("❌ No frames found")
+        return
+    backends = args.backend or available_backends()
+    print(f"{len(frames)} frames, imgsz {MODEL_IMGSZ}")
+    print(f"{'backend':<10} {'load s':>8} {'median ms':>10} {'p95 ms':>8} {'frames/s':>9}")
+    for backend in backends:
+        start = time.perf_counter()
+        try:
+            model = load_model(backend)
+        except FileNotFoundError as e:
+            print(f"{backend:<10} skipped: {e}")
+            continue
+        load_s = time.perf_counter() - start
+        times, fps = bench(model, frames)
+        p95 = float(np.percentile(times, 95))
+        print(f"{backend:<10} {load_s:>8.2f} {statistics.median(times):>10.1f} {p95:>8.1f} {fps:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Batch fine generation throughput vs. worker count
+Run with: python benchmarks/bench_batch_fines.py [--cases 200]
+Renders synthetic cases into a temporary folder; the real fines/ is untouched
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def synthetic_cases(n, images):
+    cases = []
+    for i in range(n):
+        cases.append({
+            'trace_no': f"{i:06d}",
+            'case_id': f"900{i:07d}",
+            'accused_person': 'Benchmark Owner',
+            'father_spouse': 'N/A',
+            'cell_number': '01800000000',
+            'address': 'Dhaka',
+            'vehicle_reg_no': f"Dhaka Metro LA {i % 100:02d}-{i:04d}",
+            'offence': 'Driving Without Helmet',
+            'seized_docs': 'N/A',
+            'occurrence_date': '2026-01-28 00:12:15',
+            'payment_last_date': '2026-02-18',
+            'witness': 'Traffic Officer',
+            'fine_amount': '1,000.00',
+            'officer_id': '9623252925',
+            'division': 'Tejgaon',
+            'location': 'DHAKA METRO',
+            'plate_image_path': images[i % len(images)] if images else None,
+        })
+    return cases
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="*", help="worker counts to try")
+    args = parser.parse_args()
+
+    images = sorted(glob.glob(os.path.join(ROOT, "violations", "**", "*.jpg"), recursive=True))
+    cores = os.cpu_count() or 1
+    sweep = args.workers or sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        from batch_fines import generate_batch
+
+        print(f"📊 {args.cases} PDFs, {len(images)} sample plate images, {cores} cores")
+        print(f"{'workers':>8} {'seconds':>9} {'PDFs/s':>8} {'speedup':>8}")
+        baseline = None
+        for run, workers in enumerate(sweep):
+            # A fresh folder per run: everything relative (fines/, indexes) lands
+            # there, so no run finds the previous one's fines already generated
+            run_dir = os.path.join(tmp, f"run{run}")
+            os.makedirs(run_dir)
+            os.chdir(run_dir)
+            out = os.path.join(run_dir, "fines")
+            summary = generate_batch(synthetic_cases(args.cases, images), workers=workers, output_folder=out)
+            rate = summary['pdfs_per_second']
+            baseline = baseline or rate
+            print(f"{workers:>8} {summary['elapsed']:>9.2f} {rate:>8.1f} {rate / baseline:>7.2f}x")
+            if summary['failures']:
+                print(f"   ❌ {len(summary['failures'])} failures, first: {summary['failures'][0]}")
+        os.chdir(ROOT)
+
+if __name__ == "__main__":
+    main()
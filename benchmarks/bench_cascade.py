@@ -0,0 +1,71 @@
+"""
+Two-pass cascade vs. single-pass high-resolution inference
+Run with: python benchmarks/bench_cascade.py VIDEO [VIDEO ...] [--frame-skip 3] [--single-imgsz 1280]
+Reports time per frame and plate capture: of the No-Helmet riders found,
+how many get a plate assigned by the process_frame rules
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app_config import DEFAULT_CONF_THRESHOLD, INFERENCE_BACKEND, CASCADE_COARSE_IMGSZ, CASCADE_FINE_IMGSZ
+from cascade import CascadeDetector
+from detection_utils import find_best_plate, find_helmet, find_no_helmet, split_detections
+from frame_ring import video_frames
+from inference_backends import load_model
+
+def plate_capture(result):
+    """(No-Helmet riders, of which with a plate)"""
+    riders, helmets, no_helmets, plates = split_detections(result)
+    violations = captured = 0
+    for rx1, ry1, rx2, ry2, _ in riders:
+        rider_box = (rx1, ry1, rx2, ry2)
+        if find_helmet(rider_box, helmets) or not find_no_helmet(rider_box, no_helmets):
+            continue
+        violations += 1
+        captured += find_best_plate(rider_box, plates) is not None
+    return violations, captured
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--frame-skip", type=int, default=3)
+    parser.add_argument("--single-imgsz", type=int, default=1280, help="input size of the single-pass baseline")
+    parser.add_argument("--backend", default=INFERENCE_BACKEND)
+    args = parser.parse_args()
+
+    model = load_model(args.backend)
+    cascade = CascadeDetector(model)
+    modes = {
+        f"single @{args.single_imgsz}": lambda frame: model(frame, conf=DEFAULT_CONF_THRESHOLD, imgsz=args.single_imgsz, verbose=False),
+        f"cascade @{CASCADE_COARSE_IMGSZ}/{CASCADE_FINE_IMGSZ}": lambda frame: cascade(frame, conf=DEFAULT_CONF_THRESHOLD),
+    }
+    totals = {name: [0.0, 0, 0, 0] for name in modes}   # ms, frames, violations, captured
+
+    for video in args.videos:
+        for _, frame in video_frames(video, args.frame_skip, in_process=False):
+            for name, run in modes.items():
+                start = time.perf_counter()
+                result = run(frame)[0]
+                elapsed = (time.perf_counter() - start) * 1000
+                violations, captured = plate_capture(result)
+                row = totals[name]
+                row[0] += elapsed
+                row[1] += 1
+                row[2] += violations
+                row[3] += captured
+
+    print(f"{'mode':<22} {'ms/frame':>9} {'violations':>11} {'with plate':>11} {'capture':>8}")
+    for name, (ms, frames, violations, captured) in totals.items():
+        rate = f"{captured / violations * 100:.1f}%" if violations else "—"
+        print(f"{name:<22} {ms / max(frames, 1):>9.1f} {violations:>11} {captured:>11} {rate:>8}")
+    stats = cascade.stats()
+    print(f"\ncascade: {stats['crops_per_frame']:.2f} crops/frame, "
+          f"pass 1 {stats['coarse_ms']:.1f} ms, pass 2 {stats['fine_ms']:.1f} ms per frame")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Aggregate detection throughput for workers x threads-per-worker
+Run with: python benchmarks/bench_cpu_scaling.py --source CLIP [--workers 1 2 4 8] [--threads 1 2 4 8] [--pin]
+Every worker is a separate process running the configured backend over the
+reference clip, as concurrent detection jobs would; all start together after
+loading and warm-up. Workers load through ModelLoader, so threads and pinning
+are applied exactly as in the app. The configuration with the highest total frames/s is
+recommended as CPU_THREADS / CPU_CORES settings
+"""
+import argparse
+import os
+import sys
+import time
+import multiprocessing as mp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app_config import MODEL_PATH, INFERENCE_BACKEND, MODEL_IMGSZ, DEFAULT_CONF_THRESHOLD
+from cpu_tuning import available_cores, plan_cores
+
+def worker(source, frames_limit, threads, cores, backend, barrier, results):
+    from inference_backends import sample_frames
+    from model_loader import ModelLoader
+    frames = sample_frames(source, frames_limit)
+    loader = ModelLoader(MODEL_PATH, backend=backend, service=False, threads=threads, cores=cores,
+                         warmup_sizes=[frames[0].shape[:2]], warmup_runs=1).start()
+    model = loader.wait()
+    if model is None:
+        raise SystemExit(f"Model failed to load: {loader.error}")
+    barrier.wait()
+    start = time.perf_counter()
+    for frame in frames:
+        model(frame, conf=DEFAULT_CONF_THRESHOLD, imgsz=MODEL_IMGSZ, verbose=False)
+    results.put((len(frames), time.perf_counter() - start))
+
+def run(source, frames, workers, threads, pin, backend):
+    """Total frames/s and the slowest worker's frames/s"""
+    barrier = mp.Barrier(workers)
+    results = mp.Queue()
+    plans = plan_cores(workers, threads) if pin else [None] * workers
+    processes = [
+        mp.Process(target=worker, args=(source, frames, threads, cores, backend, barrier, results))
+        for cores in plans
+    ]
+    for process in processes:
+        process.start()
+    finished = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    wall = max(elapsed for _, elapsed in finished)
+    total = sum(count for count, _ in finished)
+    slowest = min(count / elapsed for count, elapsed in finished)
+    return total / wall, slowest
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", help="reference clip or image glob (default: violations/)")
+    parser.add_argument("--frames", type=int, default=60, help="frames per worker")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--pin", action="store_true", help="pin each worker to its own cores")
+    parser.add_argument("--backend", default=INFERENCE_BACKEND)
+    parser.add_argument("--oversubscribe", action="store_true", help="also run workers x threads > cores")
+    args = parser.parse_args()
+
+    cores = len(available_cores())
+    print(f"{cores} cores, backend {args.backend}, {args.frames} frames per worker{', pinned' if args.pin else ''}")
+    print(f"{'workers':>7} {'threads':>7} {'total fps':>10} {'per-job fps':>12}")
+    best = None
+    for workers in args.workers:
+        for threads in args.threads:
+            if workers * threads > cores and not args.oversubscribe:
+                continue
+            total, slowest = run(args.source, args.frames, workers, threads, args.pin, args.backend)
+            print(f"{workers:>7} {threads:>7} {total:>10.1f} {slowest:>12.1f}")
+            if best is None or total > best[0]:
+                best = (total, workers, threads)
+
+    if best:
+        total, workers, threads = best
+        print(f"\n✅ Best: {workers} workers x {threads} threads = {total:.1f} frames/s")
+        print(f"   app_config: CPU_THREADS = {threads}")
+        if args.pin:
+            for index, block in enumerate(plan_cores(workers, threads)):
+                print(f"   worker {index}: CPU_CORES = {block}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Frame transport between processes: pickled frames over queues vs. the shared-memory ring
+Run with: python benchmarks/bench_frame_ring.py [--source VIDEO] [--frames 300] [--size 1920x1080]
+One decoder process feeds two stage processes (an inference and an association
+stand-in that both read every frame); reports bytes moved between processes
+and end-to-end frames/s. Without --source a synthetic clip is written first
+"""
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+import multiprocessing as mp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import cv2
+import numpy as np
+from frame_ring import FrameRing, decode_to_ring
+
+STAGES = ("inference", "association")
+
+def synthetic_clip(path, frames, width, height):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 25, (width, height))
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(frames):
+        writer.write(np.roll(base, i * 8, axis=1))
+    writer.release()
+
+def _work(stage, frame):
+    """Touches the whole frame, like a resize for the detector or a crop scan"""
+    if stage == "inference":
+        return cv2.resize(frame, (640, 360)).mean()
+    return frame[::4, ::4].max()
+
+def decode_to_queues(video_path, out_queues):
+    """Baseline decoder: every frame is pickled into each stage's queue"""
+    cap = cv2.VideoCapture(video_path)
+    count = 0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        count += 1
+        for out in out_queues:
+            out.put(("frame", count, frame))
+    cap.release()
+    for out in out_queues:
+        out.put(("end", count, None))
+
+def stage_worker(stage, in_queue, ring, results):
+    frames = 0
+    while True:
+        kind, _, payload = in_queue.get()
+        if kind != "frame":
+            break
+        if ring is None:
+            _work(stage, payload)
+        else:
+            view = ring.view(payload)
+            _work(stage, view)
+            del view
+            ring.release(payload)
+        frames += 1
+    results.put((stage, frames, time.perf_counter()))
+
+def run(video_path, transport, slots):
+    queues = [mp.Queue() for _ in STAGES]
+    results = mp.Queue()
+    ring = None
+    if transport == "ring":
+        cap = cv2.VideoCapture(video_path)
+        shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+        cap.release()
+        ring = FrameRing(slots, shape)
+        decoder = mp.Process(target=decode_to_ring, args=(video_path, ring, queues, 1, len(STAGES)))
+    else:
+        decoder = mp.Process(target=decode_to_queues, args=(video_path, queues))
+    workers = [mp.Process(target=stage_worker, args=(stage, q, ring, results)) for stage, q in zip(STAGES, queues)]
+
+    start = time.perf_counter()
+    for process in workers + [decoder]:
+        process.start()
+    finished = [results.get() for _ in workers]
+    elapsed = max(end for _, _, end in finished) - start
+    for process in workers + [decoder]:
+        process.join()
+    if ring is not None:
+        ring.close()
+    return min(frames for _, frames, _ in finished), elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", help="video file (default: synthetic clip)")
+    parser.add_argument("--frames", type=int, default=300, help="length of the synthetic clip")
+    parser.add_argument("--size", default="1920x1080", help="synthetic frame size")
+    parser.add_argument("--slots", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video_path = args.source
+        if not video_path:
+            width, height = map(int, args.size.split("x"))
+            video_path = os.path.join(tmp, "clip.mp4")
+            synthetic_clip(video_path, args.frames, width, height)
+
+        cap = cv2.VideoCapture(video_path)
+        ok, sample = cap.read()
+        cap.release()
+        if not ok:
+            print(f"❌ Cannot read {video_path}")
+            return
+        per_message = {
+            "queue": len(pickle.dumps(("frame", 1, sample), pickle.HIGHEST_PROTOCOL)),
+            "ring": len(pickle.dumps(("frame", 1, 0), pickle.HIGHEST_PROTOCOL)),
+        }
+
+        print(f"{sample.shape[1]}x{sample.shape[0]} frames, {len(STAGES)} reader stages")
+        print(f"{'transport':<10} {'frames':>7} {'MB moved':>10} {'bytes/frame':>12} {'frames/s':>9}")
+        for transport in ("queue", "ring"):
+            frames, elapsed = run(video_path, transport, args.slots)
+            moved = per_message[transport] * len(STAGES) * frames
+            print(f"{transport:<10} {frames:>7} {moved / 1e6:>10.1f} {moved / max(frames, 1):>12,.0f} "
+                  f"{frames / elapsed:>9.1f}")
+
+if __name__ == "__main__":
+    main()
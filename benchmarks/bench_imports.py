@@ -0,0 +1,99 @@
+"""
+Import time of each Streamlit page, measured in a fresh interpreter
+Run with: python benchmarks/bench_imports.py [--runs 3] [--log FILE]
+Only the page's top-level imports are executed (no UI code); --log appends
+one CSV row per page so the numbers can be tracked over time
+"""
+import argparse
+import ast
+import csv
+import glob
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def page_imports(path):
+    """Source of the module-level import statements of a page"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    statements = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in statements)
+
+def measure(source):
+    """(total ms, {top-level module: cumulative ms}) from python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", source],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue    # header line
+        # One space after the bar, then two more per nesting level
+        if name[1:] and not name[1:].startswith(" "):
+            modules[name.strip()] = int(cumulative) / 1000
+    for name in _startup_modules(sys.executable):
+        modules.pop(name, None)
+    return sum(modules.values()), modules
+
+_startup = {}
+
+def _startup_modules(python):
+    """Modules the interpreter loads before running any page code"""
+    if python not in _startup:
+        result = subprocess.run([python, "-X", "importtime", "-c", "pass"], capture_output=True, text=True)
+        _startup[python] = {
+            line.rsplit("|", 1)[1].strip()
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:") and "|" in line
+        }
+    return _startup[python]
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--log", help="append results to this CSV file")
+    args = parser.parse_args()
+
+    pages = [os.path.join(ROOT, "app.py")] + sorted(glob.glob(os.path.join(ROOT, "pages", "*.py")))
+    rows = []
+    for page in pages:
+        name = os.path.relpath(page, ROOT)
+        try:
+            runs = [measure(page_imports(page)) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"❌ {name}: {e}")
+            continue
+        total = statistics.median(ms for ms, _ in runs)
+        heaviest = sorted(runs[-1][1].items(), key=lambda item: -item[1])[:5]
+        print(f"📄 {name}: {total:.0f} ms")
+        for module, ms in heaviest:
+            print(f"   {module:<28} {ms:>7.0f} ms")
+        rows.append([datetime.now().strftime("%Y-%m-%d %H:%M:%S"), git_revision(), name, f"{total:.1f}"])
+
+    if args.log and rows:
+        new_file = not os.path.exists(args.log)
+        with open(args.log, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["Time", "Revision", "Page", "Import_ms"])
+            writer.writerows(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Motion gate: cost, skip rate and recall impact on sample videos
+Run with: python benchmarks/bench_motion_gate.py VIDEO [VIDEO ...] [--frame-skip 3] [--gate-only]
+The detector runs on every sampled frame as the baseline. With the gate, a
+skipped frame keeps the detections of the last analysed frame (what the
+operator sees); recall is how many baseline detections that preserves,
+per class (same class, IoU >= 0.5). --gate-only skips the model and reports
+cost and skip rate only
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app_config import CLASS_NAMES, DEFAULT_CONF_THRESHOLD, MODEL_IMGSZ, INFERENCE_BACKEND
+from frame_ring import video_frames
+from inference_backends import detections, load_model, per_class_agreement
+from motion_gate import MotionGate
+
+def _pct(value):
+    return "—" if value is None else f"{value * 100:.1f}%"
+
+def evaluate(video_path, frame_skip, model):
+    gate = MotionGate()
+    baseline, gated, infer_ms = [], [], []
+    last = []
+    for _, frame in video_frames(video_path, frame_skip, in_process=False):
+        analyze = gate.should_analyze(frame)
+        if model is None:
+            continue
+        start = time.perf_counter()
+        dets = detections(model(frame, conf=DEFAULT_CONF_THRESHOLD, imgsz=MODEL_IMGSZ, verbose=False)[0])
+        infer_ms.append((time.perf_counter() - start) * 1000)
+        baseline.append(dets)
+        if analyze:
+            last = dets
+        gated.append(last)
+    return gate, baseline, gated, infer_ms
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--frame-skip", type=int, default=3)
+    parser.add_argument("--gate-only", action="store_true")
+    parser.add_argument("--backend", default=INFERENCE_BACKEND)
+    args = parser.parse_args()
+
+    model = None
+    if not args.gate_only:
+        model = load_model(args.backend)
+
+    for video in args.videos:
+        gate, baseline, gated, infer_ms = evaluate(video, args.frame_skip, model)
+        stats = gate.stats()
+        print(f"\n🎞️ {os.path.basename(video)}: {stats['frames']} frames sampled (every {args.frame_skip})")
+        print(f"   gate cost {stats['gate_ms_per_frame']:.2f} ms/frame, skipped {stats['skipped']} "
+              f"({_pct(stats['skip_rate'])}), forced refreshes {stats['forced']}")
+        if model is None or not infer_ms:
+            continue
+
+        mean_infer = sum(infer_ms) / len(infer_ms)
+        before = mean_infer * stats['frames']
+        after = mean_infer * stats['analyzed'] + gate.gate_ms
+        print(f"   detector time {before / 1000:.1f} s -> {after / 1000:.1f} s ({before / max(after, 1e-9):.2f}x)")
+        agreement = per_class_agreement(baseline, gated)
+        for cls, name in CLASS_NAMES.items():
+            row = agreement.get(cls)
+            if row:
+                print(f"   {name:<10} recall {_pct(row['recall'])} ({row['matched']}/{row['reference']})")
+        matched = sum(row['matched'] for row in agreement.values())
+        reference = sum(row['reference'] for row in agreement.values())
+        print(f"   overall    recall {_pct(matched / reference if reference else None)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Fine PDF size and build time: original plate images vs. print-resolution copies
+Run with: python benchmarks/bench_pdf_images.py [--cases 50]
+Uses the plate images of existing fines (fines index), topped up from violations/
+Renders into a temporary folder; the real fines/ is untouched
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_batch_fines import synthetic_cases
+
+def sample_images(limit):
+    """Plate images behind existing fines first, then any evidence image"""
+    images = []
+    index_db = os.path.join(ROOT, "fines", "fines_index.db")
+    if os.path.exists(index_db):
+        conn = sqlite3.connect(index_db)
+        try:
+            for (name,) in conn.execute("SELECT image_file FROM fines WHERE image_file != ''"):
+                matches = glob.glob(os.path.join(ROOT, "violations", "**", name), recursive=True)
+                images.extend(matches[:1])
+        finally:
+            conn.close()
+    for path in sorted(glob.glob(os.path.join(ROOT, "violations", "**", "*.jpg"), recursive=True)):
+        if len(images) >= limit:
+            break
+        if path not in images:
+            images.append(path)
+    return images[:limit]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=int, default=50)
+    args = parser.parse_args()
+
+    images = sample_images(args.cases)
+    if not images:
+        print("No plate images found under violations/")
+        return
+    cases = synthetic_cases(len(images), images)
+
+    existing = glob.glob(os.path.join(ROOT, "fines", "*.pdf"))
+    if existing:
+        avg = sum(os.path.getsize(p) for p in existing) / len(existing)
+        print(f"📁 {len(existing)} existing fines/ PDFs, {avg / 1024:.1f} KB average")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        import pdf_generator
+        resample = pdf_generator.get_print_image
+
+        print(f"📊 {len(cases)} PDFs")
+        print(f"{'images':>10} {'ms/PDF':>8} {'KB/PDF':>8}")
+        results = {}
+        for mode in ("original", "resampled"):
+            pdf_generator.get_print_image = resample if mode == "resampled" else (lambda path, w, h: path)
+            template = pdf_generator.get_fine_template(os.path.join(tmp, mode))
+            # First pass fills the print image cache; time the steady state.
+            # The witness field differs per pass so fines are built, not reused
+            for data in cases:
+                template.generate_fine(dict(data, witness=f"{mode} warm-up"))
+            start = time.perf_counter()
+            paths = [template.generate_fine(dict(data, witness=mode)) for data in cases]
+            ms = (time.perf_counter() - start) * 1000 / len(cases)
+            kb = sum(os.path.getsize(p) for p in paths) / len(paths) / 1024
+            results[mode] = (ms, kb)
+            print(f"{mode:>10} {ms:>8.2f} {kb:>8.1f}")
+
+        (ms_a, kb_a), (ms_b, kb_b) = results["original"], results["resampled"]
+        print(f"build time {ms_a / ms_b:.2f}x faster, size {kb_a / kb_b:.2f}x smaller")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Per-PDF render time: fresh generator + styles vs. the shared template
+Run with: python benchmarks/bench_pdf_template.py [--cases 100]
+Renders into a temporary folder; the real fines/ is untouched
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_batch_fines import synthetic_cases
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=int, default=100)
+    args = parser.parse_args()
+
+    images = sorted(glob.glob(os.path.join(ROOT, "violations", "**", "*.jpg"), recursive=True))
+    cases = synthetic_cases(args.cases, images)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        import pdf_generator
+
+        def cold(data):
+            # What every submit used to pay: folder probe + styles + static flowables
+            pdf_generator._checked_folders.clear()
+            pdf_generator._build_styles.cache_clear()
+            pdf_generator._build_static_elements.cache_clear()
+            pdf_generator.TrafficFinePDF(os.path.join(tmp, "cold")).generate_fine(data)
+
+        def warm(data):
+            pdf_generator.get_fine_template(os.path.join(tmp, "warm")).generate_fine(data)
+
+        print(f"📊 {args.cases} PDFs, {len(images)} sample plate images")
+        print(f"{'mode':>6} {'ms/PDF':>8}")
+        results = {}
+        for name, render in (("cold", cold), ("warm", warm)):
+            render(dict(cases[0], witness="warm-up"))    # import/font warm-up outside the timing
+            start = time.perf_counter()
+            for data in cases:
+                # Distinct inputs per mode, otherwise identical fines are reused
+                render(dict(data, witness=name))
+            results[name] = (time.perf_counter() - start) * 1000 / len(cases)
+            print(f"{name:>6} {results[name]:>8.2f}")
+        print(f"speedup {results['cold'] / results['warm']:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Server time per UI interaction: whole-script rerun vs. the fragment it touches
+Run with: python benchmarks/bench_reruns.py [--repeat 5]
+Drives app.py headlessly with streamlit's AppTest against a temporary copy
+of the violation log, evidence images and fines
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+def _click(label, key=None):
+    def act(at):
+        for button in at.button:
+            if button.label == label and (key is None or button.key == key):
+                button.click()
+                return True
+        return False
+    return act
+
+def _status_filter(at):
+    for box in at.selectbox:
+        if box.label == "📊 Status":
+            box.set_value("Pending" if box.value == "All" else "All")
+            return True
+    return False
+
+def _search(at):
+    for box in at.text_input:
+        if box.label.startswith("🔍 Search PDFs"):
+            box.set_value("" if box.value else "1")
+            return True
+    return False
+
+# (description, fragment that owns the widget, action)
+INTERACTIONS = [
+    ("case list: status filter", "cases", _status_filter),
+    ("PDF list: search", "pdfs", _search),
+    ("PDF list: prepare download", "pdfs", _click("📥 Prepare Download")),
+    ("analytics: refresh dashboard", "analytics", _click("🔄 Refresh Dashboard")),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Startup migrates/indexes evidence - keep that away from the real tree
+        for name in ("violations.csv", "violations", "fines"):
+            source = os.path.join(ROOT, name)
+            if os.path.isdir(source):
+                shutil.copytree(source, os.path.join(tmp, name))
+            elif os.path.exists(source):
+                shutil.copy2(source, tmp)
+        os.chdir(tmp)
+        run_interactions(args.repeat)
+
+def run_interactions(repeat):
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+    at.run()
+    if at.exception:
+        print(f"❌ App failed to start: {at.exception[0].value}")
+        return
+
+    print(f"{'interaction':<32} {'full rerun ms':>14} {'fragment ms':>12}")
+    for description, section, action in INTERACTIONS:
+        full, fragment = [], []
+        for _ in range(repeat):
+            if not action(at):
+                break
+            at.run()
+            # AppTest always reruns the whole script; both costs are logged per run
+            log = list(at.session_state["render_timings"])
+            full.append(next(ms for _, name, ms in reversed(log) if name == "full script"))
+            fragment.append(next(ms for _, name, ms in reversed(log) if name == section))
+        if full:
+            print(f"{description:<32} {statistics.median(full):>14.1f} {statistics.median(fragment):>12.1f}")
+        else:
+            print(f"{description:<32} {'(widget not shown)':>27}")
+
+if __name__ == "__main__":
+    main()
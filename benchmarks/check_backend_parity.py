@@ -0,0 +1,55 @@
+"""
+Parity check: detections of exported backends against the PyTorch model
+Run with: python benchmarks/check_backend_parity.py [--source VIDEO|GLOB] [--min-iou 0.9] [--conf-tol 0.05]
+A detection matches when the class agrees, IoU >= min-iou and the confidence
+is within conf-tol; exits non-zero if any frame differs
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app_config import MODEL_IMGSZ, DEFAULT_CONF_THRESHOLD
+from inference_backends import QUANTIZED, available_backends, compare_detections, detections, load_model, sample_frames
+
+def run(model, frames):
+    return [
+        detections(model(frame, conf=DEFAULT_CONF_THRESHOLD, imgsz=MODEL_IMGSZ, verbose=False)[0])
+        for frame in frames
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", help="video file or image glob")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    parser.add_argument("--conf-tol", type=float, default=0.05)
+    args = parser.parse_args()
+
+    frames = sample_frames(args.source, args.frames)
+    # INT8 is expected to drift - quantize_model.py reports its accuracy instead
+    candidates = [name for name in available_backends() if name != "torch" and name not in QUANTIZED]
+    if not frames or not candidates:
+        print("❌ Need frames and at least one exported backend (python export_model.py)")
+        return 1
+
+    reference = run(load_model("torch"), frames)
+    print(f"torch: {sum(map(len, reference))} detections in {len(frames)} frames")
+    failed = False
+    for backend in candidates:
+        totals = [0, 0, 0, 0.0]
+        bad_frames = 0
+        for ref, got in zip(reference, run(load_model(backend), frames)):
+            matched, missing, extra, worst = compare_detections(ref, got, args.min_iou, args.conf_tol)
+            totals = [totals[0] + matched, totals[1] + missing, totals[2] + extra, max(totals[3], worst)]
+            bad_frames += bool(missing or extra)
+        ok = bad_frames == 0
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {backend}: {totals[0]} matched, {totals[1]} missing, {totals[2]} extra "
+              f"in {bad_frames} frames; max confidence diff {totals[3]:.3f}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
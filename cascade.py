@@ -0,0 +1,90 @@
+"""
+🔬 COARSE-TO-FINE CASCADE
+Pass 1 runs the detector on the whole frame at a low input size - enough to
+find riders and whether they wear a helmet. Pass 2 runs only for riders
+flagged No-Helmet: on a full-resolution crop of the rider and the plate zone
+below them, where the plate is a large object instead of a few pixels.
+Plates from pass 2 replace pass-1 plates; everything else comes from pass 1
+Used in place of the model: cascade(frame, conf=...)[0].boxes
+"""
+import time
+from app_config import PLATE_ID, CASCADE_COARSE_IMGSZ, CASCADE_FINE_IMGSZ, CASCADE_CROP_MARGIN
+from detection_utils import calculate_iou, find_helmet, find_no_helmet, plate_zone, split_detections
+from inference_backends import LiteResult, detections
+
+class CascadeDetector:
+    """Two-pass detector with the call interface of a YOLO model"""
+
+    def __init__(self, model, coarse_imgsz=CASCADE_COARSE_IMGSZ, fine_imgsz=CASCADE_FINE_IMGSZ,
+                 margin=CASCADE_CROP_MARGIN):
+        self.model = model
+        self.coarse_imgsz = coarse_imgsz
+        self.fine_imgsz = fine_imgsz
+        self.margin = margin
+        self.frames = 0
+        self.crops = 0
+        self.coarse_ms = 0.0
+        self.fine_ms = 0.0
+
+    def violation_regions(self, frame, coarse):
+        """Crop boxes around No-Helmet riders and their plate zone, in frame pixels"""
+        riders, helmets, no_helmets, _ = split_detections(LiteResult(coarse))
+        height, width = frame.shape[:2]
+        regions = []
+        for rx1, ry1, rx2, ry2, _ in riders:
+            rider_box = (rx1, ry1, rx2, ry2)
+            if find_helmet(rider_box, helmets) or not find_no_helmet(rider_box, no_helmets):
+                continue
+            zx1, zy1, zx2, zy2 = plate_zone(rider_box)
+            regions.append((
+                max(0, zx1 - self.margin), max(0, zy1 - self.margin),
+                min(width, zx2 + self.margin), min(height, zy2 + self.margin),
+            ))
+        return regions
+
+    def __call__(self, frame, conf=0.25, imgsz=None, verbose=False):
+        self.frames += 1
+        start = time.perf_counter()
+        # A smaller size from the adaptive controller still wins
+        coarse_imgsz = min(self.coarse_imgsz, imgsz) if imgsz else self.coarse_imgsz
+        coarse = detections(self.model(frame, conf=conf, imgsz=coarse_imgsz, verbose=False)[0])
+        self.coarse_ms += (time.perf_counter() - start) * 1000
+
+        regions = self.violation_regions(frame, coarse)
+        if not regions:
+            return [LiteResult(coarse)]
+
+        start = time.perf_counter()
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in regions]
+        fine_results = [self.model(crop, conf=conf, imgsz=self.fine_imgsz, verbose=False)[0] for crop in crops]
+        self.crops += len(crops)
+
+        # Pass-2 plates in frame coordinates; overlapping crops may find the same plate twice
+        plates = []
+        for (x1, y1, _, _), result in zip(regions, fine_results):
+            for cls, score, (bx1, by1, bx2, by2) in detections(result):
+                if cls != PLATE_ID:
+                    continue
+                box = (bx1 + x1, by1 + y1, bx2 + x1, by2 + y1)
+                duplicate = next((i for i, p in enumerate(plates) if calculate_iou(p[2], box) > 0.5), None)
+                if duplicate is None:
+                    plates.append((cls, score, box))
+                elif score > plates[duplicate][1]:
+                    plates[duplicate] = (cls, score, box)
+        self.fine_ms += (time.perf_counter() - start) * 1000
+
+        # Coarse plates inside a searched region are superseded by the fine pass
+        def searched(box):
+            cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+            return any(x1 <= cx <= x2 and y1 <= cy <= y2 for x1, y1, x2, y2 in regions)
+
+        kept = [det for det in coarse if det[0] != PLATE_ID or not searched(det[2])]
+        return [LiteResult(kept + plates)]
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "crops_per_frame": self.crops / self.frames if self.frames else 0.0,
+            "coarse_ms": self.coarse_ms / self.frames if self.frames else 0.0,
+            "fine_ms": self.fine_ms / self.frames if self.frames else 0.0,
+        }
@@ -0,0 +1,157 @@
+"""
+📊 ANALYTICS CHARTS
+Pre-aggregates the violation log and renders dashboard charts to PNG bytes
+Both steps are cached per data version (CSV mtime + size), so reruns that
+do not add violations or reviews reuse the finished images
+"""
+import io
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+CONFIDENCE_BINS = 20
+
+BACKGROUND = '#1a1a1a'
+
+def _pyplot():
+    """matplotlib is imported on the first chart render, not at app start"""
+    import matplotlib
+    matplotlib.use('Agg')  # For Streamlit compatibility
+    import matplotlib.pyplot as plt
+    return plt
+
+def data_version(csv_path):
+    """Cache key that changes whenever the violation log is written"""
+    stat = os.stat(csv_path)
+    return stat.st_mtime_ns, stat.st_size
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def violation_aggregates(_df, version):
+    """
+    Everything the dashboard draws, reduced to small tables
+    _df is not hashed - version identifies the data
+    """
+    times = pd.to_datetime(_df['Time'])
+    confidence = _df['Detection_Confidence'].dropna()
+    reviewed = int((_df['Plate_Number'].notna() & (_df['Plate_Number'] != '')).sum())
+
+    daily = times.dt.date.value_counts().sort_index()
+    hourly = times.dt.hour.value_counts().sort_index()
+    weekday = times.dt.day_name().value_counts().reindex(DAY_ORDER).dropna().astype(int)
+    hist_counts, hist_edges = np.histogram(confidence, bins=CONFIDENCE_BINS) if len(confidence) else ([], [])
+
+    return {
+        'daily': daily,
+        'hourly': hourly,
+        'weekday': weekday,
+        'confidence_hist': (np.asarray(hist_counts), np.asarray(hist_edges)),
+        'reviewed': reviewed,
+        'pending': len(_df) - reviewed,
+        'peak_day': weekday.idxmax() if len(weekday) else 'N/A',
+        'peak_hour': int(hourly.idxmax()) if len(hourly) else 0,
+        'high_conf_pct': float((confidence > 80).mean() * 100) if len(confidence) else 0.0,
+    }
+
+def _style_axes(fig, ax, title, xlabel, ylabel, grid_axis='both'):
+    """Dark dashboard styling shared by the bar/line charts"""
+    ax.set_xlabel(xlabel, fontsize=11, color='#ccc')
+    ax.set_ylabel(ylabel, fontsize=11, color='#ccc')
+    ax.set_title(title, fontsize=13, fontweight='bold', color='white', pad=15)
+    ax.grid(True, alpha=0.2, axis=grid_axis, linestyle='--')
+    ax.tick_params(colors='#ccc', labelsize=9)
+    ax.set_facecolor(BACKGROUND)
+    fig.patch.set_facecolor(BACKGROUND)
+
+def _daily_trend(agg):
+    plt = _pyplot()
+    daily = agg['daily']
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.plot(daily.index, daily.values,
+            color='#DC143C', linewidth=2.5, marker='o', markersize=6, markerfacecolor='#DC143C', markeredgecolor='white', markeredgewidth=1.5)
+    ax.fill_between(daily.index, daily.values, alpha=0.2, color='#DC143C')
+    _style_axes(fig, ax, 'Violations Over Time', 'Date', 'Violations')
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    return fig
+
+def _hourly(agg):
+    plt = _pyplot()
+    hourly = agg['hourly']
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.bar(hourly.index, hourly.values,
+           color='#2196F3', edgecolor='#64B5F6', linewidth=1.5, alpha=0.9)
+    _style_axes(fig, ax, 'Violations by Hour of Day', 'Hour (24h)', 'Violations', grid_axis='y')
+    return fig
+
+def _confidence(agg):
+    plt = _pyplot()
+    # Drawn from the pre-computed histogram, not the raw column
+    counts, edges = agg['confidence_hist']
+    fig, ax = plt.subplots(figsize=(10, 5))
+    if len(counts):
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+               color='#4CAF50', edgecolor='#81C784', linewidth=1.5, alpha=0.9)
+    _style_axes(fig, ax, 'Detection Confidence Scores', 'Confidence %', 'Number of Cases', grid_axis='y')
+    return fig
+
+def _status(agg):
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(8, 8))
+    _, _, autotexts = ax.pie(
+        [agg['reviewed'], agg['pending']],
+        labels=['Reviewed', 'Pending'],
+        colors=['#4CAF50', '#FF9800'],
+        autopct='%1.1f%%',
+        startangle=90,
+        textprops={'color': 'white', 'fontsize': 12, 'fontweight': 'bold'},
+        wedgeprops={'edgecolor': BACKGROUND, 'linewidth': 2}
+    )
+    ax.set_title('Case Review Status', fontsize=13, fontweight='bold', color='white', pad=20)
+    ax.set_facecolor(BACKGROUND)
+    fig.patch.set_facecolor(BACKGROUND)
+    # Make percentage text white
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+    return fig
+
+def _weekday(agg):
+    plt = _pyplot()
+    weekday = agg['weekday']
+    fig, ax = plt.subplots(figsize=(12, 5))
+    bars = ax.bar(weekday.index, weekday.values,
+                  color='#FF9800', edgecolor='#FFB74D', linewidth=2, alpha=0.9)
+    _style_axes(fig, ax, 'Violations by Day of Week', 'Day of Week', 'Violations', grid_axis='y')
+    # Add value labels on bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2., height,
+                f'{int(height)}',
+                ha='center', va='bottom', color='white', fontweight='bold', fontsize=10)
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    return fig
+
+CHARTS = {
+    'daily_trend': _daily_trend,
+    'hourly': _hourly,
+    'confidence': _confidence,
+    'status': _status,
+    'weekday': _weekday,
+}
+
+def render_png(chart, agg, dpi=100):
+    """Draw one chart and return it as PNG bytes"""
+    plt = _pyplot()
+    with plt.style.context('dark_background'):
+        fig = CHARTS[chart](agg)
+        fig.tight_layout()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=dpi, facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buffer.getvalue()
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def chart_png(chart, version, _agg, dpi=100):
+    """Cached PNG of one chart for one data version"""
+    return render_png(chart, _agg, dpi)
@@ -0,0 +1,73 @@
+"""
+🧮 CPU THREAD TUNING
+By default torch, OpenCV and the BLAS/OpenMP runtimes each start one thread per
+core in every process; several detection processes on one server then fight
+over the same cores. configure_worker caps those pools and optionally pins the
+process to its own cores
+Call it before the model is loaded (thread pools are sized on first use)
+On Linux an affinity mask belongs to a thread, so pinning applies it to every
+thread the process already has; threads started later inherit it
+ONNX Runtime and OpenVINO size their pools from the cores they can see, so for
+those backends pinning is what limits them
+Find a good setting with: python benchmarks/bench_cpu_scaling.py
+"""
+import os
+
+# Read by OpenMP / MKL / OpenBLAS when they initialise
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+def available_cores():
+    """Cores this process may run on (respects an existing affinity mask)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def plan_cores(workers, threads_per_worker, cores=None):
+    """Disjoint blocks of cores, one per worker (wrapping round if oversubscribed)"""
+    cores = cores or available_cores()
+    return [
+        [cores[(worker * threads_per_worker + i) % len(cores)] for i in range(threads_per_worker)]
+        for worker in range(workers)
+    ]
+
+def pin_process(cores):
+    """Pin all current threads of this process to cores, whichever thread calls it"""
+    try:
+        thread_ids = [int(tid) for tid in os.listdir("/proc/self/task")]
+    except OSError:
+        thread_ids = [0]    # no /proc: the calling thread only
+    for tid in thread_ids:
+        try:
+            os.sched_setaffinity(tid, cores)
+        except ProcessLookupError:
+            pass    # thread exited meanwhile
+
+def configure_worker(threads=None, cores=None):
+    """
+    Limit this process to threads intra-op threads and, if given, pin it to cores
+    Returns what was applied, for logging
+    """
+    applied = {}
+    if cores:
+        if hasattr(os, "sched_setaffinity"):
+            pin_process(cores)
+            applied["cores"] = list(cores)
+        else:
+            print("⚠️ Core pinning is not supported on this platform")
+    if threads:
+        for var in THREAD_ENV_VARS:
+            os.environ[var] = str(threads)
+        import cv2
+        cv2.setNumThreads(threads)
+        try:
+            import torch
+        except ImportError:
+            pass
+        else:
+            torch.set_num_threads(threads)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass    # already fixed once any parallel work has run
+        applied["threads"] = threads
+    return applied
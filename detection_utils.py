@@ -17,6 +17,7 @@ from app_config import (
 )
 from datetime import datetime
 import hashlib
+from evidence_store import save_image
 
 # Production mode - clean output
 DEBUG_MODE = True  # Set False to disable console logs
@@ -24,6 +25,10 @@ DEBUG_MODE = True  # Set False to disable console logs
 # Color for safe riders with helmets
 COLOR_SAFE = (0, 255, 0)  # Green
 
+# Plates are searched in the rider box extended down by this much (px), with this tolerance
+PLATE_ZONE_BELOW = 250
+PLATE_ZONE_TOLERANCE = 80
+
 # ==========================================
 # HELPER FUNCTIONS
 # ==========================================
@@ -290,21 +295,71 @@ def is_duplicate_plate(plate_crop, plate_box, now):
     return False
 
 # ==========================================
-# MAIN DETECTION ENGINE
+# RIDER RULES
 # ==========================================
 
-def process_frame(frame, results, **kwargs):
-    """
-    PRECISION DETECTION PIPELINE
+def find_helmet(rider_box, helmets):
+    """First helmet inside or significantly overlapping the rider, else None"""
+    for helmet_data in helmets:
+        hx1, hy1, hx2, hy2, h_conf = helmet_data
+        helmet_box = (hx1, hy1, hx2, hy2)
+        
+        # Helmet must be inside or significantly overlap rider
+        iou = calculate_iou(helmet_box, rider_box)
+        inside = is_inside(helmet_box, rider_box, tolerance=50)
+        
+        if inside or iou > 0.15:
+            return helmet_data
+    return None
+
+def find_no_helmet(rider_box, no_helmets):
+    """Best-overlapping NO_HELMET detection for the rider, else None"""
+    best_no_helmet = None
+    best_nh_iou = 0.0
     
-    Rules:
-    1. Only process RIDERS (people on motorcycles)
-    2. Check if rider has HELMET → Show GREEN box if yes (SAFE)
-    3. Check if rider has NO_HELMET → Violation if yes
-    4. Find best PLATE image → Save ONE clear image per bike using perceptual hashing
-    """
+    for nh_data in no_helmets:
+        nx1, ny1, nx2, ny2, nh_conf = nh_data
+        nh_box = (nx1, ny1, nx2, ny2)
+        
+        iou = calculate_iou(nh_box, rider_box)
+        inside = is_inside(nh_box, rider_box, tolerance=50)
+        
+        if (inside or iou > 0.1) and iou > best_nh_iou:
+            best_nh_iou = iou
+            best_no_helmet = nh_data
+    return best_no_helmet
+
+def plate_zone(rider_box):
+    """Where a rider's plate can be: the rider box extended down over the bike"""
+    rx1, ry1, rx2, ry2 = rider_box
+    return (rx1, ry1, rx2, ry2 + PLATE_ZONE_BELOW)
+
+def find_best_plate(rider_box, plates):
+    """Plate in the rider's plate zone with the best quality score, else None"""
+    best_plate = None
+    best_plate_score = 0.0
+    ry2 = rider_box[3]
     
-    # === STEP 1: Collect Detections ===
+    for pl_data in plates:
+        px1, py1, px2, py2, pl_conf = pl_data
+        plate_box = (px1, py1, px2, py2)
+        
+        # Calculate plate quality score
+        # Factors: confidence, size, position
+        plate_area = (px2 - px1) * (py2 - py1)
+        
+        if is_inside(plate_box, plate_zone(rider_box), tolerance=PLATE_ZONE_TOLERANCE):
+            # Quality score: confidence * size * position_weight
+            position_score = 1.0 if py1 > ry2 else 0.5  # Prefer plates below rider
+            quality_score = pl_conf * (plate_area / 1000.0) * position_score
+            
+            if quality_score > best_plate_score:
+                best_plate_score = quality_score
+                best_plate = pl_data
+    return best_plate
+
+def split_detections(results):
+    """(riders, helmets, no_helmets, plates) as (x1, y1, x2, y2, conf) tuples"""
     riders = []
     helmets = []
     no_helmets = []
@@ -329,6 +384,25 @@ def process_frame(frame, results, **kwargs):
                 
         except Exception as e:
             continue
+    return riders, helmets, no_helmets, plates
+
+# ==========================================
+# MAIN DETECTION ENGINE
+# ==========================================
+
+def process_frame(frame, results, **kwargs):
+    """
+    PRECISION DETECTION PIPELINE
+    
+    Rules:
+    1. Only process RIDERS (people on motorcycles)
+    2. Check if rider has HELMET → Show GREEN box if yes (SAFE)
+    3. Check if rider has NO_HELMET → Violation if yes
+    4. Find best PLATE image → Save ONE clear image per bike using perceptual hashing
+    """
+    
+    # === STEP 1: Collect Detections ===
+    riders, helmets, no_helmets, plates = split_detections(results)
     
     # === STEP 2: Process Each Rider (Motorcycle Only) ===
     violation_count = 0
@@ -339,24 +413,10 @@ def process_frame(frame, results, **kwargs):
         rider_box = (rx1, ry1, rx2, ry2)
         
         # === CHECK 1: Does rider have HELMET? ===
-        has_helmet = False
-        best_helmet = None
-        
-        for helmet_data in helmets:
-            hx1, hy1, hx2, hy2, h_conf = helmet_data
-            helmet_box = (hx1, hy1, hx2, hy2)
-            
-            # Helmet must be inside or significantly overlap rider
-            iou = calculate_iou(helmet_box, rider_box)
-            inside = is_inside(helmet_box, rider_box, tolerance=50)
-            
-            if inside or iou > 0.15:
-                has_helmet = True
-                best_helmet = helmet_data
-                break
+        best_helmet = find_helmet(rider_box, helmets)
         
         # === SAFE RIDER - Show GREEN box ===
-        if has_helmet:
+        if best_helmet:
             safe_count += 1
             
             # Draw GREEN box around rider only
@@ -370,24 +430,10 @@ def process_frame(frame, results, **kwargs):
             continue  # Skip to next rider
         
         # === CHECK 2: Does rider have NO_HELMET? ===
-        has_no_helmet = False
-        best_no_helmet = None
-        best_nh_iou = 0.0
-        
-        for nh_data in no_helmets:
-            nx1, ny1, nx2, ny2, nh_conf = nh_data
-            nh_box = (nx1, ny1, nx2, ny2)
-            
-            iou = calculate_iou(nh_box, rider_box)
-            inside = is_inside(nh_box, rider_box, tolerance=50)
-            
-            if (inside or iou > 0.1) and iou > best_nh_iou:
-                has_no_helmet = True
-                best_nh_iou = iou
-                best_no_helmet = nh_data
+        best_no_helmet = find_no_helmet(rider_box, no_helmets)
         
         # SKIP if no clear NO_HELMET detection
-        if not has_no_helmet or not best_no_helmet:
+        if not best_no_helmet:
             continue
         
         # === VIOLATION CONFIRMED ===
@@ -404,28 +450,7 @@ def process_frame(frame, results, **kwargs):
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
         # === CHECK 3: Find BEST Plate for This Rider ===
-        best_plate = None
-        best_plate_score = 0.0
-        
-        for pl_data in plates:
-            px1, py1, px2, py2, pl_conf = pl_data
-            plate_box = (px1, py1, px2, py2)
-            
-            # Expand rider box downward (plates at bottom of bike)
-            expanded_rider = (rx1, ry1, rx2, ry2 + 250)
-            
-            # Calculate plate quality score
-            # Factors: confidence, size, position
-            plate_area = (px2 - px1) * (py2 - py1)
-            
-            if is_inside(plate_box, expanded_rider, tolerance=80):
-                # Quality score: confidence * size * position_weight
-                position_score = 1.0 if py1 > ry2 else 0.5  # Prefer plates below rider
-                quality_score = pl_conf * (plate_area / 1000.0) * position_score
-                
-                if quality_score > best_plate_score:
-                    best_plate_score = quality_score
-                    best_plate = pl_data
+        best_plate = find_best_plate(rider_box, plates)
         
         # === SAVE BEST PLATE IMAGE (with duplicate prevention) ===
         if best_plate:
@@ -462,10 +487,9 @@ def process_frame(frame, results, **kwargs):
                         # Save with timestamp
                         timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
                         plate_filename = f"plate_{timestamp_str}_{int(now*1000)%10000}_conf{int(pl_conf*100)}.jpg"
-                        plate_path = os.path.join("violations", plate_filename)
                         
-                        # Save enhanced image
-                        cv2.imwrite(plate_path, enhanced_plate, [cv2.IMWRITE_JPEG_QUALITY, 95])
+                        # Save enhanced image into its date/hash shard
+                        save_image(plate_filename, enhanced_plate, quality=95)
                         
                         # Log to database
                         with open(CSV_FILE, "a", newline="", encoding="utf-8") as f:
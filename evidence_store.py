@@ -0,0 +1,240 @@
+"""
+🗂️ EVIDENCE IMAGE STORE
+Date- and hash-sharded layout: violations/YYYY/MM/DD/ab/<Image_File>
+SQLite manifest (path, size, timestamp, hash) for counts and lookups
+The log keeps referring to images by bare Image_File name
+Run with: python evidence_store.py migrate | rebuild | stats
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from app_config import SAVE_DIR, EVIDENCE_MANIFEST
+
+# plate_YYYYMMDD_HHMMSS_... -> capture time
+_NAME_TIME_RE = re.compile(r"_(\d{8})_(\d{6})")
+
+_schema_ready = False
+
+@contextmanager
+def _manifest():
+    """Short-lived connection; WAL lets the detector write while the UI reads"""
+    global _schema_ready
+    conn = sqlite3.connect(EVIDENCE_MANIFEST, timeout=30)
+    try:
+        if not _schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS images (
+                    name TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    captured TEXT NOT NULL,
+                    sha1 TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_images_captured ON images(captured)")
+            _schema_ready = True
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def capture_time(name, fallback_path=None):
+    """Capture time from the file name, else the file's mtime, else now"""
+    match = _NAME_TIME_RE.search(name)
+    if match:
+        try:
+            return datetime.strptime(match.group(1) + match.group(2), "%Y%m%d%H%M%S")
+        except ValueError:
+            pass
+    if fallback_path and os.path.exists(fallback_path):
+        return datetime.fromtimestamp(os.path.getmtime(fallback_path))
+    return datetime.now()
+
+def shard_dir(name, when):
+    """violations/YYYY/MM/DD/ab - 'ab' spreads a busy day over 256 folders"""
+    bucket = hashlib.sha1(name.encode("utf-8")).hexdigest()[:2]
+    return os.path.join(SAVE_DIR, when.strftime("%Y"), when.strftime("%m"), when.strftime("%d"), bucket)
+
+def _file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _record(conn, name, path, size, when, sha1):
+    conn.execute(
+        "INSERT OR REPLACE INTO images (name, path, size, captured, sha1) VALUES (?, ?, ?, ?, ?)",
+        (name, path, size, when.strftime("%Y-%m-%d %H:%M:%S"), sha1)
+    )
+
+def save_image(name, image, quality=95):
+    """Encode and store a plate image in its shard; returns the path written"""
+    import cv2  # only the detector writes images; readers never need it
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError(f"Could not encode {name}")
+    data = buffer.tobytes()
+
+    when = capture_time(name)
+    folder = shard_dir(name, when)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, name)
+    with open(path, "wb") as f:
+        f.write(data)
+
+    with _manifest() as conn:
+        _record(conn, name, path, len(data), when, hashlib.sha1(data).hexdigest())
+    return path
+
+def register_file(path, conn=None):
+    """Add an existing on-disk file to the manifest"""
+    name = os.path.basename(path)
+    stat = os.stat(path)
+    when = capture_time(name, path)
+    if conn is None:
+        with _manifest() as conn:
+            _record(conn, name, path, stat.st_size, when, _file_sha1(path))
+    else:
+        _record(conn, name, path, stat.st_size, when, _file_sha1(path))
+
+def resolve_image(name):
+    """
+    Path of an evidence image by its Image_File name
+    Falls back to the legacy flat layout for files not yet migrated,
+    then to a restored copy if the image has been archived
+    """
+    if not name or not isinstance(name, str):
+        return os.path.join(SAVE_DIR, str(name))
+    try:
+        with _manifest() as conn:
+            row = conn.execute("SELECT path FROM images WHERE name = ?", (name,)).fetchone()
+        if row:
+            return row[0]
+    except sqlite3.Error as e:
+        print(f"Manifest lookup error: {e}")
+
+    flat_path = os.path.join(SAVE_DIR, name)
+    if os.path.exists(flat_path):
+        return flat_path
+
+    # Imported here: retention depends on this module
+    from retention import restore_to_cache
+    try:
+        restored = restore_to_cache(name)
+    except Exception as e:
+        print(f"Archive restore error for {name}: {e}")
+        restored = None
+    return restored or flat_path
+
+def remove_image(name):
+    """Delete an evidence image and its manifest entry"""
+    path = resolve_image(name)
+    if os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Could not delete {path}: {e}")
+            return False
+    try:
+        with _manifest() as conn:
+            conn.execute("DELETE FROM images WHERE name = ?", (name,))
+    except sqlite3.Error as e:
+        print(f"Manifest delete error: {e}")
+    return True
+
+def images_older_than(cutoff):
+    """[(name, path, captured)] for images captured before cutoff (datetime)"""
+    with _manifest() as conn:
+        return conn.execute(
+            "SELECT name, path, captured FROM images WHERE captured < ?",
+            (cutoff.strftime("%Y-%m-%d %H:%M:%S"),)
+        ).fetchall()
+
+def count_images():
+    """Number of stored evidence images, from the manifest"""
+    try:
+        with _manifest() as conn:
+            return conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+    except sqlite3.Error:
+        return 0
+
+def storage_stats():
+    """(image count, total bytes) from the manifest"""
+    try:
+        with _manifest() as conn:
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM images").fetchone()
+            return count, total
+    except sqlite3.Error:
+        return 0, 0
+
+def migrate_flat_files():
+    """
+    Move images from the flat violations/ folder into shards
+    Image_File names do not change, so the log needs no rewrite
+    """
+    moved = 0
+    with _manifest() as conn:
+        for entry in os.scandir(SAVE_DIR):
+            if not entry.is_file() or not entry.name.lower().endswith((".jpg", ".jpeg", ".png")):
+                continue
+            when = capture_time(entry.name, entry.path)
+            folder = shard_dir(entry.name, when)
+            os.makedirs(folder, exist_ok=True)
+            target = os.path.join(folder, entry.name)
+            os.replace(entry.path, target)
+            register_file(target, conn)
+            moved += 1
+            if moved % 1000 == 0:
+                conn.commit()
+                print(f"   ... {moved:,} images migrated")
+    return moved
+
+_layout_checked = False
+
+def ensure_layout():
+    """Once per process: move any flat-layout images into shards"""
+    global _layout_checked
+    if _layout_checked:
+        return
+    _layout_checked = True
+    try:
+        moved = migrate_flat_files()
+        if moved:
+            print(f"✅ Migrated {moved:,} evidence images into sharded folders")
+    except Exception as e:
+        print(f"⚠️ Evidence migration failed: {e}")
+
+def rebuild_manifest():
+    """Re-index every sharded image (e.g. after restoring a backup)"""
+    indexed = 0
+    with _manifest() as conn:
+        conn.execute("DELETE FROM images")
+        for year in sorted(os.listdir(SAVE_DIR)):
+            year_dir = os.path.join(SAVE_DIR, year)
+            if not (year.isdigit() and os.path.isdir(year_dir)):
+                continue
+            for root, _, files in os.walk(year_dir):
+                for name in files:
+                    if name.lower().endswith((".jpg", ".jpeg", ".png")):
+                        register_file(os.path.join(root, name), conn)
+                        indexed += 1
+    return indexed
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if command == "migrate":
+        print(f"✅ Migrated {migrate_flat_files():,} images into shards")
+    elif command == "rebuild":
+        print(f"✅ Indexed {rebuild_manifest():,} images")
+    elif command == "stats":
+        count, total = storage_stats()
+        print(f"📊 {count:,} images, {total / (1024 * 1024):.1f} MB")
+    else:
+        print("Usage: python evidence_store.py migrate | rebuild | stats")
+        sys.exit(1)
@@ -0,0 +1,38 @@
+"""
+📤 MODEL EXPORT
+Converts the PyTorch detector into the faster CPU formats in inference_backends
+Run with: python export_model.py [--backend onnx openvino] [--imgsz 640]
+Then check the exported model: python benchmarks/check_backend_parity.py
+"""
+import argparse
+import sys
+import time
+from app_config import MODEL_PATH, MODEL_IMGSZ
+from inference_backends import BACKENDS, export_model
+
+def main(argv=None):
+    exportable = [name for name, fmt in BACKENDS.items() if fmt]
+    parser = argparse.ArgumentParser(description="Export the detection model for ONNX Runtime / OpenVINO")
+    parser.add_argument("--backend", nargs="+", choices=exportable, default=["onnx"])
+    parser.add_argument("--model", default=MODEL_PATH, help="PyTorch weights to export")
+    parser.add_argument("--imgsz", type=int, default=MODEL_IMGSZ, help="export (and calibration) input size")
+    parser.add_argument("--static", action="store_true",
+                        help="fixed batch of 1 at --imgsz: no batching, and imgsz changes (cascade, adaptive skip, tiling) are ignored")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for backend in args.backend:
+        start = time.perf_counter()
+        try:
+            path = export_model(backend, args.model, args.imgsz, dynamic=not args.static)
+        except Exception as e:
+            print(f"❌ {backend}: {e}")
+            failed += 1
+            continue
+        print(f"✅ {backend}: {path} ({time.perf_counter() - start:.1f} s)")
+    if failed < len(args.backend):
+        print("Set INFERENCE_BACKEND in app_config.py to use an exported model")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
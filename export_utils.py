@@ -0,0 +1,111 @@
+"""
+📦 COURT SUBMISSION EXPORT
+Streams selected fine PDFs, their plate images and a CSV manifest into one ZIP
+Files are copied in chunks - nothing is loaded whole into memory
+Run with: python export_utils.py [--out FILE] [--no-images] [PDF_NAME ...]
+"""
+import argparse
+import csv
+import io
+import os
+import shutil
+import sys
+import zipfile
+from datetime import datetime
+from app_config import ARCHIVE_DIR, EXPORT_DIR
+from evidence_store import resolve_image
+import fines_index
+import retention
+
+MANIFEST_FIELDS = ["pdf_name", "case_id", "plate", "created", "image_file", "pdf_included", "image_included"]
+
+def _add_file(zf, path, arcname):
+    """Copy a file on disk into the archive; PDFs and JPEGs are stored as-is"""
+    zf.write(path, arcname=arcname, compress_type=zipfile.ZIP_STORED)
+
+def _add_archived(zf, name, arcname):
+    """Copy a file out of a retention shard without extracting it first"""
+    location = retention.archived_location(name)
+    if location is None:
+        return False
+    with zipfile.ZipFile(os.path.join(ARCHIVE_DIR, location[1])) as shard:
+        with shard.open(name) as src, zf.open(arcname, "w", force_zip64=True) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+    return True
+
+def write_fines_zip(fines, fileobj, include_images=True):
+    """
+    Write fines (rows from fines_index.get_fines) to fileobj as a ZIP
+    Returns the manifest rows
+    """
+    manifest = []
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        for fine in fines:
+            entry = {field: fine.get(field) or "" for field in MANIFEST_FIELDS}
+            pdf_arcname = f"pdfs/{fine['pdf_name']}"
+            try:
+                if fine['path'].startswith("archive:"):
+                    entry["pdf_included"] = _add_archived(zf, fine['pdf_name'], pdf_arcname)
+                elif os.path.exists(fine['path']):
+                    _add_file(zf, fine['path'], pdf_arcname)
+                    entry["pdf_included"] = True
+                else:
+                    entry["pdf_included"] = False
+            except (OSError, KeyError, zipfile.BadZipFile) as e:
+                print(f"⚠️ Could not export {fine['pdf_name']}: {e}")
+                entry["pdf_included"] = False
+
+            entry["image_included"] = False
+            if include_images and fine.get('image_file'):
+                # Archived images are restored to the local cache on demand
+                image_path = resolve_image(fine['image_file'])
+                if image_path and os.path.exists(image_path):
+                    _add_file(zf, image_path, f"images/{fine['image_file']}")
+                    entry["image_included"] = True
+
+            manifest.append(entry)
+
+        # Written last so it reflects what actually made it into the bundle
+        with zf.open("manifest.csv", "w") as raw:
+            with io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+                writer.writeheader()
+                writer.writerows(manifest)
+
+    return manifest
+
+def export_fines(pdf_names=None, out_path=None, include_images=True):
+    """
+    Build a court bundle for the named fines (all fines when None)
+    Returns (zip path, manifest rows)
+    """
+    if out_path is None:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        out_path = os.path.join(EXPORT_DIR, f"COURT_EXPORT_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            manifest = write_fines_zip(fines_index.get_fines(pdf_names), f, include_images)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return out_path, manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bundle fine PDFs and evidence for court submission")
+    parser.add_argument("pdf_names", nargs="*", help="fine PDFs to include (default: all)")
+    parser.add_argument("--out", help="ZIP file to write")
+    parser.add_argument("--no-images", action="store_true", help="leave out plate images")
+    args = parser.parse_args(argv)
+
+    out_path, manifest = export_fines(args.pdf_names or None, args.out, not args.no_images)
+    missing = sum(1 for entry in manifest if not entry["pdf_included"])
+    print(f"✅ Exported {len(manifest) - missing:,} fines to {out_path}")
+    if missing:
+        print(f"⚠️ {missing:,} PDFs could not be found (see manifest.csv)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+📇 FINES INDEX
+SQLite ledger of generated fine PDFs (fines/fines_index.db)
+Links each PDF to its case, plate and evidence image
+path is the file in fines/, "archive:<shard>" once archived, or
+"unsaved:<name>" for fines issued with SAVE_FINE_PDFS off (metadata only)
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from app_config import FINES_DIR, FINES_INDEX_DB
+
+_FIELDS = "pdf_name, path, case_id, plate, image_file, created, size, occurrence_date, input_hash, version, previous"
+_PLACEHOLDERS = ", ".join("?" * len(_FIELDS.split(",")))
+_LATER_COLUMNS = [
+    ("occurrence_date", "TEXT"),
+    ("input_hash", "TEXT"),
+    ("version", "INTEGER"),
+    ("previous", "TEXT"),   # pdf_name of the version this one replaced
+]
+# FINE_<case>_<timestamp>.pdf (older files) or FINE_<case>_<input hash>.pdf
+_FILENAME_RE = re.compile(r"^FINE_([^_]+)_.+\.pdf$")
+
+_schema_ready = False
+_reconciled = False
+
+@contextmanager
+def _index():
+    """Short-lived connection to the fines index"""
+    global _schema_ready
+    os.makedirs(FINES_DIR, exist_ok=True)
+    conn = sqlite3.connect(FINES_INDEX_DB, timeout=30)
+    try:
+        if not _schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            # One process at a time, so parallel workers cannot both add a column
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fines (
+                    pdf_name TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    case_id TEXT,
+                    plate TEXT,
+                    image_file TEXT,
+                    created TEXT NOT NULL,
+                    size INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Columns added after the first release
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(fines)")}
+            for column, decl in _LATER_COLUMNS:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE fines ADD COLUMN {column} {decl}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_fines_image ON fines(image_file)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_fines_created ON fines(created)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_fines_case ON fines(case_id, input_hash)")
+            # One row per violation; the sequence number is its case/trace number
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cases (
+                    case_no INTEGER PRIMARY KEY AUTOINCREMENT,
+                    case_key TEXT NOT NULL UNIQUE,
+                    case_id TEXT UNIQUE,
+                    trace_no TEXT UNIQUE
+                )
+            """)
+            _adopt_legacy_cases(conn)
+            # End the setup transaction before callers begin their own
+            conn.commit()
+            _schema_ready = True
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def _adopt_legacy_cases(conn):
+    """
+    Keep the case IDs of fines issued before the cases table existed
+    (hash-derived: 1 + 9 digits, trace = its last 6). Where two images shared
+    an ID the first keeps it; the other gets a fresh one on its next fine
+    """
+    rows = conn.execute(
+        "SELECT image_file, case_id FROM fines WHERE image_file IS NOT NULL AND case_id LIKE '1_________' "
+        "AND image_file NOT IN (SELECT case_key FROM cases) GROUP BY image_file ORDER BY MIN(created)"
+    ).fetchall()
+    for image_file, case_id in rows:
+        conn.execute(
+            "INSERT OR IGNORE INTO cases (case_key, case_id, trace_no) VALUES (?, ?, ?)",
+            (image_file, case_id, case_id[-6:])
+        )
+
+def case_key(row):
+    """
+    What identifies a violation in the log: its evidence image, or - for rows
+    without one - the detection time, source and confidence
+    """
+    image_file = row.get('Image_File')
+    if isinstance(image_file, str) and image_file.strip() not in ("", "NO_PLATE"):
+        return os.path.basename(image_file.strip())
+    return "row:" + "|".join(str(row.get(column, "")) for column in ("Time", "Source", "Detection_Confidence"))
+
+def case_identity(row):
+    """
+    (case_id, trace_no) of a violation log row, allocated once from a persisted
+    sequence - unique, and stable across deletes and reordering of the log
+    New numbers (2 + 9 digits, 7-digit trace) never clash with legacy ones
+    """
+    key = case_key(row)
+    with _index() as conn:
+        # Write lock before the lookup, so concurrent callers cannot both allocate
+        conn.execute("BEGIN IMMEDIATE")
+        found = conn.execute("SELECT case_no, case_id, trace_no FROM cases WHERE case_key = ?", (key,)).fetchone()
+        if found is None:
+            found = (conn.execute("INSERT INTO cases (case_key) VALUES (?)", (key,)).lastrowid, None, None)
+        case_no, case_id, trace_no = found
+        if case_id is None:
+            case_id, trace_no = f"2{case_no:09d}", f"{case_no:07d}"
+            conn.execute("UPDATE cases SET case_id = ?, trace_no = ? WHERE case_no = ?", (case_id, trace_no, case_no))
+    return case_id, trace_no
+
+def fine_input_hash(violation_data):
+    """
+    SHA-256 of everything that ends up on the notice
+    The plate image counts by file name, so moving it to an archive shard does not matter
+    """
+    fields = dict(violation_data)
+    if fields.get('plate_image_path'):
+        fields['plate_image_path'] = os.path.basename(fields['plate_image_path'])
+    payload = json.dumps(fields, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def find_fine(case_id, input_hash):
+    """Index row of an identical, already generated fine, or None"""
+    with _index() as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(
+            f"SELECT {_FIELDS} FROM fines WHERE case_id = ? AND input_hash = ?",
+            (str(case_id), input_hash)
+        ).fetchone()
+    return dict(row) if row else None
+
+def fine_history(case_id):
+    """All versions of a case's fine, newest first"""
+    with _index() as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            f"SELECT {_FIELDS} FROM fines WHERE case_id = ? ORDER BY COALESCE(version, 1) DESC, created DESC",
+            (str(case_id),)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+def record_fine(pdf_path, violation_data, input_hash=None, size=None):
+    """
+    Add a freshly generated PDF to the index
+    A new input hash for a known case becomes the next version, linked to the latest one
+    size: bytes of the rendered PDF when pdf_path is not a file on disk
+    """
+    image_path = violation_data.get('plate_image_path')
+    case_id = str(violation_data.get('case_id', ''))
+    # "unsaved:<name>" entries keep the plain name, so saving the file later replaces them
+    pdf_name = os.path.basename(pdf_path.split("unsaved:", 1)[-1])
+    try:
+        with _index() as conn:
+            current = conn.execute(
+                "SELECT version, previous FROM fines WHERE pdf_name = ?", (pdf_name,)
+            ).fetchone()
+            if current is not None:
+                # Same file written again - keep its place in the history
+                version, previous = current
+            else:
+                latest = conn.execute(
+                    "SELECT pdf_name, COALESCE(version, 1) FROM fines WHERE case_id = ? "
+                    "ORDER BY COALESCE(version, 1) DESC, created DESC LIMIT 1",
+                    (case_id,)
+                ).fetchone()
+                version, previous = (latest[1] + 1, latest[0]) if latest else (1, None)
+            conn.execute(
+                f"INSERT OR REPLACE INTO fines ({_FIELDS}) VALUES ({_PLACEHOLDERS})",
+                (
+                    pdf_name,
+                    pdf_path,
+                    case_id,
+                    violation_data.get('vehicle_reg_no', ''),
+                    os.path.basename(image_path) if image_path else None,
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    size if size is not None else (os.path.getsize(pdf_path) if os.path.exists(pdf_path) else 0),
+                    violation_data.get('occurrence_date'),
+                    input_hash,
+                    version,
+                    previous,
+                )
+            )
+    except sqlite3.Error as e:
+        print(f"Fines index error: {e}")
+
+def get_fines(pdf_names=None):
+    """Index rows as dicts, newest first; all fines when pdf_names is None"""
+    query = f"SELECT {_FIELDS} FROM fines"
+    params = ()
+    if pdf_names is not None:
+        pdf_names = list(pdf_names)
+        if not pdf_names:
+            return []
+        query += f" WHERE pdf_name IN ({','.join('?' * len(pdf_names))})"
+        params = pdf_names
+    with _index() as conn:
+        conn.row_factory = sqlite3.Row
+        return [dict(row) for row in conn.execute(query + " ORDER BY created DESC", params)]
+
+def search_fines(query="", limit=20, offset=0):
+    """
+    One page of fines matching query (case id, plate, file name or dates)
+    Returns (rows, total matches)
+    """
+    where = ""
+    params = []
+    if query:
+        where = " WHERE case_id LIKE ? OR plate LIKE ? OR pdf_name LIKE ? OR occurrence_date LIKE ? OR created LIKE ?"
+        params = [f"%{query.strip()}%"] * 5
+    with _index() as conn:
+        conn.row_factory = sqlite3.Row
+        total = conn.execute(f"SELECT COUNT(*) FROM fines{where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {_FIELDS} FROM fines{where} ORDER BY created DESC, pdf_name DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+    return [dict(row) for row in rows], total
+
+def read_fine(pdf_name):
+    """Bytes of a fine PDF from fines/ or its archive shard; None if gone or never kept"""
+    with _index() as conn:
+        row = conn.execute("SELECT path FROM fines WHERE pdf_name = ?", (pdf_name,)).fetchone()
+    if row is None:
+        return None
+    if row[0].startswith("archive:"):
+        # Imported here: retention depends on this module
+        from retention import read_archived
+        return read_archived(pdf_name)
+    if not os.path.exists(row[0]):
+        return None
+    with open(row[0], 'rb') as f:
+        return f.read()
+
+def delete_fine(pdf_name):
+    """Delete a fine PDF from disk and drop it from the index"""
+    with _index() as conn:
+        row = conn.execute("SELECT path FROM fines WHERE pdf_name = ?", (pdf_name,)).fetchone()
+        if row is not None and not row[0].startswith("archive:") and os.path.exists(row[0]):
+            os.remove(row[0])
+        conn.execute("DELETE FROM fines WHERE pdf_name = ?", (pdf_name,))
+
+def reconcile(folder=FINES_DIR):
+    """
+    Sync the index with fines/: add untracked FINE_*.pdf files, drop entries
+    whose file is gone. Returns (added, removed)
+    """
+    on_disk = {}
+    if os.path.isdir(folder):
+        for entry in os.scandir(folder):
+            if entry.is_file() and entry.name.startswith("FINE_") and entry.name.endswith(".pdf"):
+                on_disk[entry.name] = entry
+
+    with _index() as conn:
+        indexed = dict(conn.execute(
+            "SELECT pdf_name, path FROM fines WHERE path NOT LIKE 'archive:%' AND path NOT LIKE 'unsaved:%'"
+        ))
+        removed = [name for name, path in indexed.items() if not os.path.exists(path)]
+        conn.executemany("DELETE FROM fines WHERE pdf_name = ?", [(name,) for name in removed])
+
+        added = []
+        for name, entry in on_disk.items():
+            if name in indexed:
+                continue
+            stat = entry.stat()
+            match = _FILENAME_RE.match(name)
+            added.append((
+                name,
+                os.path.join(folder, name),
+                match.group(1) if match else "",
+                None,
+                None,
+                datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S"),
+                stat.st_size,
+                None,
+                None,
+                None,
+                None,
+            ))
+        conn.executemany(f"INSERT OR IGNORE INTO fines ({_FIELDS}) VALUES ({_PLACEHOLDERS})", added)
+    return len(added), len(removed)
+
+def ensure_reconciled():
+    """Reconcile once per process (picks up PDFs made before the index existed)"""
+    global _reconciled
+    if not _reconciled:
+        reconcile()
+        _reconciled = True
+
+def fined_image_files():
+    """Image_File names that have at least one fine PDF"""
+    with _index() as conn:
+        return {row[0] for row in conn.execute("SELECT DISTINCT image_file FROM fines WHERE image_file IS NOT NULL")}
+
+def fines_older_than(cutoff):
+    """[(pdf_name, path)] for fines created before cutoff (datetime)"""
+    with _index() as conn:
+        return conn.execute(
+            "SELECT pdf_name, path FROM fines WHERE created < ?",
+            (cutoff.strftime("%Y-%m-%d %H:%M:%S"),)
+        ).fetchall()
+
+def set_path(pdf_name, path):
+    """Point an index entry at a new location (e.g. an archive shard)"""
+    with _index() as conn:
+        conn.execute("UPDATE fines SET path = ? WHERE pdf_name = ?", (path, pdf_name))
+
+def count_fines():
+    """Number of indexed fines, archived ones included"""
+    with _index() as conn:
+        return conn.execute("SELECT COUNT(*) FROM fines").fetchone()[0]
+
+def total_size():
+    """Bytes of fine PDFs still on disk in fines/"""
+    with _index() as conn:
+        return conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM fines WHERE path NOT LIKE 'archive:%' AND path NOT LIKE 'unsaved:%'"
+        ).fetchone()[0]
@@ -1,103 +1,287 @@
 """
 CSV Recovery Tool
-Fixes corrupted violations.csv file by removing bad rows
-Run with: python fix_csv.py
+Validates and repairs violations.csv in a single streaming pass
+Run with: python fix_csv.py [--check-only] [--chunk-size N] [--report FILE]
 """
+import argparse
 import csv
+import itertools
 import os
+import re
+import shutil
+import sys
+import tempfile
+from collections import Counter
 from datetime import datetime
 
 CSV_FILE = "violations.csv"
-BACKUP_FILE = f"violations_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-
-def fix_csv():
-    """Fix corrupted CSV by removing invalid rows"""
-    
-    if not os.path.exists(CSV_FILE):
-        print(f"❌ {CSV_FILE} not found!")
-        return
-    
-    # Backup original file
+IMAGE_DIR = "violations"
+EXPECTED_HEADER = ["Time", "Plate_Number", "Detection_Confidence", "Source", "Image_File"]
+TIME_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+DEFAULT_CHUNK_SIZE = 50_000
+MAX_PRINTED_ISSUES = 20
+
+def list_images(image_dir):
+    """Names of all evidence images on disk (flat or sharded layout)"""
+    names = set()
+    if not os.path.isdir(image_dir):
+        return names
+    for _, _, files in os.walk(image_dir):
+        for name in files:
+            if name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                names.add(name)
+    return names
+
+def list_archived_images():
+    """Names of evidence images packed into archive shards by retention.py"""
     try:
-        with open(CSV_FILE, 'r', encoding='utf-8') as f:
-            content = f.read()
-        with open(BACKUP_FILE, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f"✅ Backup created: {BACKUP_FILE}")
-    except Exception as e:
-        print(f"⚠️ Could not create backup: {e}")
-    
-    # Read and fix
-    valid_rows = []
-    invalid_count = 0
-    
+        from retention import archived_names
+    except ImportError as e:
+        print(f"⚠️ Archive index not checked: {e}")
+        return set()
+    return archived_names("image")
+
+def quarantine_path(csv_file):
+    """Where rows that cannot be kept in the log are set aside"""
+    return f"{os.path.splitext(csv_file)[0]}_quarantine.csv"
+
+def append_quarantine(path, rows):
+    """Append set-aside rows (with their line and reason) to the quarantine file"""
+    new_file = not os.path.exists(path)
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(EXPECTED_HEADER + ["Line", "Issue", "Quarantined"])
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+
+def is_valid_time(value):
+    """Exact 'YYYY-MM-DD HH:MM:SS' with a real calendar date"""
+    if not isinstance(value, str) or not TIME_PATTERN.match(value):
+        return False
+    try:
+        # Much faster than strptime once the shape is known
+        datetime.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+def is_number(value):
     try:
-        with open(CSV_FILE, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            
-            # Expected header
-            expected_header = ["Time", "Plate_Number", "Detection_Confidence", "Source", "Image_File"]
-            
-            print(f"\n📋 Original file has {len(lines)} lines")
-            
-            for i, line in enumerate(lines):
-                # Keep header
-                if i == 0:
-                    valid_rows.append(expected_header)
-                    continue
-                
-                try:
-                    # Try to parse the line
-                    parts = line.strip().split(',')
-                    
-                    # Expected: Time, Plate_Number, Detection_Confidence, Source, Image_File
-                    if len(parts) == 5:
-                        valid_rows.append(parts)
-                    elif len(parts) > 5:
-                        # Too many fields - probably comma in plate number
-                        # Try to reconstruct
-                        time = parts[0]
-                        image_file = parts[-1]
-                        source = parts[-2]
-                        confidence = parts[-3]
-                        # Everything in between is the plate number
-                        plate_number = ','.join(parts[1:-3])
-                        
-                        valid_rows.append([time, plate_number, confidence, source, image_file])
-                        print(f"⚠️ Line {i+1}: Fixed extra commas")
-                    elif len(parts) < 5:
-                        # Too few fields - might be missing data
-                        # Pad with empty strings
-                        while len(parts) < 5:
-                            parts.append('')
-                        valid_rows.append(parts)
-                        print(f"⚠️ Line {i+1}: Added missing fields")
-                    
-                except Exception as e:
-                    invalid_count += 1
-                    print(f"❌ Line {i+1}: Skipped (invalid) - {str(e)[:50]}")
-                    continue
-        
-        # Write fixed CSV
-        with open(CSV_FILE, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerows(valid_rows)
-        
-        print(f"\n✅ Fixed CSV saved!")
-        print(f"   - Valid rows: {len(valid_rows) - 1}")  # -1 for header
-        print(f"   - Invalid rows skipped: {invalid_count}")
-        print(f"   - Backup saved as: {BACKUP_FILE}")
-        
-        if invalid_count > 0:
-            print(f"\n⚠️ {invalid_count} rows were corrupted and removed")
-            print(f"   Check {BACKUP_FILE} if you need to recover data")
-        
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def repair_row(parts):
+    """
+    Fit a parsed row to the 5-column schema
+    Returns (row, list of repair notes)
+    """
+    notes = []
+    if len(parts) > 5:
+        # Unquoted commas in the plate number - everything in between is the plate
+        parts = [parts[0], ','.join(parts[1:-3]), parts[-3], parts[-2], parts[-1]]
+        notes.append("extra_fields")
+    elif len(parts) < 5:
+        parts = parts + [''] * (5 - len(parts))
+        notes.append("missing_fields")
+    return [p.strip() for p in parts], notes
+
+class IssueReport:
+    """Streams per-row issues to an optional CSV report and keeps counts"""
+
+    def __init__(self, path=None):
+        self.counts = Counter()
+        self.printed = 0
+        self._file = open(path, 'w', newline='', encoding='utf-8') if path else None
+        self._writer = csv.writer(self._file) if self._file else None
+        if self._writer:
+            self._writer.writerow(["Line", "Issue", "Detail"])
+
+    def add(self, line_no, issue, detail=""):
+        self.counts[issue] += 1
+        if self._writer:
+            self._writer.writerow([line_no, issue, detail])
+        if self.printed < MAX_PRINTED_ISSUES:
+            where = f"Line {line_no}" if line_no else "Images"
+            print(f"⚠️ {where}: {issue} {detail}".rstrip())
+            self.printed += 1
+            if self.printed == MAX_PRINTED_ISSUES:
+                print("   ... further issues only counted (see report)")
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+def process_chunk(rows, first_line, report, images, archived, orphans, quarantined):
+    """
+    Validate and repair one chunk; returns the rows to keep
+    Rows that cannot stay in the log are appended to quarantined, never dropped
+    """
+    kept = []
+    for offset, parts in enumerate(rows):
+        line_no = first_line + offset
+
+        if not parts or all(not p.strip() for p in parts):
+            report.add(line_no, "blank_row")
+            continue
+
+        row, notes = repair_row(parts)
+        for note in notes:
+            report.add(line_no, note)
+
+        time_str, _, confidence, _, image_file = row
+
+        if not is_valid_time(time_str):
+            # Without a valid time the case cannot be dated or fined - set it aside for review
+            report.add(line_no, "bad_timestamp", repr(time_str)[:40])
+            quarantined.append(row + [line_no, "bad_timestamp", datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+            continue
+
+        if confidence and not is_number(confidence):
+            report.add(line_no, "non_numeric_confidence", repr(confidence)[:40])
+            row[2] = ''
+
+        if image_file and image_file != "NO_PLATE":
+            if image_file in images:
+                orphans.discard(image_file)
+            elif image_file not in archived:
+                report.add(line_no, "missing_image", image_file)
+
+        kept.append(row)
+    return kept
+
+def fix_csv(csv_file=CSV_FILE, image_dir=IMAGE_DIR, chunk_size=DEFAULT_CHUNK_SIZE,
+            report_path=None, check_only=False, backup=True):
+    """
+    Validate (and unless check_only, repair) the violation log
+    Memory use is bounded by chunk_size rows plus the sets of image names
+    Rows with a bad timestamp are moved to <log>_quarantine.csv
+    """
+    if not os.path.exists(csv_file):
+        print(f"❌ {csv_file} not found!")
+        return None
+
+    if backup and not check_only:
+        backup_file = f"{os.path.splitext(csv_file)[0]}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        try:
+            shutil.copyfile(csv_file, backup_file)
+            print(f"✅ Backup created: {backup_file}")
+        except Exception as e:
+            print(f"⚠️ Could not create backup: {e}")
+
+    images = list_images(image_dir)
+    # Archived images are evidence too; orphans are only looked for on disk
+    archived = list_archived_images()
+    orphans = set(images)
+    quarantined = []
+    quarantine_file = quarantine_path(csv_file)
+    report = IssueReport(report_path)
+    total_rows = 0
+    kept_rows = 0
+    quarantine_count = 0
+
+    out_file = None
+    tmp_path = None
+    try:
+        if not check_only:
+            out_dir = os.path.dirname(os.path.abspath(csv_file))
+            fd, tmp_path = tempfile.mkstemp(prefix=".violations_", suffix=".tmp", dir=out_dir)
+            out_file = os.fdopen(fd, 'w', newline='', encoding='utf-8')
+            writer = csv.writer(out_file)
+            writer.writerow(EXPECTED_HEADER)
+
+        with open(csv_file, 'r', newline='', encoding='utf-8', errors='ignore') as f:
+            reader = csv.reader(f)
+            line_no = 1
+
+            header = next(reader, None)
+            if header is not None and [h.strip() for h in header] != EXPECTED_HEADER:
+                if header and is_valid_time(header[0].strip()):
+                    # No header at all - first line is data
+                    reader = itertools.chain([header], reader)
+                    line_no = 0
+                else:
+                    report.add(1, "bad_header", ','.join(header)[:60])
+
+            while True:
+                chunk = list(itertools.islice(reader, chunk_size))
+                if not chunk:
+                    break
+                kept = process_chunk(chunk, line_no + 1, report, images, archived, orphans, quarantined)
+                if out_file:
+                    writer.writerows(kept)
+                    if quarantined:
+                        # Before the log is swapped: a crash can duplicate a row, never lose it
+                        append_quarantine(quarantine_file, quarantined)
+                quarantine_count += len(quarantined)
+                quarantined.clear()
+                total_rows += len(chunk)
+                kept_rows += len(kept)
+                line_no += len(chunk)
+                print(f"   ... {total_rows:,} rows checked")
+
+        for name in sorted(orphans):
+            report.add(0, "orphan_image", name)
+
+        if out_file:
+            out_file.flush()
+            os.fsync(out_file.fileno())
+            out_file.close()
+            out_file = None
+            shutil.copymode(csv_file, tmp_path)
+            # Atomic swap - readers see either the old or the repaired log
+            os.replace(tmp_path, csv_file)
+            tmp_path = None
+
     except Exception as e:
         print(f"\n❌ Error fixing CSV: {e}")
-        print(f"   Restore from backup: {BACKUP_FILE}")
+        print(f"   {csv_file} was left unchanged")
+        return None
+
+    finally:
+        if out_file:
+            out_file.close()
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        report.close()
+
+    print(f"\n{'🔍 Check' if check_only else '✅ Repair'} complete!")
+    print(f"   - Rows checked: {total_rows:,}")
+    print(f"   - Rows kept: {kept_rows:,}")
+    print(f"   - Rows {'to quarantine' if check_only else 'quarantined'}: {quarantine_count:,}"
+          + (f" ({quarantine_file})" if quarantine_count and not check_only else ""))
+    print(f"   - Rows dropped (blank): {total_rows - kept_rows - quarantine_count:,}")
+    for issue, count in report.counts.most_common():
+        print(f"   - {issue}: {count:,}")
+    if report_path:
+        print(f"   - Full report: {report_path}")
+
+    return report.counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and repair the violation log")
+    parser.add_argument("--csv", default=CSV_FILE, help="violation log to check")
+    parser.add_argument("--images", default=IMAGE_DIR, help="evidence image folder")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per chunk")
+    parser.add_argument("--report", help="write every issue to this CSV file")
+    parser.add_argument("--check-only", action="store_true", help="report issues without rewriting")
+    parser.add_argument("--no-backup", action="store_true", help="skip the backup copy")
+    args = parser.parse_args(argv)
+
+    counts = fix_csv(
+        csv_file=args.csv,
+        image_dir=args.images,
+        chunk_size=args.chunk_size,
+        report_path=args.report,
+        check_only=args.check_only,
+        backup=not args.no_backup,
+    )
+    return 0 if counts is not None else 1
 
 if __name__ == "__main__":
     print("🔧 CSV Recovery Tool")
     print("=" * 50)
-    fix_csv()
-    print("\n✅ Done! Try running review_violations.py now")
\ No newline at end of file
+    sys.exit(main())
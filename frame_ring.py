@@ -0,0 +1,228 @@
+"""
+🎞️ SHARED-MEMORY FRAME RING
+Preallocated frame slots in one shared memory block, so decoded frames move
+between processes by slot index instead of being pickled
+The producer acquires a free slot, decodes straight into it and publishes it
+with the number of stages that will read it; each stage releases the slot
+when done and the last release returns it to the free pool
+"""
+import multiprocessing as mp
+import queue
+from multiprocessing import shared_memory
+import numpy as np
+from app_config import DECODE_PROCESS, FRAME_RING_SLOTS
+
+class FrameRing:
+    """
+    Reference-counted frame slots of one fixed shape
+    Create in the parent and pass to worker processes as Process arguments
+    """
+
+    def __init__(self, slots, shape, dtype=np.uint8, ctx=mp):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slot_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+        self._owner = True
+        self._refs = ctx.Array('i', slots, lock=False)  # 0 = free
+        self._lock = ctx.Lock()
+        self._free = ctx.Semaphore(slots)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_shm"] = self._shm.name
+        state["_owner"] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._shm = _attach(state["_shm"])
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def view(self, slot):
+        """The slot as an ndarray - no copy; valid until the slot is released"""
+        return np.ndarray(self.shape, self.dtype, buffer=self._shm.buf, offset=slot * self.slot_bytes)
+
+    def acquire(self, timeout=None):
+        """Reserve a free slot for writing; None if none frees up within timeout"""
+        if not self._free.acquire(timeout=timeout):
+            return None
+        with self._lock:
+            for slot in range(self.slots):
+                if self._refs[slot] == 0:
+                    self._refs[slot] = 1    # held by the writer until published
+                    return slot
+        raise RuntimeError("Frame ring semaphore and reference counts disagree")
+
+    def publish(self, slot, readers):
+        """Hand a written slot to readers stages; each must call release once"""
+        with self._lock:
+            self._refs[slot] = readers
+        if readers == 0:
+            self._free.release()
+
+    def release(self, slot):
+        """One stage is done with the slot; the last one frees it"""
+        with self._lock:
+            self._refs[slot] -= 1
+            freed = self._refs[slot] == 0
+        if freed:
+            self._free.release()
+
+    def in_use(self):
+        with self._lock:
+            return sum(1 for ref in self._refs if ref)
+
+    def close(self):
+        """Detach (and, in the creating process, free) the shared memory"""
+        try:
+            self._shm.close()
+        except BufferError:
+            pass    # a view is still alive; the mapping goes with the process
+        if self._owner:
+            self._shm.unlink()
+            self._owner = False
+
+def _attach(name):
+    """Open an existing block without the resource tracker unlinking it on exit"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers every attach; only the creator should clean up.
+        # Skip the registration rather than undo it: a spawned child shares the
+        # parent's tracker, where unregistering would drop the creator's entry
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+# ==========================================
+# VIDEO DECODING
+# ==========================================
+
+def decode_to_ring(video_path, ring, out_queues, frame_skip=1, readers=1):
+    """
+    Decoder process: every frame_skip-th frame is decoded into a ring slot
+    (frame_skip may be a shared mp.Value the consumer adjusts while decoding)
+    and ("frame", frame number, slot) is sent to each queue in out_queues
+    Ends with ("end", frames read, None), or ("error", message, None)
+    """
+    import cv2
+    cap = cv2.VideoCapture(video_path)
+    frame_count = 0
+    next_frame = _skip_of(frame_skip)
+    try:
+        if not cap.isOpened():
+            raise IOError(f"Cannot open {video_path}")
+        while True:
+            frame_count += 1
+            # Skipped frames are grabbed but never converted to BGR
+            if frame_count < next_frame:
+                if not cap.grab():
+                    break
+                continue
+            slot = ring.acquire()
+            target = ring.view(slot)
+            ok, frame = cap.read(target)
+            if not ok:
+                ring.publish(slot, 0)
+                break
+            if frame.shape != ring.shape:
+                frame = cv2.resize(frame, (ring.shape[1], ring.shape[0]))
+            if frame.ctypes.data != target.ctypes.data:
+                np.copyto(target, frame)    # decoder could not write in place
+            del target, frame
+            ring.publish(slot, readers)
+            next_frame = frame_count + _skip_of(frame_skip)
+            for out in out_queues:
+                out.put(("frame", frame_count, slot))
+        message = ("end", frame_count - 1, None)
+    except Exception as e:
+        message = ("error", str(e), None)
+    finally:
+        cap.release()
+    for out in out_queues:
+        out.put(message)
+
+def _skip_of(frame_skip):
+    """Current skip from an int, a callable (adaptive controller) or a shared mp.Value"""
+    if callable(frame_skip):
+        return max(1, frame_skip())
+    return max(1, getattr(frame_skip, "value", frame_skip))
+
+def _inline_frames(video_path, frame_skip):
+    import cv2
+    cap = cv2.VideoCapture(video_path)
+    frame_count = 0
+    next_frame = _skip_of(frame_skip)
+    try:
+        while cap.isOpened():
+            frame_count += 1
+            if frame_count < next_frame:
+                if not cap.grab():
+                    break
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame_count, frame
+            next_frame = frame_count + _skip_of(frame_skip)
+    finally:
+        cap.release()
+
+def _ring_frames(video_path, frame_skip, slots):
+    import cv2
+    cap = cv2.VideoCapture(video_path)
+    shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+    cap.release()
+    if not all(shape):
+        return
+
+    # spawn: forking a threaded Streamlit server is not safe
+    ctx = mp.get_context("spawn")
+    ring = FrameRing(slots, shape, ctx=ctx)
+    frames = ctx.Queue()
+    shared_skip = ctx.Value('i', _skip_of(frame_skip), lock=False)
+    decoder = ctx.Process(target=decode_to_ring, args=(video_path, ring, [frames], shared_skip), daemon=True)
+    decoder.start()
+    try:
+        while True:
+            try:
+                kind, value, slot = frames.get(timeout=1)
+            except queue.Empty:
+                if not decoder.is_alive():
+                    raise RuntimeError("Video decoder process exited unexpectedly")
+                continue
+            if kind == "error":
+                raise IOError(value)
+            if kind == "end":
+                break
+            view = ring.view(slot)
+            try:
+                yield value, view
+            finally:
+                del view
+                ring.release(slot)
+                shared_skip.value = _skip_of(frame_skip)
+    finally:
+        decoder.terminate()
+        decoder.join()
+        ring.close()
+
+def video_frames(video_path, frame_skip=1, in_process=DECODE_PROCESS, slots=FRAME_RING_SLOTS):
+    """
+    (frame number, BGR frame) for every frame_skip-th frame of a video
+    frame_skip may be a callable, re-read after every frame (adaptive skip)
+    in_process: decode in a separate process into a FrameRing; each frame
+    is then a view into shared memory, valid until the next one is requested
+    """
+    if in_process:
+        return _ring_frames(video_path, frame_skip, slots)
+    return _inline_frames(video_path, frame_skip)
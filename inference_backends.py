@@ -0,0 +1,195 @@
+"""
+⚙️ INFERENCE BACKENDS
+The detector can run on eager PyTorch or on an exported ONNX Runtime / OpenVINO
+model. ultralytics loads all three behind the same YOLO(path) interface, so
+model(frame, conf=...) and the result objects are unchanged for the caller
+Export with: python export_model.py --backend onnx openvino
+INT8 (quantized ONNX) with: python quantize_model.py --source VIDEO
+"""
+import glob
+import os
+from app_config import MODEL_PATH, MODEL_IMGSZ, SAVE_DIR
+
+# backend -> ultralytics export format (None: the .pt file itself)
+BACKENDS = {
+    "torch": None,
+    "onnx": "onnx",
+    "openvino": "openvino",
+}
+
+# quantized backend -> the FP32 backend it is derived from
+QUANTIZED = {
+    "onnx-int8": "onnx",
+}
+
+ALL_BACKENDS = list(BACKENDS) + list(QUANTIZED)
+
+def backend_model_path(backend, model_path=MODEL_PATH):
+    """Where the exported model of a backend lives (next to the .pt file)"""
+    if backend not in ALL_BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}' (choose from {', '.join(ALL_BACKENDS)})")
+    stem = os.path.splitext(model_path)[0]
+    if backend == "onnx-int8":
+        return stem + "_int8.onnx"
+    if backend == "onnx":
+        return stem + ".onnx"
+    if backend == "openvino":
+        return stem + "_openvino_model"
+    return model_path
+
+def available_backends(model_path=MODEL_PATH):
+    """Backends whose model file exists on disk"""
+    return [name for name in ALL_BACKENDS if os.path.exists(backend_model_path(name, model_path))]
+
+def export_model(backend, model_path=MODEL_PATH, imgsz=MODEL_IMGSZ, **kwargs):
+    """Export the .pt model for a backend; returns the exported path"""
+    fmt = BACKENDS[backend]
+    if fmt is None:
+        return model_path
+    from ultralytics import YOLO
+    # Dynamic axes by default: a static export runs at its export size whatever
+    # imgsz is passed, which silently defeats the cascade, adaptive imgsz and tiling
+    kwargs.setdefault("dynamic", True)
+    return YOLO(model_path).export(format=fmt, imgsz=imgsz, **kwargs)
+
+def load_model(backend, model_path=MODEL_PATH):
+    """
+    YOLO model for the backend
+    Raises FileNotFoundError when the backend has not been exported yet
+    """
+    path = backend_model_path(backend, model_path)
+    if backend in QUANTIZED and not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found - run: python quantize_model.py")
+    if BACKENDS.get(backend) and not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found - run: python export_model.py --backend {backend}")
+    from ultralytics import YOLO
+    return YOLO(path, task="detect")
+
+def fixed_input_size(backend, model_path=MODEL_PATH):
+    """
+    Input size an exported model is locked to (static-shape export), or None
+    when it accepts any imgsz. ultralytics replaces the imgsz of every call
+    with the export size for static models
+    """
+    base = QUANTIZED.get(backend, backend)
+    if not BACKENDS.get(base):
+        return None
+    path = backend_model_path(backend, model_path)
+    try:
+        if base == "onnx":
+            import onnxruntime
+            session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+            height, width = session.get_inputs()[0].shape[-2:]
+        else:
+            import openvino
+            xml = glob.glob(os.path.join(path, "*.xml"))[0]
+            dims = openvino.Core().read_model(xml).inputs[0].get_partial_shape()
+            height, width = [dim.get_length() if dim.is_static else None for dim in dims][-2:]
+    except Exception as e:
+        print(f"⚠️ Could not read the input shape of {path}: {e}")
+        return None
+    if isinstance(height, int) and isinstance(width, int):
+        return max(height, width)
+    return None
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+
+def sample_frames(source=None, limit=50):
+    """Up to limit BGR frames from a video file, an image glob or violations/"""
+    import cv2
+    if source and source.lower().endswith(VIDEO_EXTENSIONS):
+        cap = cv2.VideoCapture(source)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or limit
+        step = max(1, total // limit)
+        frames = []
+        for index in range(0, total, step):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ok, frame = cap.read()
+            if not ok or len(frames) >= limit:
+                break
+            frames.append(frame)
+        cap.release()
+        return frames
+    pattern = source or os.path.join(SAVE_DIR, "**", "*.jpg")
+    paths = sorted(glob.glob(pattern, recursive=True))[:limit]
+    return [frame for frame in (cv2.imread(path) for path in paths) if frame is not None]
+
+# ==========================================
+# RESULTS
+# ==========================================
+
+class LiteBox:
+    """The parts of an ultralytics box process_frame reads: cls[0], conf[0], xyxy[0]"""
+    __slots__ = ("cls", "conf", "xyxy")
+
+    def __init__(self, cls, conf, xyxy):
+        self.cls = (cls,)
+        self.conf = (conf,)
+        self.xyxy = (xyxy,)
+
+class LiteResult:
+    """
+    Picklable stand-in for an ultralytics Results object
+    Built from detections() tuples (inference service, cascade and tiling modes)
+    """
+    __slots__ = ("boxes",)
+
+    def __init__(self, detections):
+        self.boxes = [LiteBox(cls, conf, xyxy) for cls, conf, xyxy in detections]
+
+def detections(result):
+    """[(class id, confidence, (x1, y1, x2, y2))] from one ultralytics result"""
+    return [
+        (int(box.cls[0]), float(box.conf[0]), tuple(float(v) for v in box.xyxy[0]))
+        for box in result.boxes
+    ]
+
+def match_detections(reference, candidate, min_iou=0.9, conf_tolerance=1.0):
+    """
+    Pair candidate detections with the reference (same class, best IoU)
+    Returns ([(reference, candidate)], unmatched reference, unmatched candidate)
+    """
+    from detection_utils import calculate_iou
+
+    unmatched = list(candidate)
+    pairs, missing = [], []
+    for det in reference:
+        cls, conf, box = det
+        best, best_iou = None, min_iou
+        for other in unmatched:
+            if other[0] != cls:
+                continue
+            iou = calculate_iou(box, other[2])
+            if iou >= best_iou:
+                best, best_iou = other, iou
+        if best is None or abs(best[1] - conf) > conf_tolerance:
+            missing.append(det)
+            continue
+        unmatched.remove(best)
+        pairs.append((det, best))
+    return pairs, missing, unmatched
+
+def compare_detections(reference, candidate, min_iou=0.9, conf_tolerance=0.05):
+    """(matched, missing, extra, worst confidence difference) against the reference"""
+    pairs, missing, extra = match_detections(reference, candidate, min_iou, conf_tolerance)
+    worst_conf = max((abs(ref[1] - got[1]) for ref, got in pairs), default=0.0)
+    return len(pairs), len(missing), len(extra), worst_conf
+
+def per_class_agreement(reference_runs, candidate_runs, min_iou=0.5):
+    """
+    Per-class precision/recall of a candidate model, taking the reference
+    model's detections on the same frames as ground truth
+    Returns {class id: {"reference", "candidate", "matched", "precision", "recall"}}
+    """
+    counts = {}
+    for reference, candidate in zip(reference_runs, candidate_runs):
+        pairs, _, _ = match_detections(reference, candidate, min_iou)
+        for dets, field in ((reference, "reference"), (candidate, "candidate")):
+            for cls, _, _ in dets:
+                counts.setdefault(cls, {"reference": 0, "candidate": 0, "matched": 0})[field] += 1
+        for ref, _ in pairs:
+            counts[ref[0]]["matched"] += 1
+    for row in counts.values():
+        row["precision"] = row["matched"] / row["candidate"] if row["candidate"] else None
+        row["recall"] = row["matched"] / row["reference"] if row["reference"] else None
+    return counts
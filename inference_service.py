@@ -0,0 +1,330 @@
+"""
+🛰️ INFERENCE SERVICE
+One detector process shared by every Streamlit session and batch job
+Clients send frames over a local socket (multiprocessing.connection); the
+service queues them per client, drains the queues round-robin into dynamic
+batches (up to SERVICE_MAX_BATCH frames, or whatever arrived within
+SERVICE_MAX_WAIT_MS of the oldest frame) and runs one model call per batch
+Run with: python inference_service.py          (serve)
+          python inference_service.py --metrics (print queue metrics of a running service)
+Then set INFERENCE_SERVICE = True in app_config.py
+"""
+import argparse
+import itertools
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from multiprocessing.connection import Client, Listener
+import numpy as np
+from inference_backends import LiteResult, detections
+from app_config import (
+    MODEL_PATH, MODEL_IMGSZ, INFERENCE_SERVICE_ADDRESS, INFERENCE_SERVICE_AUTHKEY,
+    SERVICE_MAX_BATCH, SERVICE_MAX_WAIT_MS, SERVICE_MAX_QUEUE_PER_CLIENT
+)
+
+ACTIVE_CLIENT_WINDOW = 1.0  # seconds since its last frame a client still counts as streaming
+
+# ==========================================
+# SERVICE
+# ==========================================
+
+class _Request:
+    __slots__ = ("request_id", "client_id", "frame", "conf", "reply", "arrived")
+
+    def __init__(self, request_id, client_id, frame, conf, reply):
+        self.request_id = request_id
+        self.client_id = client_id
+        self.frame = frame
+        self.conf = conf
+        self.reply = reply
+        self.arrived = time.perf_counter()
+
+class InferenceService:
+    """Per-client queues, round-robin dynamic batching and queue metrics"""
+
+    def __init__(self, model, imgsz=MODEL_IMGSZ, max_batch=SERVICE_MAX_BATCH,
+                 max_wait_ms=SERVICE_MAX_WAIT_MS, max_queue=SERVICE_MAX_QUEUE_PER_CLIENT):
+        self.model = model
+        self.imgsz = imgsz
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self._queues = OrderedDict()    # client id -> deque of _Request, in round-robin order
+        self._last_seen = {}            # client id -> time of its last frame
+        self._cond = threading.Condition()
+        self._batching = max_batch > 1
+        self._started = time.time()
+        self._batches = 0
+        self._frames = 0
+        self._rejected = 0
+        self._batch_sizes = deque(maxlen=1000)
+        self._wait_ms = deque(maxlen=1000)
+        self._infer_ms = deque(maxlen=1000)
+        self._served = {}
+
+    # ---- queueing ----
+    def submit(self, request):
+        """Queue a frame; False when the client already has max_queue frames waiting"""
+        with self._cond:
+            queue = self._queues.setdefault(request.client_id, deque())
+            if len(queue) >= self.max_queue:
+                self._rejected += 1
+                return False
+            queue.append(request)
+            self._last_seen[request.client_id] = request.arrived
+            self._cond.notify()
+            return True
+
+    def drop_client(self, client_id):
+        with self._cond:
+            self._queues.pop(client_id, None)
+            self._served.pop(client_id, None)
+            self._last_seen.pop(client_id, None)
+
+    def _queued(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _all_active_waiting(self):
+        """
+        Every client that sent a frame recently has one queued - clients send
+        one frame at a time, so nothing else can arrive before the deadline
+        """
+        now = time.perf_counter()
+        return all(
+            queue for client_id, queue in self._queues.items()
+            if queue or now - self._last_seen.get(client_id, 0) < ACTIVE_CLIENT_WINDOW
+        )
+
+    def _next_batch(self):
+        """Block until a batch is due, then take frames round-robin across clients"""
+        with self._cond:
+            while not self._queued():
+                self._cond.wait()
+            oldest = min(queue[0].arrived for queue in self._queues.values() if queue)
+            deadline = oldest + self.max_wait
+            while self._queued() < self.max_batch and not self._all_active_waiting():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            # One frame per client per round, so a long video cannot starve a short one
+            batch = []
+            while len(batch) < self.max_batch and self._queued():
+                for client_id in list(self._queues):
+                    queue = self._queues[client_id]
+                    if queue and len(batch) < self.max_batch:
+                        batch.append(queue.popleft())
+                        self._queues.move_to_end(client_id)
+            return batch
+
+    # ---- inference ----
+    def _infer(self, frames, conf):
+        """Detections per frame; falls back to one call per frame for fixed-batch exports"""
+        if self._batching and len(frames) > 1:
+            try:
+                return self.model(frames, conf=conf, imgsz=self.imgsz, verbose=False)
+            except Exception as e:
+                print(f"⚠️ Batched inference failed ({e}); the model was probably exported with batch 1 - "
+                      "running frames one by one (re-export without --static)")
+                self._batching = False
+        return [self.model(frame, conf=conf, imgsz=self.imgsz, verbose=False)[0] for frame in frames]
+
+    def run_forever(self):
+        while True:
+            batch = self._next_batch()
+            start = time.perf_counter()
+            try:
+                # Lowest threshold of the batch; each client's own threshold is applied below
+                results = self._infer([request.frame for request in batch], min(request.conf for request in batch))
+            except Exception as e:
+                for request in batch:
+                    request.reply(("error", request.request_id, f"Inference failed: {e}"))
+                continue
+            done = time.perf_counter()
+            for request, result in zip(batch, results):
+                dets = [det for det in detections(result) if det[1] >= request.conf]
+                request.reply(("result", request.request_id, dets))
+            with self._cond:
+                self._batches += 1
+                self._frames += len(batch)
+                self._batch_sizes.append(len(batch))
+                self._infer_ms.append((done - start) * 1000)
+                self._wait_ms.extend((start - request.arrived) * 1000 for request in batch)
+                for request in batch:
+                    if request.client_id in self._queues:     # not disconnected meanwhile
+                        self._served[request.client_id] = self._served.get(request.client_id, 0) + 1
+
+    # ---- metrics ----
+    def metrics(self):
+        """Snapshot for --metrics and the System tab"""
+        def percentile(values, q):
+            return float(np.percentile(values, q)) if values else None
+
+        with self._cond:
+            return {
+                "uptime_s": time.time() - self._started,
+                "clients": len(self._queues),
+                "queued": self._queued(),
+                "queued_per_client": {client: len(queue) for client, queue in self._queues.items()},
+                "served_per_client": dict(self._served),
+                "batches": self._batches,
+                "frames": self._frames,
+                "rejected": self._rejected,
+                "mean_batch": float(np.mean(self._batch_sizes)) if self._batch_sizes else None,
+                "wait_p50_ms": percentile(self._wait_ms, 50),
+                "wait_p95_ms": percentile(self._wait_ms, 95),
+                "infer_p50_ms": percentile(self._infer_ms, 50),
+                "batching": self._batching,
+            }
+
+    # ---- connections ----
+    def serve(self, address=INFERENCE_SERVICE_ADDRESS, authkey=INFERENCE_SERVICE_AUTHKEY):
+        threading.Thread(target=self.run_forever, name="batcher", daemon=True).start()
+        with Listener(address, authkey=authkey) as listener:
+            print(f"🛰️ Inference service listening on {address[0]}:{address[1]}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError) as e:
+                    print(f"⚠️ Rejected connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        """Read requests from one client connection until it closes"""
+        send_lock = threading.Lock()
+
+        def reply(message):
+            with send_lock:
+                try:
+                    conn.send(message)
+                except OSError:
+                    pass    # client went away; its queue is dropped below
+
+        client_ids = set()
+        try:
+            while True:
+                message = conn.recv()
+                kind = message[0]
+                if kind == "infer":
+                    _, request_id, client_id, frame, conf = message
+                    client_ids.add(client_id)
+                    if not self.submit(_Request(request_id, client_id, frame, conf, reply)):
+                        reply(("error", request_id, f"queue full ({self.max_queue} frames) for {client_id}"))
+                elif kind == "metrics":
+                    reply(("metrics", message[1], self.metrics()))
+                elif kind == "ping":
+                    reply(("pong", message[1], None))
+        except (EOFError, OSError):
+            pass
+        finally:
+            for client_id in client_ids:
+                self.drop_client(client_id)
+            conn.close()
+
+# ==========================================
+# CLIENT
+# ==========================================
+
+class ServiceError(RuntimeError):
+    pass
+
+class InferenceClient:
+    """
+    Drop-in for the YOLO model in the detection loop:
+    client(frame, conf=...)[0].boxes behaves like an ultralytics result
+    One client per session or job - client_id is the unit of fairness
+    """
+
+    def __init__(self, client_id, address=INFERENCE_SERVICE_ADDRESS, authkey=INFERENCE_SERVICE_AUTHKEY):
+        self.client_id = client_id
+        self.address = address
+        self.authkey = authkey
+        self._conn = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+
+    def _request(self, message):
+        return self._request_many([message])[0]
+
+    def _request_many(self, messages):
+        """
+        Send every message before reading any reply, so the service can batch
+        them; replies are matched by request id. Returns payloads in order
+        """
+        with self._lock:
+            request_ids = [next(self._ids) for _ in messages]
+            replies = {}
+            try:
+                if self._conn is None:
+                    self._conn = Client(self.address, authkey=self.authkey)
+                for request_id, message in zip(request_ids, messages):
+                    self._conn.send((message[0], request_id) + message[1:])
+                while len(replies) < len(request_ids):
+                    kind, request_id, payload = self._conn.recv()
+                    replies[request_id] = (kind, payload)
+            except (EOFError, OSError) as e:
+                self.close()
+                raise ServiceError(f"Inference service unavailable: {e}") from e
+        errors = [payload for kind, payload in replies.values() if kind == "error"]
+        if errors:
+            raise ServiceError(errors[0])
+        return [replies[request_id][1] for request_id in request_ids]
+
+    def __call__(self, frame, conf=0.25, imgsz=None, verbose=False):
+        """
+        One result per frame, like the model; a list of frames (tiles) goes out
+        as separate requests so the service batches them
+        imgsz is fixed by the service; accepted for call compatibility
+        """
+        if not isinstance(frame, (list, tuple)):
+            return [LiteResult(self._request(("infer", self.client_id, frame, conf)))]
+        results = []
+        # No more in flight than the service queues per client
+        for start in range(0, len(frame), SERVICE_MAX_QUEUE_PER_CLIENT):
+            chunk = frame[start:start + SERVICE_MAX_QUEUE_PER_CLIENT]
+            payloads = self._request_many([("infer", self.client_id, image, conf) for image in chunk])
+            results.extend(LiteResult(dets) for dets in payloads)
+        return results
+
+    def ping(self):
+        self._request(("ping",))
+        return True
+
+    def metrics(self):
+        return self._request(("metrics",))
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared detection service with dynamic batching")
+    parser.add_argument("--metrics", action="store_true", help="print metrics of the running service and exit")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        try:
+            metrics = InferenceClient("metrics").metrics()
+        except ServiceError as e:
+            print(f"❌ {e}")
+            return 1
+        for key, value in metrics.items():
+            print(f"{key:<20} {value}")
+        return 0
+
+    from model_loader import ModelLoader
+    loader = ModelLoader(MODEL_PATH, service=False).start()
+    model = loader.wait()
+    if model is None:
+        print(f"❌ Model failed to load: {loader.error}")
+        return 1
+    print(f"🧠 {loader.backend} model ready (load {loader.load_seconds:.1f} s, warm-up {loader.warmup_seconds:.1f} s)")
+    InferenceService(model).serve()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
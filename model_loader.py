@@ -0,0 +1,176 @@
+"""
+🧠 DETECTOR LOADER
+Loads and warms up the YOLO model on a background thread so the UI can render meanwhile
+ultralytics (and with it torch) is imported here, on first use only
+The backend (PyTorch / ONNX Runtime / OpenVINO) comes from INFERENCE_BACKEND
+With INFERENCE_SERVICE the model lives in inference_service.py and this only connects
+Run with: python model_loader.py   (prints a load/warm-up profile)
+"""
+import threading
+import time
+import numpy as np
+import streamlit as st
+from app_config import (
+    MODEL_PATH, MODEL_IMGSZ, INFERENCE_BACKEND, INFERENCE_SERVICE, WARMUP_FRAME_SIZES, WARMUP_RUNS,
+    CPU_THREADS, CPU_CORES
+)
+from inference_backends import load_model, fixed_input_size
+from cpu_tuning import configure_worker
+
+class ModelLoader:
+    """Background model load + warm-up with a readiness flag and timings"""
+
+    def __init__(self, model_path, backend=INFERENCE_BACKEND, imgsz=MODEL_IMGSZ,
+                 warmup_sizes=WARMUP_FRAME_SIZES, warmup_runs=WARMUP_RUNS, service=INFERENCE_SERVICE,
+                 threads=CPU_THREADS, cores=CPU_CORES):
+        self.model_path = model_path
+        self.service = service
+        self.threads = threads
+        self.cores = cores
+        self.requested_backend = backend
+        self.backend = backend
+        self.fallback_reason = None
+        self.cpu = {}               # threads / cores applied before loading
+        self.imgsz = imgsz
+        self.fixed_imgsz = None     # set when the model ignores the imgsz of each call
+        self.warmup_sizes = warmup_sizes
+        self.warmup_runs = warmup_runs
+        self.model = None
+        self.error = None
+        self.status = "loading"     # loading -> warming up -> ready | failed
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.warmup_ms = []         # every warm-up inference, in order
+        self.first_frame_ms = None  # first real frame after warm-up
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._load, name="model-loader", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            if self.service:
+                self._connect()
+                return
+            # Pins the whole process (Streamlit and decoder threads too), not just this thread
+            self.cpu = configure_worker(self.threads, self.cores)
+            try:
+                model = load_model(self.backend, self.model_path)
+            except FileNotFoundError as e:
+                # Not exported yet - keep detecting on the PyTorch model
+                print(f"⚠️ {e}; falling back to torch")
+                self.fallback_reason = str(e)
+                self.backend = "torch"
+                model = load_model(self.backend, self.model_path)
+            self.fixed_imgsz = fixed_input_size(self.backend, self.model_path)
+            if self.fixed_imgsz:
+                print(f"⚠️ {self.backend} model has a static {self.fixed_imgsz}px input - input size changes "
+                      "are disabled (re-export without --static to enable them)")
+            self.load_seconds = time.perf_counter() - start
+
+            # First inferences pay for lazy graph/kernel setup - spend it here
+            self.status = "warming up"
+            start = time.perf_counter()
+            for height, width in self.warmup_sizes:
+                dummy = np.zeros((height, width, 3), dtype=np.uint8)
+                for _ in range(self.warmup_runs):
+                    t = time.perf_counter()
+                    model(dummy, imgsz=self.imgsz, verbose=False)
+                    self.warmup_ms.append((time.perf_counter() - t) * 1000)
+            self.warmup_seconds = time.perf_counter() - start
+
+            self.model = model
+            self.status = "ready"
+        except Exception as e:
+            self.error = e
+            self.status = "failed"
+            if self.load_seconds is None:
+                self.load_seconds = time.perf_counter() - start
+        finally:
+            self._ready.set()
+
+    def _connect(self):
+        """Service mode: the service process loads and warms up the model"""
+        from inference_service import InferenceClient, ServiceError
+        start = time.perf_counter()
+        client = InferenceClient("loader")
+        try:
+            client.ping()
+        except ServiceError as e:
+            raise ServiceError(f"{e} - start it with: python inference_service.py") from e
+        finally:
+            client.close()
+        self.backend = "service"
+        # The service runs every frame at its own imgsz
+        self.fixed_imgsz = self.imgsz
+        self.load_seconds = time.perf_counter() - start
+        self.warmup_seconds = 0.0
+        self.model = client
+        self.status = "ready"
+
+    def detector(self, client_id):
+        """
+        What the detection loop calls: the shared model, or in service mode a
+        connection of its own (client_id is the service's unit of fairness)
+        """
+        if self.service and self.model is not None:
+            from inference_service import InferenceClient
+            return InferenceClient(client_id)
+        return self.model
+
+    @property
+    def ready(self):
+        """True once loading and warm-up have finished (successfully or not)"""
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        """Block until warm-up finishes; returns the model, or None on failure"""
+        self._ready.wait(timeout)
+        return self.model
+
+    def record_first_frame(self, ms):
+        """Latency of the first real frame this process processed"""
+        if self.first_frame_ms is None:
+            self.first_frame_ms = ms
+
+    def profile(self):
+        """Timings for display - None where a step has not run"""
+        return {
+            "status": self.status,
+            "backend": self.backend,
+            "requested_backend": self.requested_backend,
+            "fallback_reason": self.fallback_reason,
+            "cpu": self.cpu,
+            "fixed_imgsz": self.fixed_imgsz,
+            "load_s": self.load_seconds,
+            "warmup_s": self.warmup_seconds,
+            "warmup_first_ms": self.warmup_ms[0] if self.warmup_ms else None,
+            "warmup_last_ms": self.warmup_ms[-1] if self.warmup_ms else None,
+            "first_frame_ms": self.first_frame_ms,
+        }
+
+@st.cache_resource
+def get_model_loader():
+    """
+    Process-wide loader - the first script run after server start begins
+    loading and warm-up in the background
+    """
+    return ModelLoader(MODEL_PATH).start()
+
+if __name__ == "__main__":
+    loader = ModelLoader(MODEL_PATH, service=False).start()
+    model = loader.wait()
+    if model is None:
+        print(f"❌ Model failed to load: {loader.error}")
+        raise SystemExit(1)
+    print(f"🧠 Load:    {loader.load_seconds:.2f} s ({loader.backend})")
+    print(f"🔥 Warm-up: {loader.warmup_seconds:.2f} s ({len(loader.warmup_ms)} runs)")
+    print("   per run: " + ", ".join(f"{ms:.0f}" for ms in loader.warmup_ms) + " ms")
+    height, width = WARMUP_FRAME_SIZES[0]
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    start = time.perf_counter()
+    model(frame, imgsz=MODEL_IMGSZ, verbose=False)
+    print(f"🎞️ First frame after warm-up: {(time.perf_counter() - start) * 1000:.0f} ms")
@@ -0,0 +1,73 @@
+"""
+🚦 MOTION GATE
+Skips detector runs on frames that look the same as the last analysed one
+(an empty road, traffic stopped at a signal). Frames are compared as small
+blurred grayscale thumbnails, which costs well under a millisecond; a
+refresh is forced every MOTION_REFRESH_FRAMES skipped frames so slow changes
+are never missed for long
+"""
+import time
+from app_config import MOTION_GATE_WIDTH, MOTION_PIXEL_THRESHOLD, MOTION_MIN_CHANGED, MOTION_REFRESH_FRAMES
+
+class MotionGate:
+    """Decides per frame whether the detector needs to run"""
+
+    def __init__(self, width=MOTION_GATE_WIDTH, pixel_threshold=MOTION_PIXEL_THRESHOLD,
+                 min_changed=MOTION_MIN_CHANGED, refresh_frames=MOTION_REFRESH_FRAMES):
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.refresh_frames = refresh_frames
+        self._reference = None      # thumbnail of the last analysed frame
+        self._skipped_run = 0
+        self.frames = 0
+        self.analyzed = 0
+        self.forced = 0
+        self.gate_ms = 0.0
+        self.last_change = 0.0      # changed fraction of the latest frame
+
+    def _thumbnail(self, frame):
+        import cv2
+        height, width = frame.shape[:2]
+        # Linear sampling instead of area averaging: ~10x cheaper, the blur absorbs the aliasing
+        small = cv2.resize(frame, (self.width, max(1, height * self.width // width)), interpolation=cv2.INTER_LINEAR)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def should_analyze(self, frame):
+        """True if the frame differs from the last analysed one (or a refresh is due)"""
+        import cv2
+        start = time.perf_counter()
+        self.frames += 1
+        thumb = self._thumbnail(frame)
+        if self._reference is None or self._reference.shape != thumb.shape:
+            analyze = True
+        else:
+            diff = cv2.absdiff(thumb, self._reference)
+            self.last_change = cv2.countNonZero(cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)[1]) / diff.size
+            analyze = self.last_change >= self.min_changed
+            if not analyze and self._skipped_run >= self.refresh_frames:
+                analyze = True
+                self.forced += 1
+        if analyze:
+            self._reference = thumb
+            self._skipped_run = 0
+            self.analyzed += 1
+        else:
+            self._skipped_run += 1
+        self.gate_ms += (time.perf_counter() - start) * 1000
+        return analyze
+
+    @property
+    def skip_rate(self):
+        return 1 - self.analyzed / self.frames if self.frames else 0.0
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "analyzed": self.analyzed,
+            "skipped": self.frames - self.analyzed,
+            "forced": self.forced,
+            "skip_rate": self.skip_rate,
+            "gate_ms_per_frame": self.gate_ms / self.frames if self.frames else 0.0,
+        }
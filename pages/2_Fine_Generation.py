@@ -3,15 +3,24 @@
 Professional Interface with PDF Generation
 Bangladesh Traffic Authority Standard
 """
+import time
+_import_start = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import cv2
 import os
 from datetime import datetime, timedelta
-from pdf_generator import TrafficFinePDF
+from thumbnail_utils import get_thumbnail
+from plate_index import get_plate_index
+from charts import data_version
+from evidence_store import resolve_image, remove_image, ensure_layout
+from app_config import SAVE_FINE_PDFS
+from fines_index import case_identity
+from timing_utils import record_timing
+# reportlab is imported when the first fine is generated
+_import_ms = (time.perf_counter() - _import_start) * 1000
 
 CSV_FILE = "violations.csv"
-VIOLATIONS_DIR = "violations"
 FINES_DIR = "fines"
 
 st.set_page_config(
@@ -19,6 +28,7 @@ st.set_page_config(
     page_icon="🚔",
     layout="wide"
 )
+record_timing("imports (fine page)", _import_ms)
 
 # ================= PREMIUM STYLING =================
 st.markdown("""
@@ -241,6 +251,7 @@ def update_plate(index, plate_number, df):
     """Update plate number"""
     df.at[index, 'Plate_Number'] = plate_number
     save_violations(df)
+    get_plate_index().update(df.at[index, 'Image_File'], plate_number)
     return df
 
 def delete_violation(index, df):
@@ -248,25 +259,13 @@ def delete_violation(index, df):
     if 'Image_File' in df.columns and pd.notna(df.at[index, 'Image_File']):
         img_file = df.at[index, 'Image_File']
         if img_file != "NO_PLATE":
-            img_path = os.path.join(VIOLATIONS_DIR, img_file)
-            if os.path.exists(img_path):
-                try:
-                    os.remove(img_path)
-                except:
-                    pass
+            remove_image(img_file)
     
+    get_plate_index().remove(df.at[index, 'Image_File'])
     df = df.drop(index).reset_index(drop=True)
     save_violations(df)
     return df
 
-def generate_case_id():
-    """Generate unique case ID"""
-    return f"10{datetime.now().strftime('%y%m%d%H%M%S')}"
-
-def generate_trace_no():
-    """Generate trace number"""
-    return datetime.now().strftime('%m%d%H')
-
 # ================= MAIN APP =================
 
 st.markdown("""
@@ -276,8 +275,7 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Initialize PDF generator
-pdf_generator = TrafficFinePDF(output_folder=FINES_DIR)
+ensure_layout()
 
 # Load data
 df = load_violations()
@@ -359,7 +357,10 @@ elif "Completed" in filter_mode:
     filtered_df = filtered_df[filtered_df['Plate_Number'].notna() & (filtered_df['Plate_Number'] != '')]
 
 if search:
-    filtered_df = filtered_df[filtered_df['Plate_Number'].str.contains(search, case=False, na=False)]
+    # Normalized lookup: Bengali/Latin digits, spacing and punctuation ignored
+    plate_index = get_plate_index()
+    plate_index.sync(df, data_version(CSV_FILE))
+    filtered_df = filtered_df[filtered_df['Image_File'].isin(plate_index.search(search))]
 
 st.markdown("---")
 st.markdown('<p class="section-header">📋 VIOLATION PROCESSING</p>', unsafe_allow_html=True)
@@ -384,12 +385,15 @@ else:
                 
                 img_path = None
                 if 'Image_File' in row and pd.notna(row['Image_File']) and row['Image_File'] != "NO_PLATE":
-                    img_path = os.path.join(VIOLATIONS_DIR, row['Image_File'])
+                    img_path = resolve_image(row['Image_File'])
                     if os.path.exists(img_path):
-                        image = cv2.imread(img_path)
-                        if image is not None:
-                            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                            st.image(image, use_container_width=True, caption="License Plate Evidence")
+                        thumb_path = get_thumbnail(img_path)
+                        if thumb_path is not None:
+                            # Full-size evidence is only loaded on request
+                            if st.toggle("🔍 Full Size", key=f"full_image_{idx}"):
+                                st.image(img_path, use_container_width=True, caption="License Plate Evidence")
+                            else:
+                                st.image(thumb_path, use_container_width=True, caption="License Plate Evidence")
                         else:
                             st.error("⚠️ Image Load Error")
                             img_path = None
@@ -453,10 +457,12 @@ else:
                             if not accused_person or not cell_number:
                                 st.error("⚠️ Please fill required fields: Accused Person, Cell Number")
                             else:
+                                case_id, trace_no = case_identity(row)
+                                
                                 # Prepare data
                                 violation_data = {
-                                    'trace_no': generate_trace_no(),
-                                    'case_id': generate_case_id(),
+                                    'trace_no': trace_no,
+                                    'case_id': case_id,
                                     'accused_person': accused_person,
                                     'father_spouse': father_spouse or 'N/A',
                                     'cell_number': cell_number,
@@ -476,7 +482,11 @@ else:
                                 }
                                 
                                 try:
-                                    pdf_path = pdf_generator.generate_fine(violation_data)
+                                    from pdf_generator import get_fine_template
+                                    pdf_generator = get_fine_template(FINES_DIR)
+                                    pdf_name, pdf_data = pdf_generator.render_fine(violation_data)
+                                    # Indexed either way; the file itself only with SAVE_FINE_PDFS
+                                    pdf_generator.save_fine(pdf_name, pdf_data, violation_data, keep_file=SAVE_FINE_PDFS)
                                     
                                     st.markdown(f"""
                                     <div class="success-box">
@@ -487,14 +497,13 @@ else:
                                     st.balloons()
                                     
                                     # Download button OUTSIDE form
-                                    with open(pdf_path, "rb") as pdf_file:
-                                        st.download_button(
-                                            "⬇️ DOWNLOAD PDF FINE",
-                                            pdf_file,
-                                            file_name=os.path.basename(pdf_path),
-                                            mime="application/pdf",
-                                            use_container_width=True
-                                        )
+                                    st.download_button(
+                                        "⬇️ DOWNLOAD PDF FINE",
+                                        pdf_data,
+                                        file_name=pdf_name,
+                                        mime="application/pdf",
+                                        use_container_width=True
+                                    )
                                 except Exception as e:
                                     st.error(f"❌ PDF Generation Error: {e}")
                     
@@ -616,12 +625,7 @@ with st.sidebar:
                 if 'Image_File' in df.columns and pd.notna(df.at[idx, 'Image_File']):
                     img_file = df.at[idx, 'Image_File']
                     if img_file != "NO_PLATE":
-                        img_path = os.path.join(VIOLATIONS_DIR, img_file)
-                        if os.path.exists(img_path):
-                            try:
-                                os.remove(img_path)
-                            except:
-                                pass
+                        remove_image(img_file)
             
             df = df[df['Plate_Number'].notna() & (df['Plate_Number'] != '')]
             save_violations(df)
@@ -6,34 +6,157 @@ Based on Bangladesh Traffic Authority format
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.pdfgen import canvas
 from datetime import datetime
+from functools import lru_cache
+import copy
+import io
 import os
+import threading
+from fines_index import record_fine, find_fine, read_fine, fine_input_hash
+from thumbnail_utils import get_print_image
 
-class TrafficFinePDF:
-    """Generate professional traffic fine PDF"""
+# ==========================================
+# PRECOMPUTED STYLES & STATIC LAYOUT
+# ==========================================
+
+@lru_cache(maxsize=1)
+def _build_styles():
+    """Paragraph and table styles, built once per process"""
+    styles = getSampleStyleSheet()
     
-    def __init__(self, output_folder="fines"):
-        self.output_folder = output_folder
+    # Label/value table rows (case, vehicle and date sections)
+    info_table = TableStyle([
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#666666')),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ('TOPPADDING', (0, 0), (-1, -1), 3),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ])
+    
+    return {
+        'normal': styles['Normal'],
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            textColor=colors.HexColor('#DC143C'),
+            alignment=TA_CENTER,
+            spaceAfter=12,
+            fontName='Helvetica-Bold'
+        ),
+        'header': ParagraphStyle(
+            'CustomHeader',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=colors.HexColor('#1a1a1a'),
+            alignment=TA_CENTER,
+            spaceAfter=6
+        ),
+        'label': ParagraphStyle(
+            'Label',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=colors.HexColor('#666666'),
+            fontName='Helvetica-Bold'
+        ),
+        'value': ParagraphStyle(
+            'Value',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=colors.HexColor('#000000')
+        ),
+        'info_table': info_table,
+        'fine_table': TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 14),
+            ('TEXTCOLOR', (1, 0), (1, 0), colors.HexColor('#DC143C')),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f5f5f5')),
+            ('BOX', (0, 0), (-1, -1), 2, colors.HexColor('#DC143C')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 10),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+        ]),
+        'sig_table': TableStyle([
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]),
+    }
+
+@lru_cache(maxsize=1)
+def _build_static_elements():
+    """Flowables that are identical on every notice (parsed once)"""
+    st = _build_styles()
+    
+    sig_table = Table([
+        ["", ""],
+        ["Signature of the Recording", ""],
+        ["Officer / Complainant", ""]
+    ], colWidths=[3*inch, 3*inch])
+    sig_table.setStyle(st['sig_table'])
+    
+    return {
+        'title': Paragraph("DHAKA METROPOLITAN POLICE POST", st['title']),
+        'act': Paragraph("The Road Transport ACT 2018", st['header']),
+        'separator': Paragraph("_" * 80, st['header']),
+        'plate_label': Paragraph("Vehicle License Plate:", st['label']),
+        'sig_table': sig_table,
+    }
+
+def _static(name):
+    """
+    Per-document copy of a static flowable
+    Flowables keep layout state from wrap(), so concurrent builds must not share one
+    """
+    return copy.copy(_build_static_elements()[name])
+
+# Output folders already checked in this process -> folder actually used
+_checked_folders = {}
+_folder_lock = threading.Lock()
+
+def _prepare_output_folder(output_folder):
+    """Create and write-test an output folder once per process"""
+    with _folder_lock:
+        if output_folder in _checked_folders:
+            return _checked_folders[output_folder]
+        resolved = output_folder
         # Ensure directory exists with proper permissions
         try:
             os.makedirs(output_folder, exist_ok=True)
             # Test write permissions
-            test_file = os.path.join(output_folder, '.test')
+            test_file = os.path.join(output_folder, f'.test_{os.getpid()}')
             with open(test_file, 'w') as f:
                 f.write('test')
             os.remove(test_file)
         except Exception as e:
             print(f"Warning: Could not create/access output folder {output_folder}: {e}")
             # Fallback to current directory
-            self.output_folder = "."
+            resolved = "."
+        _checked_folders[output_folder] = resolved
+        return resolved
+
+class TrafficFinePDF:
+    """Generate professional traffic fine PDF"""
+    
+    def __init__(self, output_folder="fines"):
+        self.output_folder = _prepare_output_folder(output_folder)
         
     def generate_fine(self, violation_data):
         """
         Generate a professional traffic fine PDF
+        Idempotent: the same case with unchanged fields returns the existing file,
+        changed fields produce a new version linked to the previous one
         
         Parameters:
         violation_data = {
@@ -58,64 +181,109 @@ class TrafficFinePDF:
         }
         """
         
-        # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"FINE_{violation_data.get('case_id', 'UNKNOWN')}_{timestamp}.pdf"
+        existing = self._existing_fine(violation_data)
+        if existing and os.path.exists(existing['path']):
+            # Identical inputs - the PDF on disk is already this notice
+            return existing['path']
+        
+        filename, pdf_bytes = self.render_fine(violation_data)
+        return self.save_fine(filename, pdf_bytes, violation_data)
+    
+    def _existing_fine(self, violation_data):
+        """Index row for an identical earlier fine of this case, or None"""
+        return find_fine(violation_data.get('case_id', 'UNKNOWN'), fine_input_hash(violation_data))
+    
+    def fine_filename(self, violation_data):
+        """Content-addressed name: same case and inputs -> same file"""
+        input_hash = fine_input_hash(violation_data)
+        return f"FINE_{violation_data.get('case_id', 'UNKNOWN')}_{input_hash[:12]}.pdf"
+    
+    def render_fine(self, violation_data):
+        """
+        Render a fine PDF in memory without touching the disk
+        An identical fine that was already generated is returned instead of rebuilt
+        Returns (filename, pdf bytes)
+        """
+        existing = self._existing_fine(violation_data)
+        if existing:
+            pdf_bytes = read_fine(existing['pdf_name'])
+            if pdf_bytes is not None:
+                return existing['pdf_name'], pdf_bytes
+        
+        filename = self.fine_filename(violation_data)
+        
+        # Build PDF
+        buffer = io.BytesIO()
+        doc = self._new_document(buffer)
+        doc.build(self.build_elements(violation_data))
+        
+        return filename, buffer.getvalue()
+    
+    def save_fine(self, filename, pdf_bytes, violation_data, keep_file=True):
+        """
+        Persist a rendered PDF to the output folder and index it
+        keep_file=False (SAVE_FINE_PDFS off) indexes only the fine's hash and
+        metadata, so it stays idempotent and searchable; returns None then
+        """
+        filepath = os.path.join(self.output_folder, filename)
+        input_hash = fine_input_hash(violation_data)
+        existing = find_fine(violation_data.get('case_id', 'UNKNOWN'), input_hash)
+        if existing and existing['pdf_name'] == filename and os.path.exists(existing['path']):
+            return existing['path']
+        
+        if not keep_file:
+            if existing is None or existing['pdf_name'] != filename:
+                record_fine(f"unsaved:{filename}", violation_data, input_hash, size=len(pdf_bytes))
+            return None
+        
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, filepath)
+        
+        record_fine(filepath, violation_data, input_hash)
+        
+        return filepath
+    
+    def generate_print_file(self, violation_list, filename=None):
+        """
+        Render several fines into one multi-page PDF for printing
+        Each notice starts on a new page; returns the file path
+        """
+        if filename is None:
+            filename = f"PRINT_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         filepath = os.path.join(self.output_folder, filename)
         
-        # Create PDF
-        doc = SimpleDocTemplate(
-            filepath,
+        elements = []
+        for i, violation_data in enumerate(violation_list):
+            if i > 0:
+                elements.append(PageBreak())
+            elements.extend(self.build_elements(violation_data))
+        
+        self._new_document(filepath).build(elements)
+        return filepath
+    
+    def _new_document(self, target):
+        """A4 document with the standard notice margins (path or file-like target)"""
+        return SimpleDocTemplate(
+            target,
             pagesize=A4,
             rightMargin=0.5*inch,
             leftMargin=0.5*inch,
             topMargin=0.5*inch,
             bottomMargin=0.5*inch
         )
+    
+    def build_elements(self, violation_data):
+        """Flowables for one fine notice - only the per-case fields are new"""
+        st = _build_styles()
+        header_style = st['header']
         
         # Container for elements
         elements = []
         
-        # Styles
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            textColor=colors.HexColor('#DC143C'),
-            alignment=TA_CENTER,
-            spaceAfter=12,
-            fontName='Helvetica-Bold'
-        )
-        
-        header_style = ParagraphStyle(
-            'CustomHeader',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#1a1a1a'),
-            alignment=TA_CENTER,
-            spaceAfter=6
-        )
-        
-        label_style = ParagraphStyle(
-            'Label',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.HexColor('#666666'),
-            fontName='Helvetica-Bold'
-        )
-        
-        value_style = ParagraphStyle(
-            'Value',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#000000')
-        )
-        
         # === HEADER ===
-        elements.append(Paragraph("DHAKA METROPOLITAN POLICE POST", title_style))
+        elements.append(_static('title'))
         elements.append(Paragraph(
             f"Officer ID Number: {violation_data.get('officer_id', 'N/A')}", 
             header_style
@@ -130,11 +298,11 @@ class TrafficFinePDF:
         ))
         elements.append(Spacer(1, 0.2*inch))
         
-        elements.append(Paragraph("The Road Transport ACT 2018", header_style))
+        elements.append(_static('act'))
         elements.append(Spacer(1, 0.1*inch))
         
         # Separator line
-        elements.append(Paragraph("_" * 80, header_style))
+        elements.append(_static('separator'))
         elements.append(Spacer(1, 0.2*inch))
         
         # === CASE DETAILS TABLE ===
@@ -148,17 +316,7 @@ class TrafficFinePDF:
         ]
         
         case_table = Table(case_data, colWidths=[2*inch, 4*inch])
-        case_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#666666')),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ]))
+        case_table.setStyle(st['info_table'])
         
         elements.append(case_table)
         elements.append(Spacer(1, 0.15*inch))
@@ -171,17 +329,7 @@ class TrafficFinePDF:
         ]
         
         vehicle_table = Table(vehicle_data, colWidths=[2*inch, 4*inch])
-        vehicle_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#666666')),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ]))
+        vehicle_table.setStyle(st['info_table'])
         
         elements.append(vehicle_table)
         elements.append(Spacer(1, 0.15*inch))
@@ -194,17 +342,7 @@ class TrafficFinePDF:
         ]
         
         date_table = Table(date_data, colWidths=[2*inch, 4*inch])
-        date_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#666666')),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ]))
+        date_table.setStyle(st['info_table'])
         
         elements.append(date_table)
         elements.append(Spacer(1, 0.2*inch))
@@ -215,19 +353,7 @@ class TrafficFinePDF:
         ]
         
         fine_table = Table(fine_data, colWidths=[2*inch, 4*inch])
-        fine_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 14),
-            ('TEXTCOLOR', (1, 0), (1, 0), colors.HexColor('#DC143C')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f5f5f5')),
-            ('BOX', (0, 0), (-1, -1), 2, colors.HexColor('#DC143C')),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ]))
+        fine_table.setStyle(st['fine_table'])
         
         elements.append(fine_table)
         elements.append(Spacer(1, 0.3*inch))
@@ -235,10 +361,12 @@ class TrafficFinePDF:
         # === PLATE IMAGE (if available) ===
         if violation_data.get('plate_image_path') and os.path.exists(violation_data['plate_image_path']):
             try:
-                elements.append(Paragraph("Vehicle License Plate:", label_style))
+                elements.append(_static('plate_label'))
                 elements.append(Spacer(1, 0.1*inch))
                 
-                plate_img = Image(violation_data['plate_image_path'], width=4*inch, height=1.5*inch)
+                # Resampled to print resolution - the evidence file is 3x upscaled
+                plate_path = get_print_image(violation_data['plate_image_path'], 4, 1.5)
+                plate_img = Image(plate_path, width=4*inch, height=1.5*inch)
                 elements.append(plate_img)
                 elements.append(Spacer(1, 0.2*inch))
             except:
@@ -246,23 +374,10 @@ class TrafficFinePDF:
         
         # === SIGNATURE SECTION ===
         elements.append(Spacer(1, 0.3*inch))
-        elements.append(Paragraph("_" * 80, header_style))
+        elements.append(_static('separator'))
         elements.append(Spacer(1, 0.1*inch))
         
-        sig_data = [
-            ["", ""],
-            ["Signature of the Recording", ""],
-            ["Officer / Complainant", ""]
-        ]
-        
-        sig_table = Table(sig_data, colWidths=[3*inch, 3*inch])
-        sig_table.setStyle(TableStyle([
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
-        
-        elements.append(sig_table)
+        elements.append(_static('sig_table'))
         elements.append(Spacer(1, 0.2*inch))
         
         # === FOOTER ===
@@ -276,17 +391,24 @@ class TrafficFinePDF:
         </para>
         """.format(date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
         
-        elements.append(Paragraph(footer_text, styles['Normal']))
-        
-        # Build PDF
-        doc.build(elements)
+        elements.append(Paragraph(footer_text, st['normal']))
         
-        return filepath
+        return elements
+
+# Long-lived generators, one per output folder
+_templates = {}
+
+def get_fine_template(output_folder="fines"):
+    """Shared TrafficFinePDF for this process - styles and layout are reused"""
+    template = _templates.get(output_folder)
+    if template is None:
+        template = _templates.setdefault(output_folder, TrafficFinePDF(output_folder))
+    return template
 
 # Usage example
 def generate_sample_fine():
     """Generate a sample fine for testing"""
-    pdf_gen = TrafficFinePDF()
+    pdf_gen = get_fine_template()
     
     sample_data = {
         'trace_no': '019123',
@@ -0,0 +1,260 @@
+"""
+🔎 PLATE NUMBER SEARCH INDEX
+Normalizes Bengali/Latin plate numbers to one canonical key
+Exact, prefix and n-gram substring lookup + repeat offender counts
+"""
+import bisect
+import re
+import threading
+import unicodedata
+import streamlit as st
+
+NGRAM = 3
+
+# Bengali digits ০-৯ -> 0-9
+BENGALI_DIGITS = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+
+# Whole words seen on Bangladeshi plates
+BENGALI_WORDS = {
+    "ঢাকা": "DHAKA",
+    "মেট্রো": "METRO",
+    "মেট্র": "METRO",
+    "চট্টগ্রাম": "CHATTOGRAM",
+    "খুলনা": "KHULNA",
+    "রাজশাহী": "RAJSHAHI",
+    "সিলেট": "SYLHET",
+    "বরিশাল": "BARISHAL",
+    "রংপুর": "RANGPUR",
+    "ময়মনসিংহ": "MYMENSINGH",
+    "গাজীপুর": "GAZIPUR",
+    "নারায়ণগঞ্জ": "NARAYANGANJ",
+    "কুমিল্লা": "CUMILLA",
+}
+# Match against NFC text regardless of how the literals above were typed
+BENGALI_WORDS = {unicodedata.normalize("NFC", k): v for k, v in BENGALI_WORDS.items()}
+
+# Vehicle class (series) letters as they are romanized on Latin plates
+BENGALI_LETTERS = {
+    "ক": "KA", "খ": "KHA", "গ": "GA", "ঘ": "GHA", "ঙ": "NGA",
+    "চ": "CHA", "ছ": "CHHA", "জ": "JA", "ঝ": "JHA",
+    "ট": "TA", "ঠ": "THA", "ড": "DA", "ঢ": "DHA", "ণ": "NA",
+    "ত": "TA", "থ": "THA", "দ": "DA", "ধ": "DHA", "ন": "NA",
+    "প": "PA", "ফ": "PHA", "ব": "BA", "ভ": "BHA", "ম": "MA",
+    "য": "JA", "র": "RA", "ল": "LA", "শ": "SHA", "ষ": "SHA",
+    "স": "SA", "হ": "HA",
+}
+
+# Alternative Latin spellings -> canonical spelling
+LATIN_ALIASES = {
+    "CHITTAGONG": "CHATTOGRAM",
+    "CTG": "CHATTOGRAM",
+    "BARISAL": "BARISHAL",
+    "COMILLA": "CUMILLA",
+    "MET": "METRO",
+}
+
+_TOKEN_RE = re.compile(r"[\u0980-\u09FF]+|[A-Za-z]+|[0-9]+")
+
+def _transliterate(token):
+    """Map one Bengali token to its Latin form"""
+    if token in BENGALI_WORDS:
+        return BENGALI_WORDS[token]
+    # Series letter, possibly carrying a vowel sign (e.g. 'গা')
+    if token[0] in BENGALI_LETTERS and all(unicodedata.category(c) in ("Mc", "Mn") for c in token[1:]):
+        return BENGALI_LETTERS[token[0]]
+    # Unknown word: keep consonants we can map, drop vowel signs
+    return "".join(BENGALI_LETTERS.get(c, c) for c in token if unicodedata.category(c) not in ("Mc", "Mn"))
+
+def normalize_plate(text):
+    """
+    Canonical search key for a plate number
+    'ঢাকা মেট্রো-ল ৪৫-৬০৯৩' and 'Dhaka Metro LA 45 6093' -> 'DHAKAMETROLA456093'
+    Spacing, punctuation and case are ignored
+    """
+    if text is None:
+        return ""
+    text = unicodedata.normalize("NFC", str(text)).translate(BENGALI_DIGITS)
+
+    parts = []
+    for token in _TOKEN_RE.findall(text):
+        if "\u0980" <= token[0] <= "\u09FF":
+            token = _transliterate(token)
+        token = token.upper()
+        parts.append(LATIN_ALIASES.get(token, token))
+    return "".join(parts)
+
+def _ngrams(key):
+    """Distinct n-grams of a key"""
+    return {key[i:i + NGRAM] for i in range(len(key) - NGRAM + 1)}
+
+class PlateIndex:
+    """
+    In-memory plate index keyed by row id (the violation's Image_File)
+    All lookups return sets of row ids
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._row_keys = {}       # row id -> normalized key
+        self._row_plates = {}     # row id -> raw plate as entered
+        self._exact = {}          # key -> set(row ids)
+        self._sorted_keys = []    # distinct keys, for prefix lookup
+        self._grams = {}          # n-gram -> set(keys)
+        self._display = {}        # key -> row id whose raw plate is shown for it
+        self._snapshot = None     # plates at last sync(), for diffing
+        self._version = None      # log version at last sync()
+
+    def __len__(self):
+        return len(self._row_keys)
+
+    # ---------- maintenance ----------
+
+    def add(self, row_id, plate):
+        """Index (or re-index) a row's plate number"""
+        key = normalize_plate(plate)
+        with self._lock:
+            if self._row_keys.get(row_id) == key:
+                # Same plate, maybe spelled differently (spacing, Bengali digits)
+                if key:
+                    self._row_plates[row_id] = str(plate).strip()
+                return
+            self.remove(row_id)
+            if not key:
+                return
+            self._row_keys[row_id] = key
+            self._row_plates[row_id] = str(plate).strip()
+            rows = self._exact.get(key)
+            if rows is None:
+                rows = self._exact[key] = set()
+                bisect.insort(self._sorted_keys, key)
+                for gram in _ngrams(key):
+                    self._grams.setdefault(gram, set()).add(key)
+                self._display[key] = row_id
+            rows.add(row_id)
+
+    update = add
+
+    def remove(self, row_id):
+        """Drop a row from the index"""
+        with self._lock:
+            key = self._row_keys.pop(row_id, None)
+            if key is None:
+                return
+            self._row_plates.pop(row_id, None)
+            rows = self._exact[key]
+            rows.discard(row_id)
+            if rows:
+                if self._display[key] == row_id:
+                    # Show the plate as another remaining row spells it
+                    self._display[key] = next(iter(rows))
+                return
+            # Last row with this plate: remove the key everywhere
+            del self._exact[key]
+            del self._display[key]
+            pos = bisect.bisect_left(self._sorted_keys, key)
+            del self._sorted_keys[pos]
+            for gram in _ngrams(key):
+                keys = self._grams.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._grams[gram]
+
+    def sync(self, df, version=None):
+        """
+        Bring the index in line with the violation log
+        Only rows whose plate changed since the last sync are re-indexed;
+        version identifies the log (charts.data_version) - an unchanged
+        version returns at once instead of diffing the whole log
+        """
+        with self._lock:
+            if version is not None and version == self._version:
+                return
+        plates = df.set_index('Image_File')['Plate_Number'].fillna('').astype(str)
+        plates = plates[~plates.index.duplicated(keep='last')]
+
+        with self._lock:
+            if self._snapshot is None:
+                changed = plates[plates != '']
+                removed = []
+            else:
+                previous = self._snapshot.reindex(plates.index)
+                changed = plates[previous.ne(plates)]
+                removed = self._snapshot.index.difference(plates.index)
+
+            for row_id in removed:
+                self.remove(row_id)
+            for row_id, plate in changed.items():
+                self.add(row_id, plate)
+            self._snapshot = plates
+            self._version = version
+
+    # ---------- lookups ----------
+
+    def exact(self, query):
+        """Rows whose plate normalizes to exactly the query"""
+        key = normalize_plate(query)
+        with self._lock:
+            return set(self._exact.get(key, ()))
+
+    def _prefix_keys(self, prefix):
+        """Distinct keys starting with prefix, via binary search"""
+        keys = []
+        pos = bisect.bisect_left(self._sorted_keys, prefix)
+        while pos < len(self._sorted_keys) and self._sorted_keys[pos].startswith(prefix):
+            keys.append(self._sorted_keys[pos])
+            pos += 1
+        return keys
+
+    def prefix(self, query):
+        """Rows whose normalized plate starts with the query"""
+        prefix = normalize_plate(query)
+        if not prefix:
+            return set()
+        with self._lock:
+            rows = set()
+            for key in self._prefix_keys(prefix):
+                rows |= self._exact[key]
+            return rows
+
+    def substring(self, query):
+        """Rows whose normalized plate contains the query"""
+        needle = normalize_plate(query)
+        if not needle:
+            return set()
+        with self._lock:
+            if len(needle) < NGRAM:
+                # Too short for the n-gram index
+                candidates = [k for k in self._sorted_keys if needle in k]
+            else:
+                postings = sorted((self._grams.get(g, set()) for g in _ngrams(needle)), key=len)
+                candidates = set(postings[0])
+                for keys in postings[1:]:
+                    candidates &= keys
+                    if not candidates:
+                        break
+                # n-grams can co-occur without being contiguous
+                candidates = [k for k in candidates if needle in k]
+
+            rows = set()
+            for key in candidates:
+                rows |= self._exact[key]
+            return rows
+
+    search = substring
+
+    def repeat_offenders(self, min_count=2):
+        """[(normalized plate, display plate, violation count)] most frequent first"""
+        with self._lock:
+            offenders = [
+                (key, self._row_plates[self._display[key]], len(rows))
+                for key, rows in self._exact.items()
+                if len(rows) >= min_count
+            ]
+        offenders.sort(key=lambda item: (-item[2], item[0]))
+        return offenders
+
+@st.cache_resource
+def get_plate_index():
+    """Process-wide plate index shared by all sessions and pages"""
+    return PlateIndex()
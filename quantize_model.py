@@ -0,0 +1,166 @@
+"""
+🗜️ INT8 QUANTIZATION
+Post-training static quantization of the ONNX detector with ONNX Runtime
+Activation ranges are calibrated on frames sampled from our own footage; the
+detection head stays FP32 so box coordinates keep their precision
+Afterwards the INT8 model is compared with FP32 on held-out frames: per-class
+precision/recall (FP32 detections as reference) and latency, written to a report
+Run with: python quantize_model.py --source VIDEO [VIDEO ...] [--frames 200]
+Then set INFERENCE_BACKEND = "onnx-int8" in app_config.py
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+from app_config import MODEL_PATH, MODEL_IMGSZ, CLASS_NAMES, DEFAULT_CONF_THRESHOLD, QUANT_CALIBRATION_FRAMES
+from inference_backends import (
+    backend_model_path, detections, export_model, load_model, per_class_agreement, sample_frames
+)
+
+def letterbox(frame, imgsz=MODEL_IMGSZ):
+    """Same input the ultralytics predictor feeds the exported model: 1x3xHxW RGB in [0, 1]"""
+    import cv2
+    height, width = frame.shape[:2]
+    ratio = min(imgsz / height, imgsz / width)
+    new_w, new_h = round(width * ratio), round(height * ratio)
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - new_h) // 2, (imgsz - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    return canvas[:, :, ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+
+class FrameCalibrationReader:
+    """CalibrationDataReader over pre-sampled BGR frames"""
+
+    def __init__(self, frames, input_name, imgsz=MODEL_IMGSZ):
+        self._batches = iter([{input_name: letterbox(frame, imgsz)} for frame in frames])
+
+    def get_next(self):
+        return next(self._batches, None)
+
+def head_nodes(onnx_path):
+    """Nodes of the last model block (the detect head), left in FP32"""
+    import onnx
+    graph = onnx.load(onnx_path).graph
+    blocks = [int(m.group(1)) for node in graph.node for m in [re.match(r"/model\.(\d+)/", node.name)] if m]
+    if not blocks:
+        return []
+    prefix = f"/model.{max(blocks)}/"
+    return [node.name for node in graph.node if node.name.startswith(prefix)]
+
+def quantize(fp32_path, int8_path, frames, imgsz=MODEL_IMGSZ, keep_head_fp32=True):
+    """Static QDQ quantization (per-channel INT8 weights, UINT8 activations)"""
+    import onnxruntime as ort
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    input_name = ort.InferenceSession(fp32_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    with tempfile.TemporaryDirectory() as tmp:
+        prepared = os.path.join(tmp, "prepared.onnx")
+        quant_pre_process(fp32_path, prepared)
+        quantize_static(
+            prepared, int8_path,
+            FrameCalibrationReader(frames, input_name, imgsz),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method=CalibrationMethod.MinMax,
+            nodes_to_exclude=head_nodes(prepared) if keep_head_fp32 else [],
+        )
+    return int8_path
+
+def run_model(model, frames):
+    """(detections per frame, per-frame ms)"""
+    runs, times = [], []
+    model(frames[0], conf=DEFAULT_CONF_THRESHOLD, imgsz=MODEL_IMGSZ, verbose=False)   # warm-up
+    for frame in frames:
+        start = time.perf_counter()
+        result = model(frame, conf=DEFAULT_CONF_THRESHOLD, imgsz=MODEL_IMGSZ, verbose=False)[0]
+        times.append((time.perf_counter() - start) * 1000)
+        runs.append(detections(result))
+    return runs, times
+
+def _pct(value):
+    return "—" if value is None else f"{value * 100:.1f}%"
+
+def build_report(agreement, fp32_ms, int8_ms, sizes, n_calibration, n_eval):
+    """Markdown report of the speed/accuracy trade-off"""
+    lines = [
+        "# INT8 quantization report",
+        "",
+        f"Generated {datetime.now().strftime('%Y-%m-%d %H:%M')} - {n_calibration} calibration frames, "
+        f"{n_eval} held-out evaluation frames, imgsz {MODEL_IMGSZ}",
+        "",
+        "## Speed",
+        "",
+        "| Model | Median ms | p95 ms | Size MB |",
+        "|---|---|---|---|",
+        f"| FP32 (onnx) | {statistics.median(fp32_ms):.1f} | {np.percentile(fp32_ms, 95):.1f} | {sizes[0] / 1e6:.1f} |",
+        f"| INT8 (onnx-int8) | {statistics.median(int8_ms):.1f} | {np.percentile(int8_ms, 95):.1f} | {sizes[1] / 1e6:.1f} |",
+        "",
+        f"Speedup: {statistics.median(fp32_ms) / statistics.median(int8_ms):.2f}x",
+        "",
+        "## Accuracy against FP32",
+        "",
+        "FP32 detections are the reference: precision = INT8 detections that match an",
+        "FP32 detection (same class, IoU >= 0.5), recall = FP32 detections INT8 kept",
+        "",
+        "| Class | FP32 | INT8 | Matched | Precision | Recall |",
+        "|---|---|---|---|---|---|",
+    ]
+    for cls, name in CLASS_NAMES.items():
+        row = agreement.get(cls, {"reference": 0, "candidate": 0, "matched": 0, "precision": None, "recall": None})
+        lines.append(f"| {name} | {row['reference']} | {row['candidate']} | {row['matched']} | "
+                     f"{_pct(row['precision'])} | {_pct(row['recall'])} |")
+    return "\n".join(lines) + "\n"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quantize the detection model to INT8 and report the trade-off")
+    parser.add_argument("--source", nargs="+", help="videos or image globs from our cameras (default: violations/)")
+    parser.add_argument("--frames", type=int, default=QUANT_CALIBRATION_FRAMES, help="calibration frames")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--quantize-head", action="store_true", help="also quantize the detect head")
+    parser.add_argument("--report", help="markdown report path (default: next to the INT8 model)")
+    args = parser.parse_args(argv)
+
+    fp32_path = backend_model_path("onnx", args.model)
+    int8_path = backend_model_path("onnx-int8", args.model)
+    if not os.path.exists(fp32_path):
+        print(f"📤 Exporting {args.model} to ONNX first")
+        export_model("onnx", args.model)
+
+    # Alternate frames between calibration and evaluation so the report is on unseen frames
+    sources = args.source or [None]
+    per_source = max(1, 2 * args.frames // len(sources))
+    frames = [frame for source in sources for frame in sample_frames(source, per_source)]
+    calibration, evaluation = frames[0::2], frames[1::2]
+    if not calibration or not evaluation:
+        print("❌ Not enough frames to calibrate and evaluate")
+        return 1
+
+    start = time.perf_counter()
+    quantize(fp32_path, int8_path, calibration, keep_head_fp32=not args.quantize_head)
+    print(f"✅ {int8_path} ({time.perf_counter() - start:.1f} s, {len(calibration)} calibration frames)")
+
+    fp32_runs, fp32_ms = run_model(load_model("onnx", args.model), evaluation)
+    int8_runs, int8_ms = run_model(load_model("onnx-int8", args.model), evaluation)
+    report = build_report(
+        per_class_agreement(fp32_runs, int8_runs),
+        fp32_ms, int8_ms,
+        (os.path.getsize(fp32_path), os.path.getsize(int8_path)),
+        len(calibration), len(evaluation),
+    )
+    report_path = args.report or os.path.splitext(int8_path)[0] + "_report.md"
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(report)
+    print(report)
+    print(f"📝 Report saved to {report_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""
+🗄️ EVIDENCE RETENTION & ARCHIVAL
+Packs old images and fine PDFs into large indexed ZIP shards
+Random access by file name keeps working for audits
+Run with: python retention.py run [--dry-run] | report
+"""
+import csv
+import os
+import shutil
+import sqlite3
+import sys
+import zipfile
+from contextlib import contextmanager
+from functools import partial
+from datetime import datetime, timedelta
+from app_config import (
+    CSV_FILE, SAVE_DIR, ARCHIVE_DIR, ARCHIVE_INDEX_DB, EXPORT_DIR,
+    RETENTION_RULES, ARCHIVE_SHARD_MAX_MB, RESTORE_CACHE_MAX_MB, DISK_QUOTA_GB, DISK_WARN_HEADROOM
+)
+import evidence_store
+import fines_index
+from thumbnail_utils import cache_written
+
+RESTORE_DIR = os.path.join("cache", "restored")
+
+_schema_ready = False
+
+@contextmanager
+def _archive_index():
+    """Short-lived connection to the archive index"""
+    global _schema_ready
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    conn = sqlite3.connect(ARCHIVE_INDEX_DB, timeout=30)
+    try:
+        if not _schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archived (
+                    name TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    shard TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    archived_at TEXT NOT NULL
+                )
+            """)
+            _schema_ready = True
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+# ==========================================
+# CANDIDATE SELECTION
+# ==========================================
+
+def _image_statuses(names):
+    """
+    Status of each named image from the violation log (streamed)
+    pending = no plate yet, reviewed = plate entered, fined = has a fine PDF
+    """
+    statuses = {}
+    if names and os.path.exists(CSV_FILE):
+        with open(CSV_FILE, newline='', encoding='utf-8', errors='ignore') as f:
+            for row in csv.DictReader(f):
+                image_file = row.get('Image_File')
+                if image_file in names:
+                    statuses[image_file] = "reviewed" if (row.get('Plate_Number') or '').strip() else "pending"
+
+    fined = fines_index.fined_image_files() & names
+    for name in fined:
+        statuses[name] = "fined"
+    return statuses
+
+def _status_matches(rule_status, status):
+    if rule_status == "any":
+        return True
+    if rule_status == "reviewed":
+        # A fined case has also been reviewed
+        return status in ("reviewed", "fined")
+    return rule_status == status
+
+def select_candidates(rules=RETENTION_RULES, now=None):
+    """
+    Files due for archival (or, for exports, deletion) under the retention rules
+    Returns {'image': [(name, path)], 'pdf': [(name, path)], 'export': [(name, path)]}
+    """
+    now = now or datetime.now()
+    selected = {"image": {}, "pdf": {}, "export": {}}
+
+    image_rules = [r for r in rules if r.get("kind") == "image"]
+    if image_rules:
+        # Only look up statuses for images old enough for the loosest rule
+        loosest = now - timedelta(days=min(r["older_than_days"] for r in image_rules))
+        old_images = {
+            name: (path, datetime.strptime(captured, "%Y-%m-%d %H:%M:%S"))
+            for name, path, captured in evidence_store.images_older_than(loosest)
+        }
+        statuses = _image_statuses(set(old_images))
+
+        for rule in image_rules:
+            cutoff = now - timedelta(days=rule["older_than_days"])
+            for name, (path, captured) in old_images.items():
+                if captured < cutoff and _status_matches(rule.get("status", "any"), statuses.get(name, "orphan")):
+                    selected["image"][name] = path
+
+    for rule in rules:
+        if rule.get("kind") == "pdf":
+            cutoff = now - timedelta(days=rule["older_than_days"])
+            for name, path in fines_index.fines_older_than(cutoff):
+                if not path.startswith(("archive:", "unsaved:")):
+                    selected["pdf"][name] = path
+        elif rule.get("kind") == "export" and os.path.isdir(EXPORT_DIR):
+            cutoff = (now - timedelta(days=rule["older_than_days"])).timestamp()
+            for entry in os.scandir(EXPORT_DIR):
+                if entry.is_file() and entry.name.endswith(".zip") and entry.stat().st_mtime < cutoff:
+                    selected["export"][entry.name] = entry.path
+
+    return {kind: sorted(items.items()) for kind, items in selected.items()}
+
+# ==========================================
+# PACKING
+# ==========================================
+
+class ShardWriter:
+    """
+    Appends files to ZIP shards, rolling over at ARCHIVE_SHARD_MAX_MB
+    on_complete(shard, members) runs after each shard is closed and synced
+    """
+
+    def __init__(self, kind, on_complete):
+        self.kind = kind
+        self.on_complete = on_complete
+        self.max_bytes = ARCHIVE_SHARD_MAX_MB * 1024 * 1024
+        self.zip = None
+        self.shard = None
+        self.written = 0
+        self.members = []   # (name, size) in the open shard
+
+    def _open_next(self):
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        n = 0
+        while os.path.exists(os.path.join(ARCHIVE_DIR, f"{self.kind}_{stamp}_{n:03d}.zip")):
+            n += 1
+        self.shard = f"{self.kind}_{stamp}_{n:03d}.zip"
+        # Images and PDFs are already compressed - store them as-is
+        self.zip = zipfile.ZipFile(os.path.join(ARCHIVE_DIR, self.shard), "w", zipfile.ZIP_STORED, allowZip64=True)
+        self.written = 0
+        self.members = []
+
+    def add(self, name, path):
+        if self.zip is None or self.written >= self.max_bytes:
+            self.close()
+            self._open_next()
+        self.zip.write(path, arcname=name)
+        size = os.path.getsize(path)
+        self.written += size
+        self.members.append((name, size))
+
+    def close(self):
+        """Finish the open shard and hand it to on_complete"""
+        if self.zip is None:
+            return
+        self.zip.close()
+        self.zip = None
+        with open(os.path.join(ARCHIVE_DIR, self.shard), "rb") as f:
+            os.fsync(f.fileno())
+        self.on_complete(self.shard, self.members)
+
+def _commit_shard(kind, shard, members, paths):
+    """Index a finished shard, then delete the originals it now holds"""
+    archived_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with _archive_index() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO archived (name, kind, shard, size, archived_at) VALUES (?, ?, ?, ?, ?)",
+            [(name, kind, shard, size, archived_at) for name, size in members]
+        )
+    for name, _ in members:
+        if kind == "image":
+            evidence_store.remove_image(name)
+        else:
+            try:
+                os.remove(paths[name])
+            except OSError as e:
+                print(f"Could not delete {paths[name]}: {e}")
+            fines_index.set_path(name, f"archive:{shard}")
+
+def run_retention(rules=RETENTION_RULES, dry_run=False, now=None):
+    """
+    Archive everything the rules select
+    Originals are removed only after their shard is closed and indexed;
+    expired court exports are deleted
+    """
+    candidates = select_candidates(rules, now)
+    summary = {kind: len(items) for kind, items in candidates.items()}
+    if dry_run:
+        return summary
+
+    for kind, items in candidates.items():
+        if not items:
+            continue
+        if kind == "export":
+            for name, path in items:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"Could not delete {path}: {e}")
+            continue
+        paths = dict(items)
+        writer = ShardWriter(kind, partial(_commit_shard, kind, paths=paths))
+        for name, path in items:
+            if not os.path.exists(path):
+                print(f"⚠️ Skipping missing file: {path}")
+                continue
+            writer.add(name, path)
+        writer.close()
+
+    return summary
+
+# ==========================================
+# RANDOM-ACCESS READS
+# ==========================================
+
+def archived_location(name):
+    """(kind, shard) for an archived file, or None"""
+    try:
+        with _archive_index() as conn:
+            return conn.execute("SELECT kind, shard FROM archived WHERE name = ?", (name,)).fetchone()
+    except sqlite3.Error:
+        return None
+
+def archived_names(kind=None):
+    """Names of all archived files (of one kind: 'image' or 'pdf'), without restoring any"""
+    if not os.path.exists(ARCHIVE_INDEX_DB):
+        return set()    # nothing archived yet - and read-only callers create nothing
+    try:
+        with _archive_index() as conn:
+            if kind is None:
+                return {row[0] for row in conn.execute("SELECT name FROM archived")}
+            return {row[0] for row in conn.execute("SELECT name FROM archived WHERE kind = ?", (kind,))}
+    except sqlite3.Error:
+        return set()
+
+def read_archived(name):
+    """Bytes of an archived file, or None if it was never archived"""
+    location = archived_location(name)
+    if location is None:
+        return None
+    with zipfile.ZipFile(os.path.join(ARCHIVE_DIR, location[1])) as zf:
+        return zf.read(name)
+
+def restore_to_cache(name):
+    """
+    Extract one archived file to cache/restored/ and return its path
+    The cache is size-bounded like the thumbnail cache (RESTORE_CACHE_MAX_MB)
+    """
+    target = os.path.join(RESTORE_DIR, name)
+    if os.path.exists(target):
+        # Touch so eviction keeps recently audited files
+        os.utime(target, None)
+        return target
+    data = read_archived(name)
+    if data is None:
+        return None
+    os.makedirs(RESTORE_DIR, exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, target)
+    cache_written(RESTORE_DIR, len(data), RESTORE_CACHE_MAX_MB)
+    return target
+
+# ==========================================
+# DISK QUOTA WATCHDOG
+# ==========================================
+
+def disk_report():
+    """
+    Usage against DISK_QUOTA_GB from the indexes (no directory walks)
+    status is 'ok', 'warning' or 'critical'
+    """
+    _, image_bytes = evidence_store.storage_stats()
+    try:
+        pdf_bytes = fines_index.total_size()
+    except sqlite3.Error:
+        pdf_bytes = 0
+    archive_bytes = 0
+    if os.path.isdir(ARCHIVE_DIR):
+        archive_bytes = sum(e.stat().st_size for e in os.scandir(ARCHIVE_DIR) if e.name.endswith(".zip"))
+    # Archived files extracted again for audits
+    restored_bytes = 0
+    if os.path.isdir(RESTORE_DIR):
+        restored_bytes = sum(e.stat().st_size for e in os.scandir(RESTORE_DIR) if e.is_file())
+
+    quota = DISK_QUOTA_GB * 1024 ** 3
+    used = image_bytes + pdf_bytes + archive_bytes + restored_bytes
+    headroom = quota - used
+    fs_free = shutil.disk_usage(os.path.abspath(SAVE_DIR)).free
+
+    # The real ceiling is whichever runs out first
+    effective = min(headroom, fs_free)
+    if effective <= 0:
+        status = "critical"
+    elif effective < quota * DISK_WARN_HEADROOM:
+        status = "warning"
+    else:
+        status = "ok"
+
+    return {
+        "images_bytes": image_bytes,
+        "pdfs_bytes": pdf_bytes,
+        "archive_bytes": archive_bytes,
+        "restored_bytes": restored_bytes,
+        "used_bytes": used,
+        "quota_bytes": quota,
+        "headroom_bytes": headroom,
+        "fs_free_bytes": fs_free,
+        "status": status,
+    }
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "report"
+    gb = 1024 ** 3
+    if command == "run":
+        dry_run = "--dry-run" in sys.argv
+        summary = run_retention(dry_run=dry_run)
+        verb = "Would archive" if dry_run else "Archived"
+        print(f"✅ {verb} {summary['image']:,} images and {summary['pdf']:,} PDFs, "
+              f"{'would delete' if dry_run else 'deleted'} {summary['export']:,} old court exports")
+    elif command == "report":
+        report = disk_report()
+        print(f"📊 Disk status: {report['status'].upper()}")
+        print(f"   - Images:   {report['images_bytes'] / gb:.2f} GB")
+        print(f"   - PDFs:     {report['pdfs_bytes'] / gb:.2f} GB")
+        print(f"   - Archives: {report['archive_bytes'] / gb:.2f} GB")
+        print(f"   - Restored: {report['restored_bytes'] / gb:.2f} GB (audit cache)")
+        print(f"   - Headroom: {report['headroom_bytes'] / gb:.2f} of {report['quota_bytes'] / gb:.0f} GB quota")
+        print(f"   - Filesystem free: {report['fs_free_bytes'] / gb:.2f} GB")
+    else:
+        print("Usage: python retention.py run [--dry-run] | report")
+        sys.exit(1)
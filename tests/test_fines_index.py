@@ -0,0 +1,58 @@
+"""
+Case numbers allocated from the fines index, starting from a legacy database
+Run with: python -m pytest -q tests
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fines_index
+
+@pytest.fixture
+def legacy_index(tmp_path, monkeypatch):
+    """A fines index from before the cases table, with one hash-derived case ID"""
+    db = tmp_path / "fines_index.db"
+    conn = sqlite3.connect(db)
+    conn.execute("""
+        CREATE TABLE fines (
+            pdf_name TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            case_id TEXT,
+            plate TEXT,
+            image_file TEXT,
+            created TEXT NOT NULL,
+            size INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute(
+        "INSERT INTO fines VALUES ('FINE_1234567890_1.pdf', 'fines/FINE_1234567890_1.pdf', "
+        "'1234567890', 'DHAKA METRO LA 12-3456', 'a.jpg', '2025-01-01 10:00:00', 100)"
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(fines_index, "FINES_DIR", str(tmp_path))
+    monkeypatch.setattr(fines_index, "FINES_INDEX_DB", str(db))
+    monkeypatch.setattr(fines_index, "_schema_ready", False)
+    return db
+
+def test_legacy_case_keeps_its_id(legacy_index):
+    assert fines_index.case_identity({'Image_File': 'a.jpg'}) == ("1234567890", "567890")
+    assert fines_index.case_identity({'Image_File': 'b.jpg'}) == ("2000000002", "0000002")
+
+def test_new_case_first_keeps_legacy_ids(legacy_index):
+    assert fines_index.case_identity({'Image_File': 'b.jpg'}) == ("2000000002", "0000002")
+    assert fines_index.case_identity({'Image_File': 'a.jpg'}) == ("1234567890", "567890")
+    # Adopted rows are committed, not rolled back with the first connection
+    with sqlite3.connect(legacy_index) as conn:
+        keys = {key for (key,) in conn.execute("SELECT case_key FROM cases")}
+    assert keys == {"a.jpg", "b.jpg"}
+
+def test_case_identity_is_stable(legacy_index):
+    row = {'Image_File': '', 'Time': '2025-01-01 10:00:00', 'Source': 'cam1', 'Detection_Confidence': 0.9}
+    first = fines_index.case_identity(row)
+    assert fines_index.case_identity(dict(row)) == first
@@ -0,0 +1,103 @@
+"""
+Tiled inference over models and service clients that answer one result per call
+Run with: python -m pytest -q tests
+"""
+import os
+import socket
+import sys
+import threading
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from inference_backends import LiteResult, detections
+from inference_service import InferenceClient, InferenceService
+from tiling import TiledDetector
+
+PLATE = 3
+
+def white_box(image):
+    """The bounding box of white pixels as one plate detection"""
+    ys, xs = np.nonzero(image[..., 0] > 200)
+    if not len(xs):
+        return []
+    return [(PLATE, 0.9, (float(xs.min()), float(ys.min()), float(xs.max() + 1), float(ys.max() + 1)))]
+
+class OneResultClient:
+    """Stub of a client that treats whatever it gets as one frame"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, frame, conf=0.25, imgsz=None, verbose=False):
+        self.calls += 1
+        image = frame[0] if isinstance(frame, list) else frame
+        return [LiteResult(white_box(image))]
+
+class FakeModel:
+    """Batched model: one result per image"""
+
+    def __call__(self, images, conf=0.25, imgsz=None, verbose=False):
+        if not isinstance(images, list):
+            images = [images]
+        return [LiteResult(white_box(image)) for image in images]
+
+def frame_with_objects():
+    frame = np.zeros((2160, 3840, 3), np.uint8)
+    frame[100:150, 100:150] = 255       # first tile
+    frame[1800:1850, 3600:3650] = 255   # last tile
+    return frame
+
+def plate_boxes(detector, frame):
+    return sorted(box for _, _, box in detections(detector(frame, conf=0.25)[0]))
+
+def test_one_result_per_call_keeps_every_tile():
+    client = OneResultClient()
+    tiled = TiledDetector(client, full_frame_pass=False)
+    boxes = plate_boxes(tiled, frame_with_objects())
+    assert boxes == [(100.0, 100.0, 150.0, 150.0), (3600.0, 1800.0, 3650.0, 1850.0)]
+    # Later frames go tile by tile straight away
+    calls = client.calls
+    plate_boxes(tiled, frame_with_objects())
+    assert client.calls - calls == len(tiled._grid)
+
+def test_tiles_run_at_native_size():
+    seen = []
+
+    class Recorder(FakeModel):
+        def __call__(self, images, conf=0.25, imgsz=None, verbose=False):
+            seen.extend((image.shape[:2], imgsz) for image in (images if isinstance(images, list) else [images]))
+            return super().__call__(images, conf, imgsz, verbose)
+
+    tiled = TiledDetector(Recorder(), tile_size=640, full_frame_pass=False)
+    tiled(frame_with_objects(), conf=0.25, imgsz=640)
+    assert seen and all(shape == (640, 640) and imgsz == 640 for shape, imgsz in seen)
+
+def test_service_client_returns_one_result_per_tile():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        address = probe.getsockname()
+    authkey = b"test"
+    service = InferenceService(FakeModel(), max_wait_ms=5)
+    threading.Thread(target=service.serve, args=(address, authkey), daemon=True).start()
+
+    client = InferenceClient("tiles", address=address, authkey=authkey)
+    for _ in range(50):
+        try:
+            client.ping()
+            break
+        except Exception:
+            threading.Event().wait(0.1)
+    try:
+        tiles = [np.zeros((64, 64, 3), np.uint8) for _ in range(5)]
+        tiles[3][10:20, 10:20] = 255
+        results = client(tiles)
+        assert [len(detections(result)) for result in results] == [0, 0, 0, 1, 0]
+
+        tiled = TiledDetector(client, full_frame_pass=False)
+        assert len(plate_boxes(tiled, frame_with_objects())) == 2
+        assert tiled._batching
+    finally:
+        client.close()
@@ -0,0 +1,167 @@
+"""
+🖼️ PLATE THUMBNAIL CACHE
+Small thumbnails for case lists and print-resolution copies for PDFs,
+generated once per image
+Content-keyed cache directory with size-bounded LRU eviction
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from app_config import (
+    THUMB_DIR, THUMB_MAX_WIDTH, THUMB_FORMAT, THUMB_QUALITY, THUMB_CACHE_MAX_MB,
+    PRINT_IMAGE_DIR, PRINT_DPI, PRINT_IMAGE_QUALITY, PRINT_CACHE_MAX_MB
+)
+
+# (path, mtime_ns, size) -> content key, so unchanged files are hashed only once
+# Least recently used entries are dropped beyond _KEY_MEMO_MAX
+_KEY_MEMO_MAX = 4096
+_key_memo = OrderedDict()
+_cache_bytes = {}   # cache dir -> bytes held
+_lock = threading.Lock()
+
+def _content_key(image_path):
+    """SHA1 of the image bytes, memoized per file version"""
+    stat = os.stat(image_path)
+    memo_key = (image_path, stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        key = _key_memo.get(memo_key)
+        if key is not None:
+            _key_memo.move_to_end(memo_key)
+            return key
+    h = hashlib.sha1()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    key = h.hexdigest()
+    with _lock:
+        _key_memo[memo_key] = key
+        while len(_key_memo) > _KEY_MEMO_MAX:
+            _key_memo.popitem(last=False)
+    return key
+
+def _encode_params():
+    """Extension and (cv2 quality flag name, quality) for the configured format"""
+    if THUMB_FORMAT == "webp":
+        return ".webp", ("IMWRITE_WEBP_QUALITY", THUMB_QUALITY)
+    return ".jpg", ("IMWRITE_JPEG_QUALITY", THUMB_QUALITY)
+
+def _scan_cache_size(cache_dir):
+    """Total bytes currently held in a cache directory"""
+    total = 0
+    for entry in os.scandir(cache_dir):
+        if entry.is_file():
+            total += entry.stat().st_size
+    return total
+
+def _evict(cache_dir, max_bytes):
+    """Delete least recently used files until the cache fits"""
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_file():
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    # Evict down to 90% so we do not rescan on every new file
+    target = int(max_bytes * 0.9)
+    for _, size, path in entries:
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    _cache_bytes[cache_dir] = total
+
+def cache_written(cache_dir, nbytes, max_mb):
+    """
+    Account for nbytes just written to cache_dir and evict least recently
+    used files once it holds more than max_mb (readers touch files on a hit)
+    """
+    with _lock:
+        if cache_dir not in _cache_bytes:
+            _cache_bytes[cache_dir] = _scan_cache_size(cache_dir)
+        else:
+            _cache_bytes[cache_dir] += nbytes
+        max_bytes = max_mb * 1024 * 1024
+        if _cache_bytes[cache_dir] > max_bytes:
+            _evict(cache_dir, max_bytes)
+
+def _cached_resize(image_path, cache_dir, max_width, max_height, ext, quality, max_mb):
+    """
+    Path of a downscaled copy of image_path in cache_dir
+    Width and height are capped independently; smaller images are only re-encoded
+    quality is (cv2 flag name, value); cv2 is only imported on a cache miss
+    """
+    key = _content_key(image_path)
+    size_tag = max_width if max_height is None else f"{max_width}x{max_height}"
+    out_path = os.path.join(cache_dir, f"{key}_{size_tag}{ext}")
+    
+    if os.path.exists(out_path):
+        # Touch so eviction keeps recently used files
+        os.utime(out_path, None)
+        return out_path
+    
+    import cv2
+    image = cv2.imread(image_path)
+    if image is None:
+        return None
+    
+    h, w = image.shape[:2]
+    if max_height is None:
+        # Keep the aspect ratio
+        new_w, new_h = min(w, max_width), max(1, int(h * min(w, max_width) / w))
+    else:
+        new_w, new_h = min(w, max_width), min(h, max_height)
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    
+    flag, value = quality
+    ok, buffer = cv2.imencode(ext, image, [getattr(cv2, flag), value])
+    if not ok:
+        return None
+    
+    with _lock:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{out_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.tobytes())
+        os.replace(tmp_path, out_path)
+    cache_written(cache_dir, len(buffer), max_mb)
+    
+    return out_path
+
+def get_thumbnail(image_path, max_width=THUMB_MAX_WIDTH):
+    """
+    Return the path of a cached thumbnail for image_path
+    Generates it on first use; returns None if the source is unreadable
+    """
+    try:
+        if not image_path or not os.path.exists(image_path):
+            return None
+        ext, quality = _encode_params()
+        return _cached_resize(image_path, THUMB_DIR, max_width, None, ext, quality, THUMB_CACHE_MAX_MB)
+    
+    except Exception as e:
+        print(f"Thumbnail error for {image_path}: {e}")
+        return None
+
+def get_print_image(image_path, width_inch, height_inch):
+    """
+    JPEG of image_path resampled for a width_inch x height_inch box at PRINT_DPI
+    Falls back to the original file if it cannot be resampled
+    """
+    try:
+        if not image_path or not os.path.exists(image_path):
+            return None
+        max_width = int(round(width_inch * PRINT_DPI))
+        max_height = int(round(height_inch * PRINT_DPI))
+        quality = ("IMWRITE_JPEG_QUALITY", PRINT_IMAGE_QUALITY)
+        resized = _cached_resize(image_path, PRINT_IMAGE_DIR, max_width, max_height, ".jpg", quality, PRINT_CACHE_MAX_MB)
+        return resized or image_path
+    
+    except Exception as e:
+        print(f"Print image error for {image_path}: {e}")
+        return image_path
@@ -0,0 +1,157 @@
+"""
+🧩 TILED INFERENCE
+4K frames shrunk to the model input lose plates and distant riders. Frames at
+least TILE_MIN_WIDTH wide are split into overlapping TILE_SIZE tiles that run
+through the model as one batch at their native size, so tiles are never
+downscaled (plus an optional full-frame pass for objects larger than a tile);
+detections are mapped to frame coordinates and merged across seams before
+process_frame applies its rules
+Tiles with no detections for TILE_IDLE_FRAMES frames are skipped, except for a
+staggered re-check every TILE_RECHECK_FRAMES frames so new traffic is picked up
+Used in place of the model: tiled(frame, conf=...)[0].boxes
+"""
+import time
+from app_config import (
+    MODEL_IMGSZ, TILE_SIZE, TILE_OVERLAP, TILE_MIN_WIDTH, TILE_IDLE_FRAMES, TILE_RECHECK_FRAMES,
+    TILE_FULL_FRAME_PASS, TILE_NMS_IOU, TILE_MERGE_IOS
+)
+from detection_utils import calculate_iou
+from inference_backends import LiteResult, detections
+
+def tile_grid(width, height, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """(x1, y1, x2, y2) tiles covering the frame; the last row/column is aligned to the edge"""
+    step = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, step))
+        return positions + [length - tile_size]
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in starts(height) for x in starts(width)
+    ]
+
+def _intersection_over_smaller(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    if x2 <= x1 or y2 <= y1:
+        return 0.0
+    smaller = min((a[2] - a[0]) * (a[3] - a[1]), (b[2] - b[0]) * (b[3] - b[1]))
+    return (x2 - x1) * (y2 - y1) / smaller if smaller > 0 else 0.0
+
+def merge_detections(dets, iou_threshold=TILE_NMS_IOU, ios_threshold=TILE_MERGE_IOS):
+    """
+    Class-wise greedy NMS by confidence. A box mostly contained in a kept box
+    (a half cut off at a tile seam) is merged into it: the kept box grows to
+    cover both instead of the half being dropped or kept separately
+    """
+    kept = []
+    for cls, conf, box in sorted(dets, key=lambda det: -det[1]):
+        for index, (k_cls, k_conf, k_box) in enumerate(kept):
+            if k_cls != cls:
+                continue
+            if calculate_iou(box, k_box) > iou_threshold:
+                break
+            if _intersection_over_smaller(box, k_box) > ios_threshold:
+                kept[index] = (k_cls, k_conf, (
+                    min(box[0], k_box[0]), min(box[1], k_box[1]),
+                    max(box[2], k_box[2]), max(box[3], k_box[3]),
+                ))
+                break
+        else:
+            kept.append((cls, conf, box))
+    return kept
+
+class TiledDetector:
+    """Tiled detector with the call interface of a YOLO model"""
+
+    def __init__(self, model, tile_size=TILE_SIZE, overlap=TILE_OVERLAP, min_width=TILE_MIN_WIDTH,
+                 idle_frames=TILE_IDLE_FRAMES, recheck_frames=TILE_RECHECK_FRAMES,
+                 full_frame_pass=TILE_FULL_FRAME_PASS):
+        self.model = model
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.min_width = min_width
+        self.idle_frames = idle_frames
+        self.recheck_frames = recheck_frames
+        self.full_frame_pass = full_frame_pass
+        self._grid = None
+        self._grid_shape = None
+        self._idle = []             # frames since each tile last had a detection
+        self._batching = True
+        self.frames = 0
+        self.tiles_run = 0
+        self.tiles_total = 0
+        self.tile_ms = 0.0
+
+    def _tiles_for(self, frame):
+        shape = frame.shape[:2]
+        if shape != self._grid_shape:
+            self._grid = tile_grid(shape[1], shape[0], self.tile_size, self.overlap)
+            self._grid_shape = shape
+            self._idle = [0] * len(self._grid)
+        active = []
+        for index in range(len(self._grid)):
+            idle = self._idle[index] >= self.idle_frames
+            # Staggered so skipped tiles are not all re-checked on the same frame
+            recheck = (self.frames + index) % self.recheck_frames == 0
+            if not idle or recheck:
+                active.append(index)
+        return active
+
+    def _run(self, images, conf, imgsz):
+        """One batched call; models exported with a fixed batch of 1 fall back to a call per image"""
+        if self._batching and len(images) > 1:
+            try:
+                results = self.model(images, conf=conf, imgsz=imgsz, verbose=False)
+                if len(results) == len(images):
+                    return results
+                print(f"⚠️ Batched tile inference returned {len(results)} results for {len(images)} tiles - running tiles one by one")
+            except Exception as e:
+                print(f"⚠️ Batched tile inference failed ({e}) - running tiles one by one")
+            self._batching = False
+        return [self.model(image, conf=conf, imgsz=imgsz, verbose=False)[0] for image in images]
+
+    def __call__(self, frame, conf=0.25, imgsz=None, verbose=False):
+        imgsz = imgsz or MODEL_IMGSZ
+        # A smaller size from the adaptive controller still wins
+        tile_imgsz = min(self.tile_size, imgsz)
+        if frame.shape[1] < self.min_width:
+            return self.model(frame, conf=conf, imgsz=imgsz, verbose=False)
+
+        self.frames += 1
+        start = time.perf_counter()
+        active = self._tiles_for(frame)
+        self.tiles_total += len(self._grid)
+        self.tiles_run += len(active)
+
+        merged = []
+        if active:
+            tiles = [self._grid[index] for index in active]
+            results = self._run([frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles], conf, tile_imgsz)
+            for index, (x1, y1, _, _), result in zip(active, tiles, results):
+                dets = detections(result)
+                self._idle[index] = 0 if dets else self._idle[index] + 1
+                merged.extend(
+                    (cls, score, (bx1 + x1, by1 + y1, bx2 + x1, by2 + y1))
+                    for cls, score, (bx1, by1, bx2, by2) in dets
+                )
+        if self.full_frame_pass:
+            merged.extend(detections(self.model(frame, conf=conf, imgsz=imgsz, verbose=False)[0]))
+
+        self.tile_ms += (time.perf_counter() - start) * 1000
+        return [LiteResult(merge_detections(merged))]
+
+    @property
+    def tile_skip_rate(self):
+        return 1 - self.tiles_run / self.tiles_total if self.tiles_total else 0.0
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "tiles_per_frame": len(self._grid) if self._grid else 0,
+            "tile_skip_rate": self.tile_skip_rate,
+            "ms_per_frame": self.tile_ms / self.frames if self.frames else 0.0,
+        }
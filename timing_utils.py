@@ -0,0 +1,48 @@
+"""
+⏱️ RENDER TIMING
+Server-side time per script run and per fragment rerun
+Kept per session so the System tab can show what each interaction cost
+"""
+import functools
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+import streamlit as st
+
+TIMINGS_KEY = "render_timings"
+MAX_TIMINGS = 100
+
+def record_timing(section, ms):
+    """Append one measurement to this session's timing log"""
+    log = st.session_state.get(TIMINGS_KEY)
+    if log is None:
+        log = st.session_state[TIMINGS_KEY] = deque(maxlen=MAX_TIMINGS)
+    log.append((datetime.now().strftime("%H:%M:%S"), section, ms))
+
+@contextmanager
+def timed(section):
+    """Time a block of rendering code"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(section, (time.perf_counter() - start) * 1000)
+
+def timed_fragment(section):
+    """
+    st.fragment that records its own run time
+    Widgets inside it rerun only this function, not the whole script
+    """
+    def decorator(func):
+        @st.fragment
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(section):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def get_timings():
+    """[(time, section, ms)] oldest first"""
+    return list(st.session_state.get(TIMINGS_KEY, ()))